@@ -31,6 +31,7 @@ setup(
     download_url='https://github.com/abenassi/xlseries/archive/0.2.6.tar.gz',
     packages=[
         'xlseries',
+        'xlseries.evaluation',
         'xlseries.strategies',
         'xlseries.strategies.clean',
         'xlseries.strategies.discover',
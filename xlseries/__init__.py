@@ -4,4 +4,24 @@ __author__ = 'Agustin Benassi'
 __email__ = 'agusbenassi@gmail.com'
 __version__ = '0.2.5'
 
+import sys
+
 from .xlseries import XlSeries
+
+# asyncio is only imported if the async interface is used (python 3.7+)
+_ASYNC_NAMES = ["AsyncXlSeries", "aget_data_frames"]
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _ASYNC_NAMES:
+            from . import async_xlseries
+            return getattr(async_xlseries, name)
+
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+
+    def __dir__():
+        return sorted(list(globals().keys()) + _ASYNC_NAMES)
+
+else:
+    from .async_xlseries import AsyncXlSeries, aget_data_frames
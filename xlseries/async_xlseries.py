@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+async_xlseries
+
+Asyncio interface to XlSeries, to use the package inside an event loop (eg.
+in an async web service) without blocking it. Loading the excel file and
+scraping its series are offloaded to an executor.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .xlseries import XlSeries
+
+
+class AsyncXlSeries(object):
+
+    """Scrape time data series from excel files without blocking the loop.
+
+    Every call loads its own excel file, so one AsyncXlSeries object can serve
+    many concurrent calls (eg. one for each uploaded file).
+
+    Attributes:
+        executor: Executor where loading and scraping are run.
+        max_concurrency: Maximum number of calls being processed at the same
+            time. Other calls wait their turn without using the executor.
+    """
+
+    def __init__(self, max_workers=None, max_concurrency=None, executor=None):
+        """Args:
+            max_workers (int): Maximum number of threads of the executor
+                created by the object. Ignored if an executor is passed.
+            max_concurrency (int): Maximum number of calls processed at the
+                same time. If None, the calls are only limited by the
+                executor workers.
+            executor (Executor): An executor to use instead of a new thread
+                pool. It won't be shut down when the object is closed. With a
+                ProcessPoolExecutor loading and scraping are done in one step
+                in the worker process.
+        """
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    # PUBLIC
+    async def get_data_frames(self, xl_source, params_path_or_obj,
+                              ws_name=None, safe_mode=False):
+        """Scrape time series from an excel file into a pandas.DataFrame.
+
+        If the call is cancelled while the file is being loaded, the scraping
+        is not started.
+
+        Args:
+            xl_source (str, bytes, file-like or Workbook): Path to an excel
+                file, its contents or a Workbook object. See XlSeries.
+            params_path_or_obj (str, dict or Parameters): Scraping parameters.
+            ws_name (str): Name of the worksheet that will be scraped.
+            safe_mode (bool): See XlSeries.get_data_frames.
+
+        Returns:
+            list: What XlSeries.get_data_frames returns.
+
+        Example:
+            async with AsyncXlSeries(max_concurrency=4) as async_series:
+                dfs = await async_series.get_data_frames(upload, params)
+        """
+        semaphore = self._get_semaphore()
+
+        if semaphore:
+            async with semaphore:
+                return await self._get_data_frames(
+                    xl_source, params_path_or_obj, ws_name, safe_mode)
+        else:
+            return await self._get_data_frames(
+                xl_source, params_path_or_obj, ws_name, safe_mode)
+
+    def close(self):
+        """Shut down the executor, if it was created by this object."""
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # PRIVATE
+    async def _get_data_frames(self, xl_source, params_path_or_obj, ws_name,
+                               safe_mode):
+        loop = asyncio.get_event_loop()
+
+        # objects sent to a process must be picklable, file-likes are not
+        if isinstance(self.executor, ProcessPoolExecutor):
+            if hasattr(xl_source, "read"):
+                xl_source = xl_source.read()
+            return await loop.run_in_executor(
+                self.executor, _load_and_get_data_frames, xl_source,
+                params_path_or_obj, ws_name, safe_mode)
+
+        return await _run_in_executor(loop, self.executor, xl_source,
+                                      params_path_or_obj, ws_name, safe_mode)
+
+    def _get_semaphore(self):
+        """Return the semaphore limiting the concurrent calls.
+
+        It is created the first time it is needed, because it must belong to
+        the running event loop."""
+
+        if not self.max_concurrency:
+            return None
+
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        return self._semaphore
+
+
+async def aget_data_frames(xl_source, params_path_or_obj, ws_name=None,
+                           safe_mode=False):
+    """Scrape time series from an excel file in the loop's default executor.
+
+    See AsyncXlSeries.get_data_frames for the arguments. Use an AsyncXlSeries
+    object to have control over the executor and the concurrency.
+    """
+    loop = asyncio.get_event_loop()
+    return await _run_in_executor(loop, None, xl_source, params_path_or_obj,
+                                  ws_name, safe_mode)
+
+
+async def _run_in_executor(loop, executor, xl_source, params_path_or_obj,
+                           ws_name, safe_mode):
+    """Load the excel file and scrape it as two separated executor jobs."""
+    from openpyxl import Workbook
+
+    series = await loop.run_in_executor(executor, XlSeries, xl_source)
+
+    # only a workbook passed by the user needs to be preserved
+    get_data_frames = functools.partial(
+        series.get_data_frames, params_path_or_obj, ws_name=ws_name,
+        safe_mode=safe_mode,
+        preserve_wb_obj=isinstance(xl_source, Workbook))
+    return await loop.run_in_executor(executor, get_data_frames)
+
+
+def _load_and_get_data_frames(xl_source, params_path_or_obj, ws_name,
+                              safe_mode):
+    """Load and scrape an excel file, inside a worker process."""
+
+    return XlSeries(xl_source).get_data_frames(
+        params_path_or_obj, ws_name=ws_name, safe_mode=safe_mode,
+        preserve_wb_obj=False)
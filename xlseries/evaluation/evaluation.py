@@ -4,7 +4,156 @@
 """
 evaluation
 
-TODO: This module has to be implemented. It will be responsible of evaluate
-data frames built by the existent strategies and asign a score based on some
-metaheruistic criteria.
+This module evaluates the data frames built by the strategies, assigning them
+a score between 0 and 1 based on some heuristic criteria about how well
+scraped time series usually look like:
+    - not_nan: Ratio of values that are not missing.
+    - monotonic_index: The time index grows without repeated values.
+    - continuity: Ratio of consecutive values that don't jump much more than
+        the series usually does.
+    - headers: Ratio of column names that look like series names (not blank,
+        not numbers and not repeated).
+    - coverage: Ratio of the rows (or columns) of the worksheet after the
+        beginning of the data that have a period in the data frames. It is
+        only evaluated if that number of rows is known, and it is low when
+        the data frames stop before the data does.
+
+The score is used by ParameterDiscovery to rank the results of different
+attempts and to stop trying attempts once a result is good enough.
 """
+
+from __future__ import division
+import numpy as np
+import pandas as pd
+
+# weight of each criteria in the score
+WEIGHTS = {"not_nan": 0.2,
+           "monotonic_index": 0.2,
+           "continuity": 0.15,
+           "headers": 0.15,
+           "coverage": 0.3}
+
+# a change between consecutive values larger than this many times the median
+# change of the series is taken as a jump
+JUMP_FACTOR = 10
+
+
+def evaluate_data_frames(dfs, data_extent=None):
+    """Evaluate data frames with each criteria.
+
+    Args:
+        dfs (DataFrame or list): One or many data frames scraped from the
+            same worksheet.
+        data_extent (int): Number of rows (or columns) of the worksheet from
+            the beginning of the data to its end. If None, the coverage is
+            not evaluated.
+
+    Returns:
+        dict: {criteria: score} with the score of each criteria evaluated and
+            the global "score". Data frames are weighted by their number of
+            values.
+    """
+    if isinstance(dfs, pd.DataFrame):
+        dfs = [dfs]
+    if not dfs:
+        return {"score": 0.0}
+
+    evaluations = [_evaluate_data_frame(df) for df in dfs]
+    sizes = np.array([df.size for df in dfs], dtype=float)
+    if not sizes.sum():
+        sizes = None
+
+    evaluation = {}
+    for criteria in evaluations[0]:
+        evaluation[criteria] = float(np.average(
+            [df_evaluation[criteria] for df_evaluation in evaluations],
+            weights=sizes))
+
+    if data_extent:
+        evaluation["coverage"] = _coverage_score(dfs, data_extent)
+
+    evaluation["score"] = sum(
+        WEIGHTS[criteria] * evaluation[criteria] for
+        criteria in evaluation) / sum(WEIGHTS[criteria] for
+                                      criteria in evaluation)
+
+    return evaluation
+
+
+def score_data_frames(dfs, data_extent=None):
+    """Return the score (between 0 and 1) of data frames.
+
+    Args:
+        dfs (DataFrame or list): One or many data frames scraped from the
+            same worksheet.
+        data_extent (int): See evaluate_data_frames.
+    """
+    return evaluate_data_frames(dfs, data_extent)["score"]
+
+
+def _evaluate_data_frame(df):
+    values = df.apply(pd.to_numeric, errors="coerce").values.astype(float)
+
+    return {"not_nan": _not_nan_score(values),
+            "monotonic_index": _monotonic_index_score(df.index),
+            "continuity": _continuity_score(values),
+            "headers": _headers_score(df.columns)}
+
+
+def _not_nan_score(values):
+    if not values.size:
+        return 0.0
+
+    return 1.0 - np.isnan(values).mean()
+
+
+def _monotonic_index_score(index):
+    return float(index.is_monotonic_increasing and index.is_unique)
+
+
+def _continuity_score(values):
+    """Return the ratio of changes between consecutive values of each column
+    that are not jumps."""
+
+    # missing values don't break the continuity, they are scored apart
+    changes = [np.abs(np.diff(column[~np.isnan(column)])) for
+               column in values.T]
+    changes = [column_changes for column_changes in changes if
+               len(column_changes)]
+    if not changes:
+        return 1.0
+
+    num_jumps = 0
+    num_changes = 0
+    for column_changes in changes:
+        median_change = np.median(column_changes)
+        if median_change:
+            num_jumps += np.count_nonzero(
+                column_changes > JUMP_FACTOR * median_change)
+        num_changes += len(column_changes)
+
+    return 1.0 - num_jumps / num_changes
+
+
+def _coverage_score(dfs, data_extent):
+    num_periods = sum(len(df.index) for df in dfs)
+    return min(1.0, num_periods / data_extent)
+
+
+def _headers_score(columns):
+    if not len(columns):
+        return 0.0
+
+    names = [str(column).strip() for column in columns]
+    good_names = [name for name in names if name and
+                  not _is_number(name) and names.count(name) == 1]
+
+    return len(good_names) / len(names)
+
+
+def _is_number(name):
+    try:
+        float(name)
+        return True
+    except ValueError:
+        return False
@@ -20,16 +20,88 @@ as well.
 from pprint import pprint
 import arrow
 import datetime
-import parsley
 import collections
 from unidecode import unidecode
+import re
 import sys
 
 from xlseries.utils.time_manipulation import increment_time
+from xlseries.utils import instrumentation
 import xlseries.utils.strategies_helpers
 
 PYTHON2 = sys.version_info[0] == 2
 
+# month names used by some publishers that are not in the arrow locales
+CUSTOM_MONTH_NAMES = {"set": 9, "sept": 9, "setiembre": 9}
+
+# {normalized month name or abbreviation: month number}, built the first time
+# a month name is parsed
+_month_numbers = {}
+
+# {strategy class: parsley grammar}, each grammar is built only once
+_grammars = {}
+
+
+def _make_grammar(grammar_source, bindings):
+    """Return a parsley grammar.
+
+    parsley is imported here because grammars are only used to parse composed
+    time values."""
+    import parsley
+    return parsley.makeGrammar(grammar_source, bindings)
+
+
+def register_month_names(month_names):
+    """Add month names (or abbreviations) to the ones recognized when parsing
+    composed monthly time values.
+
+    Args:
+        month_names (dict): {month name: month number}. Names are matched
+            ignoring case, accents and a trailing dot.
+
+    Example:
+        register_month_names({"mzo": 3, "agto": 8})
+    """
+    month_numbers = _get_month_numbers()
+    for month_name, month_num in month_names.items():
+        month_numbers[_normalize_month_name(month_name)] = month_num
+
+
+def _get_month_numbers():
+    """Return the lookup table of month names, building it if needed.
+
+    Every name and abbreviation of the arrow locales is included. If a name
+    means different months in different locales, the first locale wins."""
+
+    if not _month_numbers:
+        month_numbers = {}
+        locales = (arrow.locales.__dict__[l] for l in vars(arrow.locales) if
+                   l[-6:] == "Locale")
+        for locale in locales:
+            for names in [locale.month_names, locale.month_abbreviations]:
+                # most locales start their lists with a blank name, so
+                # months are numbered by their index, but not all of them
+                if names and not names[0]:
+                    names = names[1:]
+                if len(names) != 12:
+                    continue
+
+                for month_num, month_name in enumerate(names, 1):
+                    month_numbers.setdefault(
+                        _normalize_month_name(month_name), month_num)
+
+        for month_name, month_num in CUSTOM_MONTH_NAMES.items():
+            month_numbers[_normalize_month_name(month_name)] = month_num
+
+        _month_numbers.update(month_numbers)
+
+    return _month_numbers
+
+
+def _normalize_month_name(month_name):
+    return unidecode(str(month_name)).strip().rstrip(".").lower()
+
+
 # EXCEPTIONS
 
 
@@ -342,6 +414,7 @@ class ParseSimpleTime(BaseParseTimeStrategy):
                 continue
 
             else:
+                self.time_format = time_format
                 break
 
         if not isinstance(time_value, arrow.Arrow):
@@ -414,9 +487,55 @@ class ParseSimpleTime(BaseParseTimeStrategy):
 
 class BasePEG(BaseParseTimeStrategy):
 
+    """Base class for strategies parsing time strings with a parsley grammar.
+
+    SIGNATURE is a compiled regular expression that every string accepted by
+    the grammar of the strategy matches (a necessary condition, not a
+    sufficient one). Strings that don't match it are rejected without running
+    the grammar. Strategies whose grammar doesn't require any particular
+    substring leave it as None."""
+
+    SIGNATURE = None
+
     def __init__(self):
         self.grammar = None
 
+        # {time string: date elements parsed}, time indexes repeat a small
+        # vocabulary of strings ("I *", "Ene.") and only the holes filled
+        # with the last time value differ between them
+        self.date_elements = {}
+
+    @classmethod
+    def get_parsley_grammar(cls):
+        """Return the grammar of the strategy, building it only once."""
+
+        if cls not in _grammars:
+            _grammars[cls] = cls.make_parsley_grammar()
+
+        return _grammars[cls]
+
+    @classmethod
+    def _grammar_accepts(cls, curr_time):
+        """Check if the grammar of the strategy can parse a time string.
+
+        Args:
+            curr_time (str): String time to be parsed.
+
+        Returns:
+            bool: True if the string matches the signature of the strategy
+                and the grammar parses it.
+        """
+
+        if cls.SIGNATURE and not cls.SIGNATURE.search(curr_time):
+            instrumentation.count("parse_time_signature_rejections")
+            return False
+
+        try:
+            cls.get_parsley_grammar()(curr_time).date()
+        except Exception:
+            return False
+        return True
+
     def _parse_date_elements(self, curr_time):
         """Parse any date elements found in curr_time.
 
@@ -428,11 +547,18 @@ class BasePEG(BaseParseTimeStrategy):
                 others could be None.
         """
 
+        if curr_time in self.date_elements:
+            instrumentation.count("parse_time_elements_reused")
+            return self.date_elements[curr_time]
+
         # create grammar only if not already created
         if not self.grammar:
-            self.grammar = self.make_parsley_grammar()
+            self.grammar = self.get_parsley_grammar()
+
+        date_elements = self.grammar(curr_time).date()
+        self.date_elements[curr_time] = date_elements
 
-        return self.grammar(curr_time).date()
+        return date_elements
 
 
 class BaseComposedQuarter():
@@ -444,11 +570,7 @@ class BaseComposedQuarter():
     def _accepts(cls, params, curr_time, last_time=None, next_time=None):
 
         if params["time_composed"] and params["frequency"] == "Q":
-            try:
-                cls.make_parsley_grammar()(curr_time).date()
-            except:
-                return False
-            return True
+            return cls._grammar_accepts(curr_time)
         else:
             return False
 
@@ -515,10 +637,13 @@ class ParseComposedQuarter1(BaseComposedQuarter, BasePEG):
     1987-10-01T00:00:00+00:00
     """
 
+    # a quarter as a roman numeral or a digit from 1 to 4
+    SIGNATURE = re.compile(r"[IV1-4]")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
             not_d_or_q = anything:x ?(x not in "0123456789IV()")
             q_str = ('I' | 'V'):q -> q
             q_int = digit:q ?(q in "1234") -> int(q)
@@ -555,10 +680,13 @@ class ParseComposedQuarter2(BasePEG, BaseComposedQuarter):
     1964-07-01T00:00:00+00:00
     """
 
+    # a 4 digits year
+    SIGNATURE = re.compile(r"\d{4}")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 separator = anything:x ?(x in "-/.T ")
                 not_digit = anything:x ?(x not in "0123456789-/. ")
                 ref = ws '(' digit{1, 3} ')' ws | '*'
@@ -591,10 +719,13 @@ class ParseComposedQuarter3(BasePEG, BaseComposedQuarter):
     2008-01-01T00:00:00+00:00
     """
 
+    # a quarter digit followed by a 2 digits year
+    SIGNATURE = re.compile(r"\d\D*\d{2}")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 not_digit = anything:x ?(x not in "0123456789 ")
 
                 q = not_digit* ws digit:q not_digit* ws -> int(q)
@@ -630,7 +761,7 @@ class ParseComposedQuarter4(BasePEG, BaseComposedQuarter):
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 separator = anything:x ?(x in "-/.T ")
                 not_digit = anything:x ?(x not in "0123456789-/. ")
                 ref = ws '(' digit{1, 3} ')' ws | '*'
@@ -672,16 +803,12 @@ class ParseComposedYearQuarter1(BasePEG, BaseComposedQuarter):
         if not (params["time_composed"] and params["frequency"] == "AQQQQ"):
             return False
 
-        try:
-            cls.make_parsley_grammar()(curr_time).date()
-            return True
-        except:
-            return False
+        return cls._grammar_accepts(curr_time)
 
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
             not_digit = anything:x ?(x not in "0123456789")
             not_d_or_q = anything:x ?(x not in "0123456789IV()")
             q_letter = ('I' | 'V'):q -> q
@@ -723,11 +850,7 @@ class ParseComposedQuarterYear1(ParseComposedYearQuarter1):
         if not (params["time_composed"] and params["frequency"] == "QQQQA"):
             return False
 
-        try:
-            cls.make_parsley_grammar()(curr_time).date()
-            return True
-        except:
-            return False
+        return cls._grammar_accepts(curr_time)
 
     @classmethod
     def _fill_parse_date_holes(cls, result, last_time):
@@ -772,11 +895,7 @@ class BaseComposedSemester():
     def _accepts(cls, params, curr_time, last_time=None, next_time=None):
 
         if params["time_composed"] and params["frequency"] == "S":
-            try:
-                cls.make_parsley_grammar()(curr_time).date()
-            except:
-                return False
-            return True
+            return cls._grammar_accepts(curr_time)
         else:
             return False
 
@@ -832,7 +951,7 @@ class ParseComposedSemester(BasePEG, BaseComposedSemester):
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 separator = anything:x ?(x in "-/.S ")
                 not_digit = anything:x ?(x not in "0123456789-/. ")
                 ref = ws '(' digit{1, 3} ')' ws | '*'
@@ -856,11 +975,7 @@ class BaseComposedMonth():
         if not (params["time_composed"] and params["frequency"] == "M"):
             return False
 
-        try:
-            cls.make_parsley_grammar()(curr_time).date()
-            return True
-        except:
-            return False
+        return cls._grammar_accepts(curr_time)
 
     @classmethod
     def _month_str_to_num(cls, month_str):
@@ -874,16 +989,10 @@ class BaseComposedMonth():
         9
         >>> BaseComposedMonth._month_str_to_num("septiembre")
         9
+        >>> BaseComposedMonth._month_str_to_num("Set.")
+        9
         """
-
-        loc_iter = (arrow.locales.__dict__[l] for l in vars(arrow.locales)
-                    if l[-6:] == "Locale")
-        for local in loc_iter:
-            month_num = local().month_number(month_str.capitalize())
-            if month_num:
-                break
-
-        return month_num
+        return _get_month_numbers().get(_normalize_month_name(month_str))
 
 
 class ParseComposedMonth1(BasePEG, BaseComposedMonth):
@@ -915,10 +1024,13 @@ class ParseComposedMonth1(BasePEG, BaseComposedMonth):
     1991-07-01T00:00:00+00:00
     """
 
+    # a month name (or abbreviation) of at least 3 letters
+    SIGNATURE = re.compile(r"[^\W\d_]{3}")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 not_digit = anything:x ?(x not in "0123456789 ")
                 not_d_or_p = anything:x ?(x not in "0123456789()")
                 sep = ws anything:x ws ?(x in ".-/,")
@@ -967,10 +1079,13 @@ class ParseComposedMonth2(BasePEG, BaseComposedMonth):
     1991-06-01T00:00:00+00:00
     """
 
+    # a month number
+    SIGNATURE = re.compile(r"\d")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 not_digit = anything:x ?(x not in "0123456789")
 
                 y = (ws | not_digit) <digit{4}>:y (ws | not_digit) -> y
@@ -995,11 +1110,7 @@ class BaseComposedYear():
         if not (params["time_composed"] and params["frequency"] == "A"):
             return False
 
-        try:
-            cls.make_parsley_grammar()(curr_time).date()
-            return True
-        except:
-            return False
+        return cls._grammar_accepts(curr_time)
 
 
 class ParseComposedYear1(BasePEG, BaseComposedYear):
@@ -1027,10 +1138,13 @@ class ParseComposedYear1(BasePEG, BaseComposedYear):
     1999-01-01T00:00:00+00:00
     """
 
+    # a 4 digits year
+    SIGNATURE = re.compile(r"\d{4}")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 not_digit = anything:x ?(x not in "0123456789")
                 not_d_or_p = anything:x ?(x not in "0123456789()")
                 ref = not_d_or_p* '(' digit{1, 3} ')' not_d_or_p*
@@ -1064,10 +1178,13 @@ class ParseComposedYear2(BasePEG, BaseComposedYear):
     1998-01-01T00:00:00+00:00
     """
 
+    # a 4 digits year followed by the 2 digits of the next
+    SIGNATURE = re.compile(r"\d{4}/\d{2}")
+
     @classmethod
     def make_parsley_grammar(cls):
         """Return a parsley parsing expression grammar."""
-        return parsley.makeGrammar("""
+        return _make_grammar("""
                 not_digit = anything:x ?(x not in "0123456789")
                 not_d_or_p = anything:x ?(x not in "0123456789()")
                 ref = not_d_or_p* '(' digit{1, 3} ')' not_d_or_p*
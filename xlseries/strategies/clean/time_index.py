@@ -19,14 +19,30 @@ from pprint import pprint
 from pprint import pformat
 from openpyxl.utils import get_column_letter, column_index_from_string
 import datetime
+import itertools
 
 from xlseries.strategies.clean.parse_time import DayOutOfRange, MonthOutOfRange
 from xlseries.strategies.clean.parse_time import NoTimeValue
 from xlseries.strategies.clean.parse_time import NoPossibleTimeValue
 import xlseries.utils.strategies_helpers
 from xlseries.utils.time_manipulation import increment_time
+from xlseries.utils import instrumentation
+import xlseries.utils.table_segments as table_segments
 import xlseries.strategies.clean.parse_time as parse_time_strategies
 
+# parameters deciding which strategy cleans a time index, with a value that
+# represents each side of the condition used by the strategies
+DISPATCH_PARAMS = [("blank_rows", (False, True)),
+                   ("continuity", (False, True)),
+                   ("data_ends", (None, 1)),
+                   ("time_multicolumn", (False, True)),
+                   ("time_alignment", (0, 1)),
+                   ("frequency", ("M", "AQQQQ"))]
+
+# combination classes and dispatch table, built the first time they are used
+_combinations = []
+_dispatch_table = {}
+
 
 # CUSTOM EXCEPTIONS
 class BaseProgressionError(ValueError):
@@ -100,13 +116,23 @@ class BaseCleanTiStrategy(object):
     def __init__(self, time_parser=None):
         self.time_parser = time_parser
 
+        # work done, reported to the active Stats object (if any)
+        self.cells_read = 0
+        self.cells_written = 0
+        self.parser_reused = 0
+        self.parser_searches = 0
+        self.parse_strategies_tried = 0
+
     # PUBLIC INTERFACE
     @classmethod
     def accepts(cls, ws, params):
         return cls._accepts(ws, params)
 
     def clean_time_index(self, ws, params):
-        return self._clean_time_index(ws, params)
+        try:
+            return self._clean_time_index(ws, params)
+        finally:
+            self._count_work()
 
     # PRIVATE main methods
     @classmethod
@@ -128,6 +154,7 @@ class BaseCleanTiStrategy(object):
         last_time = None
         no_time_value_count = 0
         for curr_time, next_time, write_time_cell in iter_time_index:
+            self.cells_read += 1
 
             # only clean if the value is expected to be a time value
             if self._must_be_time_value(curr_time, next_time, last_time):
@@ -151,14 +178,19 @@ class BaseCleanTiStrategy(object):
                         raise SameTimeValue(curr_time, last_time)
 
                     # write the clean value to the spreadsheet
+                    if not write_time_cell.value:
+                        table_segments.forget_segments(ws)
                     write_time_cell.value = curr_time.datetime
+                    self.cells_written += 1
                     last_time = curr_time
 
                 # this is the only case that _must_be_time_value is not
                 # expected to avoid before calling _parse_time, it's a mistake
                 # of the excel designers in the time index
                 except (DayOutOfRange, MonthOutOfRange):
+                    table_segments.forget_segments(ws)
                     write_time_cell.value = None
+                    self.cells_written += 1
 
                 except (ParseTimeImplementationError, NoPossibleTimeValue,
                         NoTimeValue, SameTimeValue, AssertionError):
@@ -184,6 +216,14 @@ class BaseCleanTiStrategy(object):
         return self._estimate_end(p["alignment"], write_time_cell,
                                   p["data_starts"], p["time_alignment"])
 
+    def _count_work(self):
+        instrumentation.count("time_cells_read", self.cells_read)
+        instrumentation.count("time_cells_written", self.cells_written)
+        instrumentation.count("parse_time_parser_reused", self.parser_reused)
+        instrumentation.count("parse_time_searches", self.parser_searches)
+        instrumentation.count("parse_time_strategies_tried",
+                              self.parse_strategies_tried)
+
     @classmethod
     def _must_be_time_value(cls, value, next_time, last_time):
         return ((value is not None) and (len(str(value).strip()) > 0))
@@ -225,32 +265,57 @@ class BaseCleanTiStrategy(object):
 
         if alignment == "vertical":
             end = end or cls._get_row_boundary(ws, time_header_coord, ini)
-            for row in range(ini, end + 1):
-                curr_time = cls._get_time_value(ws, time_header_coord,
-                                                f_row=row)
-                next_time = cls._get_time_value(ws, time_header_coord,
-                                                f_row=row + 1)
-                col = cls._time_header_cell(ws, time_header_coord).column
-                write_time_cell = ws[col + str(row)]
-
-                yield (curr_time, next_time, write_time_cell)
-
         elif alignment == "horizontal":
             end = end or cls._get_column_boundary(ws, time_header_coord, ini)
-            for col in range(ini, end + 1):
-                curr_time = cls._get_time_value(ws, time_header_coord,
-                                                f_col=get_column_letter(col))
-                next_time = cls._get_time_value(
-                    ws, time_header_coord, f_col=get_column_letter(col + 1))
-                row = cls._time_header_cell(ws, time_header_coord).row
-                write_time_cell = ws.cell(column=col, row=row)
-
-                yield (curr_time, next_time, write_time_cell)
-
         else:
             raise Exception("Series alignment must be 'vertical' or " +
                             "'horizontal', not " + repr(alignment))
 
+        # time values are read once and go through a sliding window, where
+        # each one is the next time value and then the current one
+        time_values = cls._get_time_values(ws, alignment, time_header_coord,
+                                           ini, end + 1)
+        header_cell = cls._time_header_cell(ws, time_header_coord)
+        header_col = column_index_from_string(header_cell.column)
+
+        for i_value, position in enumerate(range(ini, end + 1)):
+            if alignment == "vertical":
+                write_time_cell = ws.cell(row=position, column=header_col)
+            else:
+                write_time_cell = ws.cell(row=header_cell.row,
+                                          column=position)
+
+            yield (time_values[i_value], time_values[i_value + 1],
+                   write_time_cell)
+
+    @classmethod
+    def _get_time_values(cls, ws, alignment, time_header_coord, ini, last):
+        """Returns the time values from ini to last (row or column)."""
+
+        if alignment == "vertical":
+            return [cls._get_time_value(ws, time_header_coord, f_row=row) for
+                    row in range(ini, last + 1)]
+        else:
+            return [cls._get_time_value(ws, time_header_coord,
+                                        f_col=get_column_letter(col)) for
+                    col in range(ini, last + 1)]
+
+    @classmethod
+    def _read_line(cls, ws, alignment, coord, ini, last):
+        """Returns the values of the column (or row) of a cell, from ini to
+        last."""
+
+        cell = ws[coord]
+        if alignment == "vertical":
+            col = column_index_from_string(cell.column)
+            cells = ws.iter_rows(min_row=ini, max_row=last, min_col=col,
+                                 max_col=col)
+        else:
+            cells = ws.iter_rows(min_row=cell.row, max_row=cell.row,
+                                 min_col=ini, max_col=last)
+
+        return [line_cell.value for line in cells for line_cell in line]
+
     @classmethod
     def _get_row_boundary(cls, ws, time_header_coord, ini):
         """Returns the pressumed last row of a column."""
@@ -295,6 +360,7 @@ class BaseCleanTiStrategy(object):
                 time_value = self.time_parser.parse_time(params, curr_time,
                                                          last_time, next_time)
                 assert isinstance(time_value, arrow.Arrow), msg
+                self.parser_reused += 1
 
                 return time_value
 
@@ -305,7 +371,9 @@ class BaseCleanTiStrategy(object):
                 pass
         # import pdb; pdb.set_trace()
         # if last parser doesn't work (or there is None), search again
+        self.parser_searches += 1
         for strategy in parse_time_strategies.get_strategies():
+            self.parse_strategies_tried += 1
             # print("Considering strategy....: {}".format(strategy))
             if strategy.accepts(params, curr_time, last_time, next_time):
                 self.time_parser = strategy()
@@ -499,19 +567,19 @@ class BaseMultiTable():
 
     @classmethod
     def _get_row_boundary(cls, ws, time_header_coord, ini):
-        """Returns the last non empty row of a table, not the worksheet."""
-        i = 0
-        while ws[time_header_coord].offset(row=i).value:
-            i += 1
-        return ws[time_header_coord].offset(row=i).row
+        """Returns the first empty row after the time header (the end of its
+        table), not the last row of the worksheet."""
+        cell = cls._time_header_cell(ws, time_header_coord)
+        return table_segments.get_segments(ws).block_end(
+            ws, "vertical", cell.row, column_index_from_string(cell.column))
 
     @classmethod
     def _get_column_boundary(cls, ws, time_header_coord, ini):
-        """Returns the last non empty column of a table, not the worksheet."""
-        i = 0
-        while ws[time_header_coord].offset(column=i).value:
-            i += 1
-        return ws[time_header_coord].offset(column=i).column
+        """Returns the first empty column after the time header (the end of
+        its table), not the last column of the worksheet."""
+        cell = cls._time_header_cell(ws, time_header_coord)
+        return table_segments.get_segments(ws).block_end(
+            ws, "horizontal", cell.row, column_index_from_string(cell.column))
 
 
 class BaseSingleColumn():
@@ -523,6 +591,13 @@ class BaseSingleColumn():
     def _accepts(cls, ws, params):
         return not params["time_multicolumn"]
 
+    @classmethod
+    def _get_time_values(cls, ws, alignment, time_header_coord, ini, last):
+        assert not isinstance(
+            time_header_coord, list), "Time header should be a str."
+
+        return cls._read_line(ws, alignment, time_header_coord, ini, last)
+
     @classmethod
     def _get_time_value(cls, ws, time_header_coord, f_row=None, f_col=None):
         """Returns the time value corresponding a certain series and row."""
@@ -544,6 +619,30 @@ class BaseMultipleColumns():
     def _accepts(cls, ws, params):
         return params["time_multicolumn"]
 
+    @classmethod
+    def _get_time_values(cls, ws, alignment, time_header_coord, ini, last):
+        """Returns the time values from ini to last (row or column).
+
+        Each time header column is read once, and the values of each row are
+        concatenated in a unique string."""
+        assert isinstance(time_header_coord,
+                          list), "Time header should be a list."
+
+        columns = [cls._read_line(ws, alignment, coord, ini, last) for
+                   coord in time_header_coord]
+
+        msg = "there shouldn't be time values in multicolumn!"
+        assert not any(isinstance(value, datetime.datetime) for
+                       column in columns for value in column), msg
+
+        time_values = []
+        for values in zip(*columns):
+            time_value = " ".join(cls._safe_str(value) for value in values if
+                                  value and value != "None")
+            time_values.append(time_value if time_value.strip() else None)
+
+        return time_values
+
     @classmethod
     def _get_time_value(cls, ws, time_header_coord, f_row=None, f_col=None):
         """Returns the time value corresponding a certain series and row.
@@ -684,6 +783,76 @@ class BaseMultiFrequency():
 def get_strategies():
     custom = xlseries.utils.strategies_helpers.get_strategies()
 
+    if not _combinations:
+        _combinations.extend(_make_combinations())
+
+    return custom + _combinations
+
+
+def get_strategy(params):
+    """Return the strategy that cleans the time index of a series.
+
+    Strategies only look at a few parameters to accept a time index, so the
+    strategy chosen for every combination of them is computed once.
+
+    Args:
+        params (dict): Parameters of one series.
+
+    Returns:
+        The first strategy (in get_strategies order) accepting the
+            parameters or None if no strategy accepts them.
+    """
+    if not _dispatch_table:
+        _dispatch_table.update(_make_dispatch_table())
+
+    return _dispatch_table[dispatch_key(params)]
+
+
+def dispatch_key(params):
+    """Return the values of the parameters that decide the strategy."""
+    return (bool(params["blank_rows"]),
+            bool(params["continuity"]),
+            bool(params["data_ends"]),
+            bool(params["time_multicolumn"]),
+            params["time_alignment"] != 0,
+            len(params["frequency"]) > 1)
+
+
+def uncovered_combinations():
+    """Return the parameters combinations that no strategy accepts.
+
+    Returns:
+        list: Dictionaries with a value of each parameter in DISPATCH_PARAMS.
+    """
+    return [params for params in _iter_dispatch_params() if
+            not get_strategy(params)]
+
+
+def _iter_dispatch_params():
+    names = [name for name, values in DISPATCH_PARAMS]
+    for values in itertools.product(*[values for name, values in
+                                      DISPATCH_PARAMS]):
+        yield dict(zip(names, values))
+
+
+def _make_dispatch_table():
+    """Choose a strategy for every combination of DISPATCH_PARAMS.
+
+    The accepts conditions of the strategies only use the parameters, so
+    they are evaluated without a worksheet."""
+
+    strategies = get_strategies()
+
+    dispatch_table = {}
+    for params in _iter_dispatch_params():
+        dispatch_table[dispatch_key(params)] = next(
+            (strategy for strategy in strategies if
+             strategy.accepts(None, params)), None)
+
+    return dispatch_table
+
+
+def _make_combinations():
     combinations = []
     for table in [BaseSingleTable, BaseMultiTable]:
         for offset in [BaseNoOffsetTi, BaseOffsetTi]:
@@ -702,8 +871,10 @@ def get_strategies():
 
                     combinations.append(parser)
 
-    return custom + combinations
+    return combinations
 
 
 if __name__ == '__main__':
     pprint(sorted(xlseries.utils.strategies_helpers.get_strategies_names()))
+    print("Parameters combinations without a strategy:")
+    pprint(uncovered_combinations())
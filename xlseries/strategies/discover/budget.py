@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+budget
+
+This module contains the limits of time and number of attempts that the
+ParameterDiscovery strategy can spend trying combinations of missing
+parameters, to scrape even pathological files with a bounded latency.
+"""
+
+import time
+
+
+class AttemptsBudget(object):
+
+    """Time and number of attempts that can be spent trying parameters.
+
+    The budget is checked before starting each attempt. An attempt already
+    started is never interrupted, so the time budget may be exceeded by the
+    duration of the last attempt.
+
+    Attributes:
+        time_budget (float): Seconds that can be spent, None means no limit.
+        max_attempts (int): Attempts that can be started, None means no
+            limit.
+        attempts (int): Attempts started so far.
+        skipped (int): Attempts not run because the budget ran out.
+    """
+
+    def __init__(self, time_budget=None, max_attempts=None):
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("time_budget must be a positive number of " +
+                             "seconds, not " + repr(time_budget))
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1, not " +
+                             repr(max_attempts))
+
+        self.time_budget = time_budget
+        self.max_attempts = max_attempts
+        self.attempts = 0
+        self.skipped = 0
+        self.start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def exhausted(self):
+        if self.max_attempts is not None and \
+                self.attempts >= self.max_attempts:
+            return True
+
+        return self.time_budget is not None and \
+            self.elapsed() >= self.time_budget
+
+    def spend(self):
+        self.attempts += 1
+
+    def skip(self, num_attempts):
+        self.skipped += num_attempts
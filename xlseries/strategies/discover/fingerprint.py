@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+fingerprint
+
+This module computes a fingerprint of the layout of a worksheet, so files made
+with the same template (eg. the releases of the same publisher) can be grouped
+and scraped with the ExtractionPlan compiled from the first one, without
+discovering parameters again.
+
+Only the top left corner of the worksheet is read, where templates put their
+headers and the beginning of the data. The fingerprint is made of:
+    - The position of the first numeric block: its first row and the columns
+        with numbers in it.
+    - The texts of the headers over the numeric block.
+    - The pattern of the first values of the time index (digits and letters
+        masked), see token_pattern.
+    - The shapes of the merged cells.
+New periods or new values don't change any of those, while moving, renaming
+or adding series does.
+"""
+
+import datetime
+import hashlib
+import io
+import json
+import re
+
+import numpy as np
+from openpyxl.utils import get_column_letter
+
+from xlseries.strategies.discover.layout import type_grid
+from xlseries.strategies.discover.layout import NUMBER, STRING, DATE
+from xlseries.utils import instrumentation
+
+# size of the top left corner of the worksheet that is read
+FINGERPRINT_ROWS = 40
+FINGERPRINT_COLS = 30
+
+# number of values of the time index used to describe its pattern
+TIME_PATTERN_LENGTH = 12
+
+DIGITS = re.compile(r"\d", re.UNICODE)
+LETTERS = re.compile(r"[^\W\d_]", re.UNICODE)
+
+
+# EXCEPTIONS
+class IndexNotCompatible(ValueError):
+
+    """Raised when a layout index can't be used with this version of the
+    package."""
+
+    def __init__(self, version):
+        msg = u"The layout index has version {version}, not {expected}."
+        super(IndexNotCompatible, self).__init__(msg.format(
+            version=version, expected=LayoutIndex.VERSION))
+
+
+class LayoutIndex(object):
+
+    """Extraction plans compiled for each layout of worksheet.
+
+    Attributes:
+        plans (dict): {fingerprint: ExtractionPlan}
+    """
+
+    VERSION = 1
+
+    def __init__(self, plans=None):
+        self.plans = plans or {}
+
+    def __len__(self):
+        return len(self.plans)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.plans
+
+    # PUBLIC
+    def get_plan(self, ws):
+        """Return the plan compiled for the layout of a worksheet, or None."""
+
+        plan = self.plans.get(layout_fingerprint(ws))
+        instrumentation.count("layout_index_hits" if plan else
+                              "layout_index_misses")
+
+        return plan
+
+    def add(self, ws, plan):
+        """Add the plan compiled from a worksheet for its layout."""
+        self.plans[layout_fingerprint(ws)] = plan
+
+    def to_dict(self):
+        return {"version": self.VERSION,
+                "plans": {fingerprint: plan.to_dict() for
+                          fingerprint, plan in self.plans.items()}}
+
+    @classmethod
+    def from_dict(cls, index_dict):
+        from xlseries.strategies.plan import ExtractionPlan
+
+        if index_dict.get("version") != cls.VERSION:
+            raise IndexNotCompatible(index_dict.get("version"))
+
+        return cls({fingerprint: ExtractionPlan.from_dict(plan_dict) for
+                    fingerprint, plan_dict in index_dict["plans"].items()})
+
+    def save(self, path):
+        """Save the index to a JSON file."""
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), indent=4, sort_keys=True,
+                               ensure_ascii=False))
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from a JSON file."""
+        with io.open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# PUBLIC
+def layout_fingerprint(ws):
+    """Return a key of the layout of a worksheet, without any parameter.
+
+    Args:
+        ws (Worksheet): Worksheet to fingerprint, before cleaning it.
+
+    Returns:
+        str: A hexadecimal hash.
+    """
+    with instrumentation.stage("layout_fingerprint"):
+        grid, years = type_grid(ws, FINGERPRINT_ROWS, FINGERPRINT_COLS)
+
+        numbers = (grid == NUMBER) & (years == 0)
+        if numbers.any():
+            block_row = int(numbers.any(axis=1).argmax())
+            block_cols = np.flatnonzero(numbers[block_row]).tolist()
+        else:
+            block_row, block_cols = grid.shape[0], []
+
+        layout = [[block_row, block_cols],
+                  _headers(ws, grid, block_row),
+                  _time_pattern(ws, grid, years, block_row, block_cols),
+                  _merged_shapes(ws)]
+
+        return hashlib.sha1(json.dumps(layout, ensure_ascii=False).encode(
+            "utf-8")).hexdigest()
+
+
+def token_pattern(value):
+    """Return the pattern of a value of a time index.
+
+    Digits are replaced by "9" and letters by "a", so "Ene. 1991" and
+    "Feb. 1992" have the same pattern ("aaa. 9999"). Values that are not
+    strings are described by their type."""
+
+    if isinstance(value, str):
+        return LETTERS.sub("a", DIGITS.sub("9", value.strip()))
+    elif isinstance(value, (datetime.datetime, datetime.date)):
+        return "date"
+    else:
+        return type(value).__name__
+
+
+def time_pattern(ws, row, column, alignment):
+    """Return the patterns of the first values of a time index, see
+    token_pattern. Empty cells are skipped.
+
+    Args:
+        ws (Worksheet): Worksheet with the time index.
+        row (int): Row of the first value of the time index.
+        column (int): Column of the first value of the time index.
+        alignment (str): "vertical" or "horizontal".
+    """
+
+    if alignment == "vertical":
+        last = min(row + TIME_PATTERN_LENGTH - 1, ws.max_row)
+        cells = [(position, column) for position in range(row, last + 1)]
+    else:
+        last = min(column + TIME_PATTERN_LENGTH - 1, ws.max_column)
+        cells = [(row, position) for position in range(column, last + 1)]
+
+    # cells out of the worksheet are not read, to avoid creating them
+    values = [ws.cell(row=row, column=column).value for row, column in cells]
+    return [token_pattern(value) for value in values if
+            value is not None and str(value).strip()]
+
+
+# PRIVATE
+def _headers(ws, grid, block_row):
+    """Return the coordinates and texts of the strings over the numeric
+    block."""
+
+    headers = []
+    for i_row, i_col in zip(*np.nonzero(grid[:block_row] == STRING)):
+        cell = ws.cell(row=int(i_row) + 1, column=int(i_col) + 1)
+        headers.append([cell.coordinate, str(cell.value).strip()])
+
+    return headers
+
+
+def _time_pattern(ws, grid, years, block_row, block_cols):
+    """Return the pattern of the first values of the time index, taken as the
+    column (or row) with most dates in the read corner."""
+
+    dates = (grid == DATE) | (years != 0)
+    if not dates.any():
+        return []
+
+    if dates.sum(axis=0).max() >= dates.sum(axis=1).max():
+        col = int(dates.sum(axis=0).argmax())
+        return time_pattern(ws, block_row + 1, col + 1, "vertical")
+    else:
+        row = int(dates.sum(axis=1).argmax())
+        first_col = min(block_cols) if block_cols else 0
+        return time_pattern(ws, row + 1, first_col + 1, "horizontal")
+
+
+def _merged_shapes(ws):
+    """Return the position and size of the merged cells in the read corner."""
+
+    # read only worksheets don't have merged cells
+    merged_cells = getattr(ws, "merged_cells", None)
+    if not merged_cells:
+        return []
+
+    return sorted(
+        [get_column_letter(cell_range.min_col) + str(cell_range.min_row),
+         cell_range.max_row - cell_range.min_row + 1,
+         cell_range.max_col - cell_range.min_col + 1]
+        for cell_range in merged_cells.ranges if
+        cell_range.min_row <= FINGERPRINT_ROWS and
+        cell_range.min_col <= FINGERPRINT_COLS)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+history
+
+This module keeps the values of the missing parameters that ParameterDiscovery
+found for each layout of worksheet, in a JSON file on local disk. When a
+worksheet with a known layout is scraped again (eg. the next release of the
+same spreadsheet), the values that worked last time are tried first.
+
+It also counts how often the default value of each parameter worked, to try
+first the parameters whose default value is most likely in the files of the
+user.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from xlseries.strategies.discover.fingerprint import time_pattern
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".xlseries",
+                            "params_history.json")
+
+
+# EXCEPTIONS
+class HistoryNotCompatible(ValueError):
+
+    """Raised when a history file can't be used with this version of the
+    package."""
+
+    def __init__(self, path, version):
+        msg = u"The parameters history in {path} has version {version}, " + \
+            "not {expected}."
+        super(HistoryNotCompatible, self).__init__(msg.format(
+            path=path, version=version, expected=ParamsHistory.VERSION))
+
+
+class ParamsHistory(object):
+
+    """Values of the missing parameters that worked in each layout.
+
+    Attributes:
+        path (str): JSON file where the history is saved.
+        layouts (dict): {fingerprint: {"ws_name": ws_name, "params":
+            {param_name: value, or list with the value of each series}}}
+        defaults (dict): {param_name: [times the default value worked,
+            times the parameter was discovered]}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_PATH
+        self.layouts = {}
+        self.defaults = {}
+
+        if os.path.exists(self.path):
+            self._load()
+
+    # PUBLIC
+    def get(self, fingerprint):
+        """Return the parameter values that worked for a layout, or None."""
+        if fingerprint in self.layouts:
+            return self.layouts[fingerprint]["params"]
+
+    def record(self, fingerprint, params, param_names, ws_name=None):
+        """Record the values of some parameters that worked for a layout and
+        save the history.
+
+        Args:
+            fingerprint (str): Key of the layout, see params_fingerprint.
+            params (Parameters): Parameters that scraped the worksheet.
+            param_names (list): Names of the parameters that were discovered.
+            ws_name (str): Name of the worksheet, only for reference.
+        """
+        values = {}
+        for param_name in param_names:
+            param_values = params[param_name]
+            if all(value == param_values[0] for value in param_values):
+                values[param_name] = param_values[0]
+            else:
+                values[param_name] = param_values
+
+            default_value = params.DEFAULT_VALUES[param_name]
+            default_counts = self.defaults.setdefault(param_name, [0, 0])
+            default_counts[0] += sum(value == default_value for
+                                     value in param_values)
+            default_counts[1] += len(param_values)
+
+        self.layouts[fingerprint] = {"ws_name": ws_name, "params": values}
+        self.save()
+
+    def default_ratio(self, param_name):
+        """Return the ratio of times the default value of a parameter worked.
+
+        Parameters without records are taken as if their default value always
+        worked."""
+
+        default_wins, total = self.defaults.get(param_name, [0, 0])
+        return (default_wins + 1.0) / (total + 1.0)
+
+    def default_ratios(self):
+        """Return {param_name: default_ratio} of the recorded parameters."""
+        return {param_name: self.default_ratio(param_name) for
+                param_name in self.defaults}
+
+    def likeliness_order(self, likeliness_order):
+        """Return parameters ordered by how often their default value worked.
+
+        Parameters without records are taken as if their default value always
+        worked, so without any record the order doesn't change.
+
+        Args:
+            likeliness_order (list): Names of the parameters, in their prior
+                order of likeliness.
+        """
+        return sorted(likeliness_order,
+                      key=lambda param_name: -self.default_ratio(param_name))
+
+    def save(self):
+        """Save the history to its JSON file."""
+
+        history_dir = os.path.dirname(self.path)
+        if history_dir and not os.path.isdir(history_dir):
+            os.makedirs(history_dir)
+
+        with io.open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": self.VERSION,
+                                "layouts": self.layouts,
+                                "defaults": self.defaults},
+                               indent=4, sort_keys=True, ensure_ascii=False))
+
+    # PRIVATE
+    def _load(self):
+        with io.open(self.path, encoding="utf-8") as f:
+            history = json.load(f)
+
+        if history.get("version") != self.VERSION:
+            raise HistoryNotCompatible(self.path, history.get("version"))
+
+        self.layouts = history["layouts"]
+        self.defaults = history["defaults"]
+
+
+def params_fingerprint(ws, params):
+    """Return a key of the layout of a worksheet.
+
+    The key is made of the name of the worksheet, the texts of the headers
+    of the series and the pattern of the first values of each time index, so
+    next releases of the same spreadsheet (with more periods or new values)
+    get the same key.
+
+    Args:
+        ws (Worksheet): Worksheet to scrape, before cleaning it.
+        params (Parameters): Parameters passed by the user.
+
+    Returns:
+        str: A hexadecimal hash.
+    """
+    headers = [_value_str(ws[header_coord].value) for
+               header_coord in params["headers_coord"]]
+
+    # alignment may be still missing, the default one is used then
+    alignments = params["alignment"] or (
+        [params.DEFAULT_VALUES["alignment"]] * len(params["data_starts"]))
+
+    time_signatures = []
+    for time_header_coord, alignment, data_starts in sorted(set(
+            (_first_coord(time_header_coord), alignment, data_starts) for
+            time_header_coord, alignment, data_starts in
+            zip(params["time_header_coord"], alignments,
+                params["data_starts"]))):
+        header_cell = ws[time_header_coord]
+        if alignment == "vertical":
+            pattern = time_pattern(ws, data_starts, header_cell.col_idx,
+                                   alignment)
+        else:
+            pattern = time_pattern(ws, header_cell.row, data_starts,
+                                   alignment)
+        time_signatures.append([time_header_coord, data_starts, pattern])
+
+    layout = json.dumps([ws.title, headers, time_signatures],
+                        ensure_ascii=False)
+    return hashlib.sha1(layout.encode("utf-8")).hexdigest()
+
+
+def _first_coord(time_header_coord):
+    if isinstance(time_header_coord, list):
+        return time_header_coord[0]
+    return time_header_coord
+
+
+def _value_str(value):
+    if value is None:
+        return ""
+    return str(value).strip()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+layout
+
+This module discovers the layout parameters of simple worksheets (alignment,
+time_header_coord, headers_coord and data_starts) when the user doesn't
+provide them.
+
+The worksheet is read only once, classifying each cell as empty, number,
+string or date into a grid of codes. Everything else is computed with NumPy
+over that grid:
+    - The time index is the row or column with most date cells.
+    - The data starts in the first date of the time index that has numbers
+        beside it.
+    - The series are the columns (or rows) that are mostly numbers along the
+        dates of the time index.
+    - The header of each series is the first string found going up (or left)
+        from the beginning of the data.
+
+Worksheets with many tables, multicolumn time indexes or time indexes
+without recognizable dates are not discovered, the user has to provide the
+layout parameters for them.
+
+The frequency is inferred from the values of the time index that are already
+dates (or years), when they are most of its values.
+"""
+
+import datetime
+import math
+import re
+
+import numpy as np
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+
+from xlseries.strategies.discover.parameters import Parameters
+from xlseries.strategies.discover.parameters import CriticalParameterMissing
+from xlseries.utils import instrumentation
+from xlseries.utils.time_manipulation import infer_frequency
+from xlseries.utils.time_manipulation import FrequencyNotInferred
+
+# codes of the kinds of cells in the grid
+EMPTY = 0
+NUMBER = 1
+STRING = 2
+DATE = 3
+
+# integer numbers in this range may be years of a time index
+YEARS_RANGE = (1800, 2200)
+
+# a series must have numbers in at least this ratio of the time index dates
+MIN_NUMBERS_RATIO = 0.3
+
+# integer numbers are taken as years if they increase along most of a row or
+# column, like the years of a time index do
+MIN_INCREASING_RATIO = 0.9
+
+# the frequency is inferred only if most of the time index values are dates
+MIN_DATES_RATIO = 0.5
+
+LAYOUT_PARAMS = ["time_header_coord", "headers_coord", "data_starts"]
+
+DATE_LIKE_STRING = re.compile(
+    r"(^|\D)(1[89]|20)\d\d($|\D)|"
+    r"\b(ene|feb|mar|abr|may|jun|jul|ago|sep|set|oct|nov|dic|jan|apr|aug|"
+    r"dec)[a-z]*\b|"
+    r"\btrim|\bsem\b|\bq[1-4]\b|\b[1-4] ?[°ºo] ?t",
+    re.IGNORECASE | re.UNICODE)
+
+
+# EXCEPTIONS
+class LayoutNotDiscovered(ValueError):
+
+    """Raised when the layout of a worksheet can't be discovered."""
+
+    def __init__(self, reason):
+        msg = u"The layout of the worksheet couldn't be discovered: " + \
+            u"{reason}".format(reason=reason)
+        super(LayoutNotDiscovered, self).__init__(msg)
+
+
+# PUBLIC
+def discover_layout(ws):
+    """Discover the layout parameters of a worksheet with one table.
+
+    Args:
+        ws (Worksheet): Worksheet to discover.
+
+    Returns:
+        dict: With "alignment", "time_header_coord", "headers_coord" (a list)
+            and "data_starts" parameters.
+
+    Raises:
+        LayoutNotDiscovered: If the layout of the worksheet isn't simple
+            enough to be discovered.
+    """
+    with instrumentation.stage("discover_layout"):
+        grid, years = type_grid(ws)
+        if not grid.size:
+            raise LayoutNotDiscovered("the worksheet is empty")
+
+        dates = _date_marks(grid, years)
+        alignment = _discover_alignment(dates)
+        if alignment == u"horizontal":
+            grid, dates = grid.T, dates.T
+
+        time_col, time_rows = _discover_time_index(dates)
+        data_row = _discover_data_starts(grid, time_col, time_rows)
+        time_rows = time_rows[time_rows >= data_row]
+        series_cols = _discover_series(grid, time_col, time_rows)
+        header_rows = _discover_headers(grid, data_row, series_cols)
+
+        # series without a header can't be named
+        series_cols = series_cols[header_rows >= 0]
+        header_rows = header_rows[header_rows >= 0]
+        if not len(series_cols):
+            raise LayoutNotDiscovered("no headers were found over the data")
+
+        # the time header is in the row where most of the headers are
+        time_header_row = int(np.bincount(header_rows).argmax())
+
+        coord = _horizontal_coord if alignment == u"horizontal" else _coord
+        return {"alignment": alignment,
+                "time_header_coord": coord(time_header_row, time_col),
+                "headers_coord": [coord(row, col) for row, col in
+                                  zip(header_rows, series_cols)],
+                "data_starts": int(data_row) + 1}
+
+
+def discover_frequency(ws, alignment, time_header_coord, data_starts):
+    """Infer the frequency of a time index from its values.
+
+    Args:
+        ws (Worksheet): Worksheet with the time index.
+        alignment (str): "vertical" or "horizontal".
+        time_header_coord (str): Coordinate of the time index header.
+        data_starts (int): Row (or column) where the time values start.
+
+    Returns:
+        str: The frequency of the time index, like "M" or "AQQQQ".
+
+    Raises:
+        FrequencyNotInferred: If most of the time values are not dates or
+            they don't follow a known frequency.
+    """
+    with instrumentation.stage("discover_frequency"):
+        col_letter, row = coordinate_from_string(time_header_coord)
+        if alignment == u"horizontal":
+            cells = ws.iter_rows(min_row=row, max_row=row,
+                                 min_col=data_starts,
+                                 max_col=ws.max_column)
+        else:
+            col = column_index_from_string(col_letter)
+            cells = ws.iter_rows(min_row=data_starts, max_row=ws.max_row,
+                                 min_col=col, max_col=col)
+        values = [cell.value for line in cells for cell in line if
+                  _cell_kind(cell.value)[0] != EMPTY]
+
+        times = [_as_date(value) for value in values]
+        times = [time for time in times if time]
+        if len(times) < MIN_DATES_RATIO * len(values):
+            raise FrequencyNotInferred("most time values are not dates")
+
+        return infer_frequency(times)
+
+
+def complete_layout_params(params_input, ws):
+    """Discover the layout parameters missing in the user input.
+
+    Only the missing layout parameters are discovered, the ones provided by
+    the user are always kept. If the frequency is missing, it is inferred
+    from the values of the time index.
+
+    Args:
+        params_input (str, dict or Parameters): Scraping parameters, as passed
+            by the user.
+        ws (Worksheet): Worksheet that will be scraped with the parameters.
+
+    Returns:
+        The same params_input if it is None, a Parameters object or it has
+            all the layout parameters. Otherwise, a parameters dict with the
+            missing layout parameters discovered.
+
+    Raises:
+        CriticalParameterMissing: If a layout parameter is missing and the
+            layout of ws can't be discovered.
+    """
+    if params_input is None or isinstance(params_input, Parameters):
+        return params_input
+
+    params_dict = Parameters._get_params_dict(params_input)
+    missing = [param_name for param_name in LAYOUT_PARAMS if
+               params_dict.get(param_name) is None]
+    if not missing and params_dict.get("frequency"):
+        return params_input
+
+    if missing:
+        try:
+            layout = discover_layout(ws)
+        except LayoutNotDiscovered:
+            raise CriticalParameterMissing(missing[0])
+
+        for param_name in missing:
+            params_dict[param_name] = layout[param_name]
+
+        # the discovered alignment is only meaningful with discovered headers
+        if "headers_coord" in missing and not params_dict.get("alignment"):
+            params_dict["alignment"] = layout["alignment"]
+
+    if not params_dict.get("frequency"):
+        params_dict["frequency"] = _complete_frequency(params_dict, ws)
+
+    return params_dict
+
+
+def type_grid(ws, max_row=None, max_col=None):
+    """Classify each cell of a worksheet with one pass over its values.
+
+    Args:
+        ws (Worksheet): Worksheet to classify.
+        max_row (int): Classify only the rows up to this one.
+        max_col (int): Classify only the columns up to this one.
+
+    Returns:
+        tuple: (grid, years) Two arrays with the shape of the worksheet (or
+            of its classified part). The grid has the kind code of each cell
+            and years has the value of the numeric cells that may be a year
+            (0 elsewhere).
+    """
+    num_rows = min(max_row or ws.max_row, ws.max_row)
+    num_cols = min(max_col or ws.max_column, ws.max_column)
+    grid = np.zeros((num_rows, num_cols), dtype=np.int8)
+    years = np.zeros((num_rows, num_cols), dtype=np.int16)
+
+    for i_row, row in enumerate(ws.iter_rows(max_row=num_rows,
+                                             max_col=num_cols)):
+        for i_col, cell in enumerate(row):
+            kind, year = _cell_kind(cell.value)
+            grid[i_row, i_col] = kind
+            years[i_row, i_col] = year
+
+    return grid, years
+
+
+# PRIVATE
+def _cell_kind(value):
+    """Return the kind code of a value and its year, if it may be one."""
+
+    if value is None:
+        return EMPTY, 0
+
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return DATE, 0
+
+    if isinstance(value, bool):
+        return STRING, 0
+
+    if isinstance(value, (int, float)):
+        return NUMBER, _as_year(value)
+
+    string = str(value).strip()
+    if not string:
+        return EMPTY, 0
+
+    try:
+        number = float(string.replace(",", "."))
+    except ValueError:
+        pass
+    else:
+        return NUMBER, _as_year(number)
+
+    if DATE_LIKE_STRING.search(string):
+        return DATE, 0
+
+    return STRING, 0
+
+
+def _complete_frequency(params_dict, ws):
+    """Infer the frequency of the only time index of the parameters."""
+
+    time_header_coord = params_dict["time_header_coord"]
+    if not isinstance(time_header_coord, str) or "-" in time_header_coord:
+        raise CriticalParameterMissing("frequency")
+
+    alignment = params_dict.get("alignment")
+    if not alignment:
+        headers_coord = Parameters._process_headers_coord(
+            params_dict["headers_coord"])[1]
+        alignment = (Parameters._guess_alignment(headers_coord) or
+                     Parameters.DEFAULT_VALUES["alignment"])
+
+    try:
+        return discover_frequency(ws, alignment.lower(), time_header_coord,
+                                  params_dict["data_starts"])
+    except FrequencyNotInferred:
+        raise CriticalParameterMissing("frequency")
+
+
+def _as_date(value):
+    """Return the date of a time value, if it is a date or a year."""
+
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        year = _as_year(value)
+        if year:
+            return datetime.date(year, 1, 1)
+
+    return None
+
+
+def _as_year(number):
+    # float() also parses texts like "NaN" or "inf", which are never years
+    if (math.isfinite(number) and number == int(number) and
+            YEARS_RANGE[0] <= number <= YEARS_RANGE[1]):
+        return int(number)
+
+    return 0
+
+
+def _date_marks(grid, years):
+    """Mark the dates of the grid.
+
+    Integer numbers that may be years are taken as dates if they increase
+    along their row or column, like the years of a time index do."""
+
+    return ((grid == DATE) | _increasing_years(years) |
+            _increasing_years(years.T).T)
+
+
+def _increasing_years(years):
+    """Mark the numbers that may be years in the columns where they increase
+    most of the time."""
+
+    marks = np.zeros(years.shape, dtype=bool)
+    for i_col in np.flatnonzero(np.count_nonzero(years, axis=0) > 1):
+        rows = np.flatnonzero(years[:, i_col])
+        increasing = np.diff(years[rows, i_col]) > 0
+        if increasing.mean() >= MIN_INCREASING_RATIO:
+            marks[rows, i_col] = True
+
+    return marks
+
+
+def _discover_alignment(dates):
+    """The time index goes along the columns if a column has more dates than
+    any row."""
+
+    if not dates.any():
+        raise LayoutNotDiscovered("no dates were found")
+
+    if dates.sum(axis=0).max() >= dates.sum(axis=1).max():
+        return u"vertical"
+    else:
+        return u"horizontal"
+
+
+def _discover_time_index(dates):
+    """Return the column of the time index and the rows with its dates."""
+
+    time_col = int(dates.sum(axis=0).argmax())
+    time_rows = np.flatnonzero(dates[:, time_col])
+
+    return time_col, time_rows
+
+
+def _discover_data_starts(grid, time_col, time_rows):
+    """Return the first row of the time index with numbers beside the date."""
+
+    numbers = grid[time_rows] == NUMBER
+    numbers[:, time_col] = False
+
+    with_numbers = numbers.any(axis=1)
+    if not with_numbers.any():
+        raise LayoutNotDiscovered("there are no numbers beside the dates")
+
+    return int(time_rows[with_numbers.argmax()])
+
+
+def _discover_series(grid, time_col, time_rows):
+    """Return the columns that are mostly numbers along the time index."""
+
+    numbers_ratio = (grid[time_rows] == NUMBER).mean(axis=0)
+    numbers_ratio[time_col] = 0
+
+    series_cols = np.flatnonzero(numbers_ratio >= MIN_NUMBERS_RATIO)
+    if not len(series_cols):
+        raise LayoutNotDiscovered("no column has numbers along the dates")
+
+    return series_cols
+
+
+def _discover_headers(grid, data_row, series_cols):
+    """Return the row of the last string over the data of each column, or -1
+    if there is none."""
+
+    strings = grid[:data_row, series_cols] == STRING
+    if not strings.size:
+        return np.full(len(series_cols), -1, dtype=int)
+
+    last_string = data_row - 1 - strings[::-1].argmax(axis=0)
+    return np.where(strings.any(axis=0), last_string, -1)
+
+
+def _coord(row, col):
+    return u"{}{}".format(get_column_letter(int(col) + 1), int(row) + 1)
+
+
+def _horizontal_coord(row, col):
+    """Coordinate of a cell of the transposed grid."""
+    return _coord(col, row)
@@ -22,6 +22,7 @@ import collections
 
 import xlseries.utils.strategies_helpers
 from xlseries.utils.time_manipulation import increment_time
+from xlseries.utils import instrumentation
 
 
 class BaseGetDataStrategy(object):
@@ -105,7 +106,9 @@ class BaseGetDataStrategy(object):
                                             p["data_ends"])
 
         values_dict = collections.OrderedDict()
+        cells_read = 0
         for value, index in iter_values:
+            cells_read += 1
             try:
                 new_value = self._handle_new_value(list(values_dict.values()), value,
                                                    p["missings"],
@@ -123,6 +126,7 @@ class BaseGetDataStrategy(object):
                 if frequency not in values_dict:
                     values_dict[frequency] = []
                 values_dict[frequency].append(new_value)
+        instrumentation.count("data_cells_read", cells_read)
 
         # fill the missing values if they are implicit
         # it doesn't work with multifrequency series
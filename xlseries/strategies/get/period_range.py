@@ -13,10 +13,19 @@ looking for accepting or refusing certain input.
 
 from pprint import pprint
 from openpyxl.utils import column_index_from_string
+import numpy as np
 import pandas as pd
 
 import xlseries.utils.strategies_helpers
 from xlseries.utils.xl_methods import normalize_value, normalize_time_value
+from xlseries.utils import instrumentation
+
+# period ranges already built, by (freq, start, end), whose values are shared
+# by every data frame with the same one
+_period_ranges = {}
+
+# the cache is emptied when it has this number of period ranges
+MAX_PERIOD_RANGES = 1000
 
 
 class BaseGetPeriodRangesStrategy(object):
@@ -45,6 +54,33 @@ class BaseGetPeriodRangesStrategy(object):
         }
         return translator.get(freq, freq)
 
+    @classmethod
+    def _period_range(cls, start, end, freq):
+        """Return the period range from start to end, building it only once.
+
+        Every call returns a new view of the same values, so the names given
+        to the index of a data frame don't change the others.
+
+        Args:
+            start: First time value of the time index.
+            end: Last time value of the time index.
+            freq (str): Frequency of the time index, as pandas uses it.
+        """
+        key = (freq, normalize_time_value(start), normalize_time_value(end))
+
+        # the cache is shared between threads, another one may clear it
+        # between storing the range and returning it
+        period_range = _period_ranges.get(key)
+        if period_range is None:
+            period_range = pd.date_range(key[1], key[2], freq=freq)
+            if len(_period_ranges) >= MAX_PERIOD_RANGES:
+                _period_ranges.clear()
+            _period_ranges[key] = period_range
+        else:
+            instrumentation.count("period_ranges_reused")
+
+        return period_range.view()
+
 
 class GetPeriodRangesSingleFrequency(BaseGetPeriodRangesStrategy):
 
@@ -74,11 +110,33 @@ class GetPeriodRangesSingleFrequency(BaseGetPeriodRangesStrategy):
             raise Exception("Series alignment must be 'vertical' or " +
                             "'horizontal', not " + repr(alignment))
 
-        return [pd.date_range(
-            normalize_time_value(start),
-            normalize_time_value(end),
-            freq=cls._convert_freq(freq)
-        )]
+        freq = cls._convert_freq(freq)
+        if freq == "D" and cls._business_days(start, end,
+                                              data_ends - data_starts + 1):
+            freq = "B"
+
+        return [cls._period_range(start, end, freq)]
+
+    @staticmethod
+    def _business_days(start, end, num_periods):
+        """Check if a clean daily time index has only business days.
+
+        A time index skipping the weekends has as many periods as weekdays
+        there are from its first to its last day, and less than the days of
+        the calendar.
+
+        Args:
+            start: First day of the time index.
+            end: Last day of the time index.
+            num_periods (int): Number of periods of the time index.
+        """
+        start = pd.Timestamp(normalize_time_value(start)).date()
+        end = pd.Timestamp(normalize_time_value(end)).date()
+
+        calendar_days = (end - start).days + 1
+        business_days = int(np.busday_count(start, end)) + (end.weekday() < 5)
+
+        return num_periods == business_days < calendar_days
 
 
 class GetPeriodRangesMultifrequency(BaseGetPeriodRangesStrategy):
@@ -151,13 +209,8 @@ class GetPeriodRangesMultifrequency(BaseGetPeriodRangesStrategy):
             raise Exception("Series alignment must be 'vertical' or " +
                             "'horizontal', not " + repr(alignment))
 
-        return [
-            pd.date_range(
-                normalize_time_value(starts[f]),
-                normalize_time_value(ends[f]),
-                freq=cls._convert_freq(f))
-            for f in starts
-        ]
+        return [cls._period_range(starts[f], ends[f], cls._convert_freq(f))
+                for f in starts]
 
 
 def get_strategies():
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+plan
+
+Extraction plans compile the parameters that successfully scraped a worksheet
+together with the strategies chosen for each series. Files with the same
+layout (eg. monthly releases of the same publisher) can be scraped executing
+the plan, without discovering parameters or selecting strategies again.
+"""
+
+import copy
+import io
+import json
+from collections import OrderedDict
+
+import xlseries.strategies.strategies as strategies
+import xlseries.strategies.clean.time_index as clean_ti_strategies
+import xlseries.strategies.clean.parse_time as parse_time_strategies
+import xlseries.strategies.get.data as get_data_strategies
+import xlseries.strategies.get.period_range as get_pr_strategies
+from xlseries.utils.xl_methods import make_ws_copy
+from xlseries.utils import instrumentation
+
+
+# EXCEPTIONS
+class PlanNotCompatible(ValueError):
+
+    """Raised when a plan can't be used with this version of the package."""
+
+    def __init__(self, reason):
+        msg = u"The extraction plan can't be used: {reason}".format(
+            reason=reason)
+        super(PlanNotCompatible, self).__init__(msg)
+
+
+class ExtractionPlan(object):
+
+    """Strategies and parameters to scrape worksheets with the same layout.
+
+    Attributes:
+        time_indexes (list): One dict for each time index with the series that
+            use it, the name of the strategy cleaning it and the time parser
+            (and time format) that parsed it when the plan was compiled.
+        series (list): One dict for each series with its parameters and the
+            names of the strategies getting its data and period ranges.
+        ws_name (str): Name of the worksheet the plan was compiled from.
+    """
+
+    VERSION = 1
+
+    def __init__(self, time_indexes, series, ws_name=None):
+        self.time_indexes = time_indexes
+        self.series = series
+        self.ws_name = ws_name
+
+        self._check_strategies()
+
+    # PUBLIC
+    @classmethod
+    def compile(cls, ws, params, estimate_ends=None):
+        """Compile a plan from the parameters that scraped a worksheet.
+
+        The worksheet is not modified, the strategies are run over a copy to
+        find the time parser of each time index.
+
+        Args:
+            ws (Worksheet): Worksheet successfully scraped with params.
+            params (Parameters): Complete parameters used to scrape ws.
+            estimate_ends (list): For each series, True if the end of the
+                data must be estimated in every worksheet the plan is executed
+                on (ie. it wasn't passed by the user). By default the data
+                ends in params are kept.
+
+        Returns:
+            ExtractionPlan: A plan to scrape worksheets with the layout of ws.
+        """
+        ws_copy = make_ws_copy(ws)
+        series_params = [params[i_series] for i_series in
+                         range(len(params.headers_coord))]
+        estimate_ends = estimate_ends or [False] * len(series_params)
+
+        time_indexes = []
+        for indexes in cls._group_by_time_index(series_params):
+            strategy = clean_ti_strategies.get_strategy(
+                series_params[indexes[0]])
+            cleaner = strategy()
+            cleaner.clean_time_index(ws_copy, series_params[indexes[0]])
+
+            time_parser = cleaner.time_parser
+            time_indexes.append({
+                "series": indexes,
+                "strategy": strategy.__name__,
+                "time_parser": (time_parser.__class__.__name__ if
+                                time_parser else None),
+                "time_format": getattr(time_parser, "time_format", None)
+            })
+
+        series = []
+        scraper = strategies.ParameterDiscovery
+        for params_series, estimate_end in zip(series_params, estimate_ends):
+            strategy = scraper._get_data_strategy(ws_copy, params_series)
+            pr_strategy = scraper._get_pr_strategy(ws_copy,
+                                                   params_series["frequency"])
+
+            params_series = copy.deepcopy(params_series)
+            if estimate_end:
+                params_series["data_ends"] = None
+
+            series.append({"params": params_series,
+                           "get_data_strategy": strategy.__name__,
+                           "period_range_strategy": pr_strategy.__name__})
+
+        return cls(time_indexes, series, ws.title)
+
+    def execute(self, ws):
+        """Scrape a worksheet following the plan.
+
+        Args:
+            ws (Worksheet): A worksheet with the layout of the plan. It will
+                be modified while cleaning its time indexes.
+
+        Returns:
+            list: A list of pandas.DataFrame objects, one for each frequency.
+        """
+        series_params = [copy.deepcopy(series["params"]) for series in
+                         self.series]
+
+        for time_index in self.time_indexes:
+            cleaner = self._strategy(clean_ti_strategies,
+                                     time_index["strategy"])(
+                time_parser=self._time_parser(time_index))
+
+            indexes = time_index["series"]
+            with instrumentation.stage("clean_time_index"):
+                end = cleaner.clean_time_index(ws, series_params[indexes[0]])
+
+            for i_series in indexes:
+                if not series_params[i_series]["data_ends"]:
+                    series_params[i_series]["data_ends"] = end
+
+        scraper = strategies.ParameterDiscovery
+        dfs_dict = OrderedDict()
+        for series, params_series in zip(self.series, series_params):
+            names_and_values, prs = scraper._get_series_data(
+                ws, params_series,
+                self._strategy(get_data_strategies,
+                               series["get_data_strategy"]),
+                self._strategy(get_pr_strategies,
+                               series["period_range_strategy"]))
+            scraper._add_series_data(dfs_dict, prs, names_and_values)
+
+        return scraper._build_data_frames(dfs_dict)
+
+    def to_dict(self):
+        return {"version": self.VERSION,
+                "ws_name": self.ws_name,
+                "time_indexes": copy.deepcopy(self.time_indexes),
+                "series": copy.deepcopy(self.series)}
+
+    @classmethod
+    def from_dict(cls, plan_dict):
+        if plan_dict.get("version") != cls.VERSION:
+            raise PlanNotCompatible("version {} is not {}".format(
+                plan_dict.get("version"), cls.VERSION))
+
+        return cls(plan_dict["time_indexes"], plan_dict["series"],
+                   plan_dict.get("ws_name"))
+
+    def save(self, path):
+        """Save the plan to a JSON file."""
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), indent=4, sort_keys=True,
+                               ensure_ascii=False))
+
+    @classmethod
+    def load(cls, path):
+        """Load a plan from a JSON file."""
+        with io.open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    # PRIVATE
+    @classmethod
+    def _group_by_time_index(cls, series_params):
+        """Return the indexes of the series grouped by the time index they
+        use, the same way ParameterDiscovery cleans them."""
+
+        # if time index is multicolumn, only one time index is allowed
+        if series_params[0]["time_multicolumn"]:
+            return [list(range(len(series_params)))]
+
+        groups = OrderedDict()
+        for i_series, params_series in enumerate(series_params):
+            groups.setdefault(params_series["time_header_coord"],
+                              []).append(i_series)
+
+        return list(groups.values())
+
+    def _check_strategies(self):
+        """Find every strategy named by the plan, failing if one is missing.
+
+        Found strategies are kept to avoid looking for them again."""
+
+        self._strategies = {}
+        for time_index in self.time_indexes:
+            self._strategy(clean_ti_strategies, time_index["strategy"])
+            if time_index["time_parser"]:
+                self._strategy(parse_time_strategies,
+                               time_index["time_parser"])
+
+        for series in self.series:
+            self._strategy(get_data_strategies, series["get_data_strategy"])
+            self._strategy(get_pr_strategies,
+                           series["period_range_strategy"])
+
+    def _strategy(self, strategies_module, name):
+        key = (strategies_module.__name__, name)
+
+        if key not in self._strategies:
+            for strategy in strategies_module.get_strategies():
+                if strategy.__name__ == name:
+                    self._strategies[key] = strategy
+                    break
+            else:
+                raise PlanNotCompatible("there is no strategy {} in {}".format(
+                    name, strategies_module.__name__))
+
+        return self._strategies[key]
+
+    def _time_parser(self, time_index):
+        """Return a new time parser ready to parse a time index."""
+
+        if not time_index["time_parser"]:
+            return None
+
+        time_parser = self._strategy(parse_time_strategies,
+                                     time_index["time_parser"])()
+        if time_index["time_format"]:
+            time_parser.time_format = time_index["time_format"]
+
+        return time_parser
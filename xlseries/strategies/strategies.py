@@ -14,14 +14,21 @@ from pprint import pprint
 import pandas as pd
 import numpy as np
 import copy
+import warnings
 
 import xlseries.utils.strategies_helpers
 from xlseries.strategies.discover.parameters import Parameters
+import xlseries.strategies.discover.budget as attempts_budget
+import xlseries.strategies.discover.layout as layout
+import xlseries.strategies.discover.history as params_history
 import xlseries.strategies.clean.time_index as clean_ti_strategies
 import xlseries.strategies.get.data as get_data_strategies
 import xlseries.strategies.get.period_range as get_pr_strategies
+import xlseries.evaluation.evaluation as evaluation
 from xlseries.utils.data_frame import compare_data_frames
+from xlseries.utils.data_frame import convert_data_frame, convert_values
 from xlseries.utils.xl_methods import make_ws_copy
+from xlseries.utils import instrumentation
 
 
 # EXCEPTIONS
@@ -31,6 +38,17 @@ class TimeIndexNotClean(Exception):
     pass
 
 
+class AttemptsBudgetExhausted(Exception):
+
+    """Raised if the budget ran out before any attempt succeeded."""
+
+    def __init__(self, num_attempts, num_skipped):
+        msg = "No result was found in {} attempts, {} attempts were " + \
+            "skipped because the time or attempts budget ran out."
+        super(AttemptsBudgetExhausted, self).__init__(
+            msg.format(num_attempts, num_skipped))
+
+
 # STRATEGIES
 class BaseXlSeriesScraper(object):
 
@@ -57,7 +75,8 @@ class BaseXlSeriesScraper(object):
         if isinstance(params_path_or_obj, Parameters):
             self.params = params_path_or_obj
         else:
-            self.params = Parameters(params_path_or_obj)
+            self.params = Parameters(layout.complete_layout_params(
+                params_path_or_obj, self.ws))
 
         if headers_validation:
             # remove header coordinates that don't have any cell value (blanks)
@@ -68,8 +87,37 @@ class BaseXlSeriesScraper(object):
     def accepts(cls, wb):
         return cls._accepts(wb)
 
-    def get_data_frames(self, safe_mode):
-        return self._get_data_frames(self.ws, self.params, safe_mode)
+    def get_data_frames(self, safe_mode, time_budget=None, max_attempts=None,
+                        confidence_threshold=None, per_series=False,
+                        history=None, dtype=None, clean_float_noise=False):
+        budget = attempts_budget.AttemptsBudget(time_budget, max_attempts)
+        dfs, params = self._get_data_frames(self.ws, self.params, safe_mode,
+                                            budget, confidence_threshold,
+                                            per_series, history)
+
+        # attempts are compared and scored with the values as scraped, only
+        # the results returned are converted
+        if dtype is not None or clean_float_noise:
+            with instrumentation.stage("convert_values"):
+                dfs = self._convert_data_frames(dfs, dtype, clean_float_noise)
+
+        return dfs, params
+
+    def iter_series(self, dtype=None, clean_float_noise=False):
+        for name, period_range, values in self._iter_series(self.ws,
+                                                            self.params):
+            yield name, period_range, convert_values(values, dtype,
+                                                     clean_float_noise)
+
+    @classmethod
+    def _convert_data_frames(cls, dfs, dtype, clean_float_noise):
+        """Convert the values of a data frame or of lists of them."""
+
+        if isinstance(dfs, list):
+            return [cls._convert_data_frames(df, dtype, clean_float_noise) for
+                    df in dfs]
+
+        return convert_data_frame(dfs, dtype, clean_float_noise)
 
 
 class ParameterDiscovery(BaseXlSeriesScraper):
@@ -84,6 +132,24 @@ class ParameterDiscovery(BaseXlSeriesScraper):
     same set of parameters as a way to characterize the excel file.
     """
 
+    # number of periods each attempt is probed on before running it in full
+    PROBE_SIZE = 50
+
+    # estimated relative cost of trying the non default value of a parameter
+    NON_DEFAULT_COSTS = {"time_composed": 3, "time_multicolumn": 2,
+                         "continuity": 2}
+
+    # parameters about the values of a series, that can be discovered for each
+    # series independently of the others
+    PER_SERIES_PARAMS = ["continuity", "blank_rows", "missings"]
+
+    # parameters that don't change the way a time index is cleaned
+    HEADER_PARAMS = ["headers_coord", "series_names", "composed_headers_coord",
+                     "context"]
+
+    # type of the values of the data frames
+    DATA_DTYPE = np.float64
+
     # PRIVATE INTERFACE METHODS
     @classmethod
     def _accepts(cls, wb):
@@ -91,15 +157,43 @@ class ParameterDiscovery(BaseXlSeriesScraper):
         return True
 
     @classmethod
-    def _get_data_frames(cls, ws, params, safe_mode):
+    def _get_data_frames(cls, ws, params, safe_mode, budget=None,
+                         confidence_threshold=None, per_series=False,
+                         history=None):
         """Extract time data series and return them as data frames."""
+        budget = budget or attempts_budget.AttemptsBudget()
+
+        # values that worked before in the same layout are tried first
+        seed, likeliness_order, default_ratios = None, None, None
+        if history is not None:
+            fingerprint = params_history.params_fingerprint(ws, params)
+            missings = cls._discover_missing_params(params)
+            seed = history.get(fingerprint)
+            likeliness_order = history.likeliness_order(
+                params.LIKELINESS_ORDER)
+            default_ratios = history.default_ratios()
+            if seed:
+                instrumentation.count("history_layouts_found")
+
+        if per_series and cls._get_series_missings(params):
+            dfs, params_found = cls._get_data_frames_per_series(
+                ws, params, safe_mode, budget, confidence_threshold, seed,
+                likeliness_order, default_ratios)
+            if history is not None:
+                history.record(fingerprint, params_found, missings, ws.title)
+            return dfs, params_found
 
         # FIRST: discover missing parameters generating attempts
-        attempts = cls._discover_parameters(ws, params)
+        with instrumentation.stage("discover_parameters"):
+            attempts = cls._discover_parameters(ws, params, seed,
+                                                likeliness_order,
+                                                default_ratios)
+        instrumentation.count("attempts_generated", len(attempts))
 
         # there is only one attempt, probably the user passed all the params
         if len(attempts) == 1:
             params = attempts[0]
+            instrumentation.count("attempts_executed")
 
             # SECOND: clean the data
             cls._clean_data(ws, params)
@@ -110,32 +204,23 @@ class ParameterDiscovery(BaseXlSeriesScraper):
 
         # there is multiple combinations of parameters to try
         else:
-            results = []
-            for params_attempt in attempts:
-                ws_temp = make_ws_copy(ws)
-
-                try:
-                    # SECOND: clean the data
-                    cls._clean_data(ws_temp, params_attempt)
-
-                    # THIRD: get the data from a cleaned worksheet
-                    dfs = cls._get_data(ws_temp, params_attempt)
-
-                    # don't return a list with only one element
-                    if isinstance(dfs, list) and len(dfs) == 1:
-                        dfs = dfs[0]
-                    if (isinstance(params_attempt, list) and
-                            len(params_attempt) == 1):
-                        params_attempt = params_attempt[0]
-
-                    results.append((dfs, params_attempt))
-
-                    # stops with the first successful result
-                    if not safe_mode:
-                        break
-
-                except:
-                    continue
+            # safe mode compares every attempt that works, so they are all
+            # run in full
+            results, rejected = cls._run_attempts(ws, attempts, safe_mode,
+                                                  budget, confidence_threshold,
+                                                  probe=not safe_mode)
+
+            # the probe could reject a valid attempt in unusual layouts, so
+            # rejected attempts are run in full if no other attempt succeeded
+            if not results and rejected:
+                results, rejected = cls._run_attempts(ws, rejected, safe_mode,
+                                                      budget,
+                                                      confidence_threshold,
+                                                      probe=False)
+            params_attempt = attempts[-1]
+
+            if budget.skipped:
+                instrumentation.count("attempts_skipped", budget.skipped)
 
             # remove duplicates
             unique_results = []
@@ -143,12 +228,7 @@ class ParameterDiscovery(BaseXlSeriesScraper):
                 repeated = False  # first result will not be repeated!
 
                 for unique_res in unique_results:
-                    repeated = True
-                    for df_a, df_b in zip(res[0], unique_res[0]):
-                        try:
-                            compare_data_frames(df_a, df_b)
-                        except AssertionError:
-                            repeated = False
+                    repeated = cls._same_data_frames(res[0], unique_res[0])
                     if repeated:
                         break
 
@@ -158,6 +238,10 @@ class ParameterDiscovery(BaseXlSeriesScraper):
 
             # return results
             if len(unique_results) == 0:
+                if budget.skipped:
+                    raise AttemptsBudgetExhausted(budget.attempts,
+                                                  budget.skipped)
+
                 raise Exception("""
 File couldn't be parsed with provided parameters:
 {}
@@ -165,8 +249,23 @@ File couldn't be parsed with provided parameters:
 Last attempt was:
 {}
 """.format(repr(params), repr(params_attempt)))
-            elif len(unique_results) == 1:
-                return unique_results[0]
+
+            if budget.skipped:
+                msg = ("{} of {} attempts were skipped because the time or "
+                       "attempts budget ran out, results found until then "
+                       "are returned.")
+                warnings.warn(msg.format(budget.skipped, len(attempts)))
+
+            # best scored results first
+            unique_results.sort(key=lambda res: res[2] or 0.0, reverse=True)
+            if not safe_mode:
+                unique_results = unique_results[:1]
+
+            if len(unique_results) == 1:
+                if history is not None:
+                    history.record(fingerprint, unique_results[0][1],
+                                   missings, ws.title)
+                return unique_results[0][:2]
 
             else:
                 print("There is more than one result with given parameters.")
@@ -174,21 +273,448 @@ Last attempt was:
                 params = [res[1] for res in unique_results]
                 return (dfs, params_attempt)
 
+    @classmethod
+    def _get_data_frames_per_series(cls, ws, params, safe_mode, budget,
+                                    confidence_threshold, seed=None,
+                                    likeliness_order=None,
+                                    default_ratios=None):
+        """Extract time data series discovering the missing PER_SERIES_PARAMS
+        of each series independently.
+
+        Combinations of all the missing parameters are tried on the first
+        series, as usual, to find the values of the parameters shared by the
+        whole worksheet. With those, the values of the per series parameters
+        are discovered for each series alone (see _discover_series) and the
+        worksheet is scraped once with the values chosen for every series. A
+        series that fails only retries its own values, instead of the whole
+        worksheet retrying every combination of values for all the series.
+
+        The values of seed that worked in the first series (or in each
+        series) before are tried first.
+        """
+
+        series_missings = cls._get_series_missings(params)
+        with instrumentation.stage("discover_parameters"):
+            combinations = cls._sorted_combinations(
+                cls._discover_missing_params(params), params,
+                cls._get_series_seed(seed, 0), likeliness_order,
+                default_ratios)
+            series_combinations = cls._sorted_combinations(
+                series_missings, params, likeliness_order=likeliness_order,
+                default_ratios=default_ratios)
+        instrumentation.count("attempts_generated", len(combinations))
+
+        # clean time indexes shared by the series, see _discover_series
+        cleaned = {}
+
+        # the probe could reject valid values in unusual layouts, so values
+        # are tried in full if no attempt succeeded probing them (safe mode
+        # compares every value that works, so it doesn't probe them)
+        params_attempt = params
+        for probe in [False] if safe_mode else [True, False]:
+            failed = []
+            for combination in combinations:
+                if budget.exhausted():
+                    break
+
+                shared_values = {
+                    param_name: param_value for
+                    param_name, param_value in combination.items() if
+                    param_name not in series_missings}
+                if shared_values in failed:
+                    continue
+
+                params_attempt = copy.deepcopy(params)
+                for param_name, param_value in shared_values.items():
+                    params_attempt[param_name] = param_value
+
+                first_values = {
+                    param_name: param_value for
+                    param_name, param_value in combination.items() if
+                    param_name in series_missings}
+                if not cls._discover_series(ws, params_attempt, 0,
+                                            [first_values], cleaned, False,
+                                            budget, None, probe):
+                    continue
+
+                # shared values work in the first series, so they are kept
+                # while each series looks for its own values
+                series_values = []
+                for i_series in range(len(params_attempt)):
+                    series_seed = cls._get_series_seed(seed, i_series)
+                    values = cls._discover_series(
+                        ws, params_attempt, i_series,
+                        sorted(series_combinations,
+                               key=lambda combination: not cls._matches_seed(
+                                   combination, series_seed)),
+                        cleaned, safe_mode, budget, confidence_threshold,
+                        probe)
+                    if not values:
+                        failed.append(shared_values)
+                        break
+                    series_values.append(values)
+
+                else:
+                    for param_name in series_missings:
+                        params_attempt[param_name] = [
+                            values[param_name] for values in series_values]
+
+                    results, rejected = cls._run_attempts(
+                        ws, [params_attempt], False,
+                        attempts_budget.AttemptsBudget(), None, probe=False)
+                    if results:
+                        return results[0][:2]
+                    failed.append(shared_values)
+
+        if budget.skipped:
+            instrumentation.count("attempts_skipped", budget.skipped)
+            raise AttemptsBudgetExhausted(budget.attempts, budget.skipped)
+
+        raise Exception("""
+File couldn't be parsed with provided parameters:
+{}
+
+Last attempt was:
+{}
+""".format(repr(params), repr(params_attempt)))
+
+    @classmethod
+    def _discover_series(cls, ws, params, i_series, combinations, cleaned,
+                         safe_mode, budget, confidence_threshold, probe):
+        """Try combinations of values of parameters in a single series.
+
+        The time index of the series is cleaned once for every different way
+        of cleaning it, and the clean worksheet is shared with the other
+        series using the same time index in the same way.
+
+        Args:
+            ws (Worksheet): Worksheet to scrape, it is not modified.
+            params (Parameters): Parameters of all the series.
+            i_series (int): Index of the series to try the combinations on.
+            combinations (list): Dicts like {param_name: value} to try, the
+                most likely first.
+            cleaned (dict): Clean worksheets by _time_index_key. See
+                _clean_series_time_index.
+            safe_mode, budget, confidence_threshold, probe: See
+                _run_attempts.
+
+        Returns:
+            dict: The combination chosen for the series, None if no
+                combination succeeded (or the budget ran out first). In safe
+                mode or with a confidence threshold, the best scored
+                combination is chosen, otherwise the first succeeding.
+        """
+        best_values, best_score = None, None
+        for num_combination, combination in enumerate(combinations):
+            if budget.exhausted():
+                budget.skip(len(combinations) - num_combination)
+                break
+            budget.spend()
+            instrumentation.count("series_attempts_executed")
+
+            params_series = cls._get_series_attempt(params, i_series,
+                                                    combination)
+            try:
+                ws_temp, params_series["data_ends"] = \
+                    cls._clean_series_time_index(ws, params_series, cleaned,
+                                                 probe)
+                dfs = cls._get_data(ws_temp, params_series)
+            except Exception:
+                instrumentation.count("series_attempts_failed")
+                continue
+
+            if not safe_mode and confidence_threshold is None:
+                return combination
+
+            with instrumentation.stage("evaluation"):
+                score = evaluation.score_data_frames(
+                    dfs, cls._get_data_extent(ws, params_series))
+            if best_score is None or score > best_score:
+                best_values, best_score = combination, score
+
+            if confidence_threshold is not None and \
+                    score >= confidence_threshold:
+                break
+
+        return best_values
+
+    @classmethod
+    def _clean_series_time_index(cls, ws, params_series, cleaned, probe):
+        """Return a copy of ws with the time index of a series clean.
+
+        Args:
+            ws (Worksheet): Worksheet to scrape, it is not modified.
+            params_series (Parameters): Parameters of a single series.
+            cleaned (dict): {time index key: (clean worksheet, data ends)},
+                with None if cleaning failed or False if the probe failed.
+            probe (bool): If True, the time index is first cleaned over the
+                beginning of the worksheet.
+
+        Returns:
+            tuple: (clean worksheet, data ends) None if the time index
+                couldn't be cleaned (or was rejected by the probe).
+        """
+        key = cls._time_index_key(params_series)
+
+        if probe and key not in cleaned and \
+                not cls._probe_attempt(ws, params_series):
+            instrumentation.count("attempts_probe_failed")
+            cleaned[key] = False
+
+        if key not in cleaned or (not probe and cleaned[key] is False):
+            with instrumentation.stage("copy"):
+                ws_temp = make_ws_copy(ws)
+            try:
+                cls._clean_data(ws_temp, params_series)
+                cleaned[key] = (ws_temp, params_series["data_ends"])
+            except Exception:
+                cleaned[key] = None
+
+        return cleaned[key] or None
+
+    @classmethod
+    def _get_series_missings(cls, params):
+        """Return the missing parameters that can be discovered per series."""
+        return [param_name for param_name in
+                cls._discover_missing_params(params) if
+                param_name in cls.PER_SERIES_PARAMS]
+
+    @classmethod
+    def _get_series_attempt(cls, params, i_series, combination):
+        """Return the parameters of only one series, with some values
+        replaced.
+
+        Args:
+            params (Parameters): Parameters of all the series.
+            i_series (int): Index of the series to keep.
+            combination (dict): {param_name: value} for the series.
+        """
+        params_series = copy.deepcopy(params)
+        for index in reversed(range(len(params))):
+            if index != i_series:
+                params_series.remove_series(index)
+
+        for param_name, param_value in combination.items():
+            params_series[param_name] = param_value
+
+        return params_series
+
+    @classmethod
+    def _get_series_seed(cls, seed, i_series):
+        """Return the values of a seed for one series.
+
+        Args:
+            seed (dict): {param_name: value, or list with the value of each
+                series}
+            i_series (int): Index of the series.
+        """
+        if not seed:
+            return None
+
+        series_seed = {}
+        for param_name, param_value in seed.items():
+            if not isinstance(param_value, list):
+                series_seed[param_name] = param_value
+            elif i_series < len(param_value):
+                series_seed[param_name] = param_value[i_series]
+
+        return series_seed
+
+    @classmethod
+    def _time_index_key(cls, params_series):
+        """Return a key of the parameters deciding how the time index of a
+        single series parameters object is cleaned."""
+        return repr([(param_name, params_series[param_name]) for
+                     param_name in sorted(params_series) if
+                     param_name not in cls.HEADER_PARAMS])
+
     # HIGH LEVEL TASKS
     @classmethod
-    def _discover_parameters(cls, ws, params):
-        """Discover the parameters of the worksheet."""
+    def _discover_parameters(cls, ws, params, seed=None,
+                             likeliness_order=None, default_ratios=None):
+        """Discover the parameters of the worksheet.
+
+        Args:
+            seed (dict): Values of missing parameters to try first, see
+                _sorted_combinations.
+            likeliness_order (list): Replaces the LIKELINESS_ORDER of params.
+            default_ratios (dict): How often default values worked, see
+                _sorted_combinations.
+        """
 
         if not params.is_complete():
             non_discovered = cls._discover_missing_params(params)
 
             if non_discovered:
-                return cls._generate_attempts(non_discovered, params)
+                return cls._generate_attempts(non_discovered, params, seed,
+                                              likeliness_order,
+                                              default_ratios)
             else:
                 return [params]
         else:
             return [params]
 
+    @classmethod
+    def _run_attempts(cls, ws, attempts, safe_mode, budget,
+                      confidence_threshold, probe):
+        """Run each attempt over a copy of the worksheet.
+
+        Args:
+            ws (Worksheet): Worksheet to scrape, it is not modified.
+            attempts (list): Parameters objects to try.
+            safe_mode (bool): If False, stops with the first successful
+                attempt.
+            budget (AttemptsBudget): Stops when it runs out, recording the
+                attempts skipped.
+            confidence_threshold (float): If not None, results are scored and
+                it stops with the first one scoring at least this, in safe
+                mode or not.
+            probe (bool): If True, attempts are first run over the beginning
+                of the worksheet and only the ones succeeding there are run
+                over the whole worksheet.
+
+        Returns:
+            tuple: (results, rejected) Where results is a list of (dfs,
+                params, score) tuples and rejected a list of the attempts that
+                failed the probe. Results are only scored in safe mode or
+                with a confidence threshold, otherwise score is None.
+        """
+        results = []
+        rejected = []
+        for num_attempt, params_attempt in enumerate(attempts):
+            if budget.exhausted():
+                budget.skip(len(attempts) - num_attempt)
+                break
+            budget.spend()
+
+            if probe and not cls._probe_attempt(ws, params_attempt):
+                instrumentation.count("attempts_probe_failed")
+                rejected.append(params_attempt)
+                continue
+
+            with instrumentation.stage("copy"):
+                ws_temp = make_ws_copy(ws)
+            instrumentation.count("attempts_executed")
+
+            try:
+                # SECOND: clean the data
+                cls._clean_data(ws_temp, params_attempt)
+
+                # THIRD: get the data from a cleaned worksheet
+                dfs = cls._get_data(ws_temp, params_attempt)
+
+            except Exception:
+                instrumentation.count("attempts_failed")
+                continue
+
+            # don't return a list with only one element
+            if isinstance(dfs, list) and len(dfs) == 1:
+                dfs = dfs[0]
+            if (isinstance(params_attempt, list) and
+                    len(params_attempt) == 1):
+                params_attempt = params_attempt[0]
+
+            score = None
+            if safe_mode or confidence_threshold is not None:
+                with instrumentation.stage("evaluation"):
+                    score = evaluation.score_data_frames(
+                        dfs, cls._get_data_extent(ws, params_attempt))
+
+            results.append((dfs, params_attempt, score))
+
+            # stops with the first successful (or good enough) result
+            if (not safe_mode and confidence_threshold is None) or \
+                    (confidence_threshold is not None and
+                     score >= confidence_threshold):
+                instrumentation.count(
+                    "attempts_pruned", len(attempts) - num_attempt - 1)
+                break
+
+        return results, rejected
+
+    @classmethod
+    def _get_data_extent(cls, ws, params):
+        """Return the number of rows (or columns) of ws from the first
+        data_starts to the end."""
+
+        if params["alignment"][0] == "vertical":
+            return ws.max_row - min(params["data_starts"]) + 1
+        else:
+            return ws.max_column - min(params["data_starts"]) + 1
+
+    @classmethod
+    def _probe_attempt(cls, ws, params):
+        """Try an attempt over the beginning of the worksheet.
+
+        Most wrong attempts fail in the first rows (or columns) of data, so
+        running them there first avoids cleaning the whole worksheet just to
+        find out they fail. Worksheets too short to benefit are not probed.
+
+        Returns:
+            bool: False if the attempt failed over the beginning of ws.
+        """
+        window = cls._get_probe_window(ws, params)
+        if not window:
+            return True
+        max_row, max_col = window
+
+        # the end of each series will be estimated within the window, unless
+        # it was passed and falls inside it
+        params_probe = copy.deepcopy(params)
+        params_probe["data_ends"] = [
+            data_end if data_end and data_end <= probe_end else None for
+            data_end, probe_end in zip(params["data_ends"],
+                                       cls._get_probe_ends(params))]
+
+        with instrumentation.stage("probe"):
+            ws_probe = make_ws_copy(ws, max_row=max_row, max_col=max_col)
+            try:
+                cls._clean_data(ws_probe, params_probe)
+                cls._get_data(ws_probe, params_probe)
+            except Exception:
+                return False
+
+        return True
+
+    @classmethod
+    def _get_probe_ends(cls, params):
+        """Return the last row (or column) of each series in the probe.
+
+        The probe covers PROBE_SIZE periods after data_starts, rounded up to
+        whole cycles of multifrequency series."""
+
+        probe_ends = []
+        for data_starts, frequency in zip(params["data_starts"],
+                                          params["frequency"]):
+            cycles = -(-cls.PROBE_SIZE // len(frequency))
+            probe_ends.append(data_starts + cycles * len(frequency) - 1)
+
+        return probe_ends
+
+    @classmethod
+    def _get_probe_window(cls, ws, params):
+        """Return (max_row, max_col) of the worksheet prefix to probe params.
+
+        Returns None if the worksheet is not long enough to be worth probing
+        (or the series don't share the same alignment)."""
+
+        alignments = set(params["alignment"])
+        if len(alignments) != 1:
+            return None
+
+        # time values offset from their data need their data in the window
+        probe_end = (max(cls._get_probe_ends(params)) +
+                     max(abs(offset) for offset in params["time_alignment"]))
+        if alignments.pop() == "vertical":
+            if ws.max_row <= probe_end + cls.PROBE_SIZE:
+                return None
+            return (probe_end, None)
+
+        else:
+            if ws.max_column <= probe_end + cls.PROBE_SIZE:
+                return None
+            return (None, probe_end)
+
     @classmethod
     def _clean_data(cls, ws, params):
         """Ensure data is clean to be processed with the parameters."""
@@ -234,91 +760,206 @@ Last attempt was:
     def _get_data(cls, ws, params):
         """Parse data using parameters and return it in data frames."""
         # import pdb; pdb.set_trace()
-        # 1. Build data frames dict based on number of period ranges founded
+        # 1. Build data frames dict based on number of period ranges founded,
+        # with a buffer for the values of all the series of each one
         dfs_dict = {}
-        for period_range in cls._get_period_ranges(ws, params):
-            hashable_pr = cls._hash_period_range(period_range)
-            if hashable_pr not in dfs_dict:
-                dfs_dict[hashable_pr] = {"columns": [], "data": [],
-                                         "period_range": period_range}
+        with instrumentation.stage("period_ranges"):
+            num_columns = {}
+            for period_range in cls._get_period_ranges(ws, params):
+                hashable_pr = cls._hash_period_range(period_range)
+                if hashable_pr not in dfs_dict:
+                    dfs_dict[hashable_pr] = period_range
+                num_columns[hashable_pr] = num_columns.get(hashable_pr, 0) + 1
+
+            for hashable_pr, period_range in dfs_dict.items():
+                dfs_dict[hashable_pr] = cls._new_df_inputs(
+                    period_range, num_columns[hashable_pr])
 
         # 2. Get name (column) and values of each data series
-        for i_series in range(len(params.headers_coord)):
+        for name, period_range, values in cls._get_series_values(ws, params):
+            cls._add_series_data(dfs_dict, [period_range], [(name, values)])
 
-            # iterate strategies looking for someone that accepts it
-            params_series = params[i_series]
-            name, values = None, None
-            for strategy in get_data_strategies.get_strategies():
-
-                if strategy.accepts(ws, params_series):
-                    strategy_obj = strategy()
-                    # import pdb; pdb.set_trace()
-                    names_and_values = strategy_obj.get_data(ws, params_series)
-                    names, values = names_and_values[0]
-                    break
+        # 3. Build data frames
+        return cls._build_data_frames(dfs_dict)
 
-            # raise exception if no strategy accepts the input
-            if not names_and_values:
-                msg = "There is no strategy to deal with " + str(params_series)
-                raise Exception(msg)
+    @classmethod
+    def _iter_series(cls, ws, params):
+        """Clean a worksheet and yield its series one at a time.
 
-            if (params_series["time_multicolumn"] and
-                    isinstance(params_series["time_header_coord"], list)):
-                time_header_coord = params_series["time_header_coord"][0]
-            else:
-                time_header_coord = params_series["time_header_coord"]
+        Only the values of the series being yielded are kept, instead of the
+        values of all the series of a data frame.
 
-            prs = cls._get_series_prs(ws, params_series["frequency"],
-                                      params_series["data_starts"],
-                                      time_header_coord,
-                                      params_series["data_ends"],
-                                      params_series["time_alignment"],
-                                      params_series["alignment"])
+        Args:
+            ws (Worksheet): Worksheet to scrape. It will be modified while
+                cleaning it.
+            params (Parameters): Complete parameters of the worksheet, there
+                is nothing discovered.
+
+        Yields:
+            tuple: (name, period_range, values) The name of the series (the
+                column it would have in its data frame), its period range and
+                a numpy array with its values.
+        """
+        cls._clean_data(ws, params)
+
+        columns = {}
+        for name, period_range, values in cls._get_series_values(ws, params):
+            names = columns.setdefault(cls._hash_period_range(period_range),
+                                       [])
+            cls._add_name(name, names)
+
+            yield names[-1], period_range, np.array(values)
 
+    @classmethod
+    def _get_series_values(cls, ws, params):
+        """Yield the name, period range and values of each series (and of
+        each frequency of a series) of a clean worksheet."""
+
+        for i_series in range(len(params.headers_coord)):
+            params_series = params[i_series]
+            strategy = cls._get_data_strategy(ws, params_series)
+            pr_strategy = cls._get_pr_strategy(ws, params_series["frequency"])
+
+            names_and_values, prs = cls._get_series_data(ws, params_series,
+                                                         strategy, pr_strategy)
             for period_range, (name, values) in zip(prs, names_and_values):
-                hashable_pr = cls._hash_period_range(period_range)
+                yield name, period_range, values
 
-                cls._add_name(name, dfs_dict[hashable_pr]["columns"])
-                dfs_dict[hashable_pr]["data"].append(values)
+    @classmethod
+    def _get_series_data(cls, ws, params_series, strategy, pr_strategy):
+        """Get the names, values and period ranges of a series.
+
+        Args:
+            ws (Worksheet): A clean worksheet.
+            params_series (dict): Parameters of the series.
+            strategy: Get data strategy accepting the series.
+            pr_strategy: Get period ranges strategy accepting the series.
+
+        Returns:
+            tuple: (names_and_values, prs) A list of (name, values) and a list
+                of period ranges, one for each frequency of the series.
+        """
+        with instrumentation.stage("get_data"):
+            names_and_values = strategy().get_data(ws, params_series)
+
+        if not names_and_values:
+            msg = "No values could be taken for " + str(params_series)
+            raise Exception(msg)
+
+        if (params_series["time_multicolumn"] and
+                isinstance(params_series["time_header_coord"], list)):
+            time_header_coord = params_series["time_header_coord"][0]
+        else:
+            time_header_coord = params_series["time_header_coord"]
+
+        with instrumentation.stage("period_ranges"):
+            prs = pr_strategy.get_period_ranges(
+                ws, params_series["frequency"], params_series["data_starts"],
+                time_header_coord, params_series["data_ends"],
+                params_series["time_alignment"], params_series["alignment"])
+
+        return names_and_values, prs
+
+    @classmethod
+    def _new_df_inputs(cls, period_range, num_columns):
+        """Return the inputs of the data frame of a period range, with an
+        empty buffer for the values of num_columns series.
+
+        The buffer is Fortran ordered, so the values of each series are
+        contiguous and the data frame can use it without copying it."""
+
+        return {"columns": [], "period_range": period_range,
+                "data": np.empty((len(period_range), num_columns),
+                                 dtype=cls.DATA_DTYPE, order="F")}
+
+    @classmethod
+    def _add_series_data(cls, dfs_dict, prs, names_and_values):
+        """Add the values of a series to the data frame of its period range.
+
+        The values are written in the next column of the buffer of the period
+        range, that grows if it is full (eg. if the number of series wasn't
+        known when it was created).
+
+        Args:
+            dfs_dict (dict): {hashable_pr: {"columns": [names],
+                "data": buffer, "period_range": period_range}}
+            prs (list): Period ranges of the series.
+            names_and_values (list): (name, values) of the series.
+        """
+        for period_range, (name, values) in zip(prs, names_and_values):
+            hashable_pr = cls._hash_period_range(period_range)
+            if hashable_pr not in dfs_dict:
+                dfs_dict[hashable_pr] = cls._new_df_inputs(period_range, 1)
+            df_inputs = dfs_dict[hashable_pr]
+
+            i_column = len(df_inputs["columns"])
+            data = df_inputs["data"]
+            if i_column == data.shape[1]:
+                data = cls._grow_buffer(data)
+
+            try:
+                data[:, i_column] = values
+            except (TypeError, ValueError):
+                # values that are not numbers are kept as they are
+                if data.dtype == object or len(values) != data.shape[0]:
+                    raise
+                data = data.astype(object)
+                data[:, i_column] = values
+
+            df_inputs["data"] = data
+            cls._add_name(name, df_inputs["columns"])
+
+    @staticmethod
+    def _grow_buffer(data):
+        """Return a copy of a buffer with twice its columns."""
+
+        new_data = np.empty((data.shape[0], 2 * data.shape[1]),
+                            dtype=data.dtype, order="F")
+        new_data[:, :data.shape[1]] = data
+
+        return new_data
+
+    @classmethod
+    def _build_data_frames(cls, dfs_dict):
+        """Build a data frame with the series of each period range, using the
+        buffers of their values without copying them."""
 
-        # 3. Build data frames
         dfs = []
-        for df_inputs in list(dfs_dict.values()):
-
-            period_range = df_inputs["period_range"]
-            columns = df_inputs["columns"]
-            data = np.array(df_inputs["data"]).transpose()
-
-            # try with business days if daily frequency fails
-            if period_range.freqstr == "D":
-                try:
-                    df = pd.DataFrame(index=period_range,
-                                      columns=columns,
-                                      data=data)
-                except ValueError:
-                    # rework period range in business days
-                    pr = period_range
-                    ini_date = "{}-{}-{}".format(pr[0].year,
-                                                 pr[0].month, pr[0].day)
-                    end_date = "{}-{}-{}".format(pr[-1].year,
-                                                 pr[-1].month, pr[-1].day)
-                    pr_B = pd.period_range(ini_date, end_date, freq="B")
-
-                    df = pd.DataFrame(index=pr_B,
-                                      columns=columns,
-                                      data=data)
-
-            # go straight if frequency is not daily
-            else:
-                df = pd.DataFrame(index=period_range,
-                                  columns=columns,
-                                  data=data)
+        with instrumentation.stage("data_frames"):
+            for df_inputs in list(dfs_dict.values()):
+                columns = df_inputs["columns"]
+                data = df_inputs["data"]
 
-            dfs.append(df)
+                # buffers that grew may have unused columns
+                if data.shape[1] != len(columns):
+                    data = data[:, :len(columns)].copy(order="F")
+
+                dfs.append(pd.DataFrame(index=df_inputs["period_range"],
+                                        columns=columns, data=data,
+                                        copy=False))
 
         return dfs
 
     # auxiliar methods
+    @staticmethod
+    def _same_data_frames(dfs_a, dfs_b):
+        """Check if two results (a data frame or a list of them) are equal."""
+
+        if not isinstance(dfs_a, list):
+            dfs_a = [dfs_a]
+        if not isinstance(dfs_b, list):
+            dfs_b = [dfs_b]
+        if len(dfs_a) != len(dfs_b):
+            return False
+
+        for df_a, df_b in zip(dfs_a, dfs_b):
+            try:
+                compare_data_frames(df_a, df_b)
+            except AssertionError:
+                return False
+
+        return True
+
     @staticmethod
     def _hash_period_range(period_range):
         """Returns a tuple describing a period range in a hashable way."""
@@ -332,7 +973,8 @@ Last attempt was:
         return params.get_missings()
 
     @classmethod
-    def _generate_attempts(cls, non_discovered, params):
+    def _generate_attempts(cls, non_discovered, params, seed=None,
+                           likeliness_order=None, default_ratios=None):
         """Generate combinations of the valid values of non discovered missing
         parameters and create attempts of parameters to try scrape the file."""
 
@@ -340,12 +982,10 @@ Last attempt was:
         if not non_discovered:
             return [params]
 
-        missings_dict = {missing_param: params.VALID_VALUES[missing_param]
-                         for missing_param in non_discovered}
-
         attempts = []
-        for combination in cls._param_combinations_generator(
-                missings_dict, params.DEFAULT_VALUES, params.LIKELINESS_ORDER):
+        for combination in cls._sorted_combinations(non_discovered, params,
+                                                    seed, likeliness_order,
+                                                    default_ratios):
             new_params = copy.deepcopy(params)
 
             for param_name, param_value in combination.items():
@@ -360,6 +1000,77 @@ Last attempt was:
 
         return attempts
 
+    @classmethod
+    def _sorted_combinations(cls, non_discovered, params, seed=None,
+                             likeliness_order=None, default_ratios=None):
+        """Return the combinations of the valid values of non discovered
+        missing parameters, the most likely and cheapest to try first.
+
+        Args:
+            non_discovered (list): Names of the missing parameters.
+            params (Parameters): Parameters of the worksheet.
+            seed (dict): {param_name: value} If a combination has these
+                values, it is tried before the others (eg. the combination
+                that worked before in the same layout).
+            likeliness_order (list): Replaces the LIKELINESS_ORDER of params.
+            default_ratios (dict): {param_name: ratio of times its default
+                value worked} (eg. in the files scraped before), see
+                _estimate_cost.
+        """
+
+        missings_dict = {missing_param: params.VALID_VALUES[missing_param]
+                         for missing_param in non_discovered}
+
+        return sorted(
+            cls._param_combinations_generator(
+                missings_dict, params.DEFAULT_VALUES,
+                likeliness_order or params.LIKELINESS_ORDER),
+            key=lambda combination: (
+                not cls._matches_seed(combination, seed),
+                cls._estimate_cost(combination, params.DEFAULT_VALUES,
+                                   default_ratios)))
+
+    @staticmethod
+    def _matches_seed(combination, seed):
+        """Check if all the values of a combination are the ones of a seed."""
+        return bool(seed) and all(
+            param_name in seed and seed[param_name] == param_value for
+            param_name, param_value in combination.items())
+
+    @classmethod
+    def _estimate_cost(cls, combination, default_values, default_ratios=None):
+        """Return a sorting key of a combination of parameter values.
+
+        Combinations expected to have less wrong values come first, ties are
+        broken by the estimated cost of trying the non default values. A
+        default value is expected to be wrong as often as it didn't work
+        before, and a non default value as often as the default one worked.
+        Parameters without a ratio are taken as if their default value always
+        worked, so then the combinations with less non default values come
+        first.
+
+        Args:
+            combination (dict): {param_name: param_value}
+            default_values (dict): {param_name: default_value}
+            default_ratios (dict): {param_name: ratio of times its default
+                value worked}
+
+        Returns:
+            tuple: (expected number of wrong values, estimated cost)
+        """
+        default_ratios = default_ratios or {}
+
+        wrong_values, cost = 0, 0
+        for param_name, param_value in combination.items():
+            default_ratio = default_ratios.get(param_name, 1)
+            if param_value == default_values[param_name]:
+                wrong_values += 1 - default_ratio
+            else:
+                wrong_values += default_ratio
+                cost += cls.NON_DEFAULT_COSTS.get(param_name, 1)
+
+        return wrong_values, cost
+
     @classmethod
     def _param_combinations_generator(cls, missings_dict, default_values=None,
                                       likeliness_order=None):
@@ -451,9 +1162,12 @@ Last attempt was:
         Modify ws changing cell values in the time index for the correspondent
         time value in datetime.datetime format."""
 
-        for cleaner in clean_ti_strategies.get_strategies():
-            if cleaner.accepts(ws, params):
-                cleaner_obj = cleaner()
+        cleaner = clean_ti_strategies.get_strategy(params)
+
+        if cleaner:
+            instrumentation.count("clean_ti_strategies_accepted")
+            cleaner_obj = cleaner()
+            with instrumentation.stage("clean_time_index"):
                 return cleaner_obj.clean_time_index(ws, params)
 
         msg = "Time index in '" + ws.title + "'' could not be cleaned."
@@ -530,16 +1244,35 @@ Last attempt was:
             alignment (str): "vertical" or "horizontal" series.
         """
 
+        strategy = cls._get_pr_strategy(ws, freq)
+        return strategy.get_period_ranges(ws, freq, ini_row,
+                                          time_header_coord, end_row,
+                                          time_alignement, alignment)
+
+    @classmethod
+    def _get_pr_strategy(cls, ws, freq):
+        """Return the first strategy to get period ranges accepting freq."""
+
         for strategy in get_pr_strategies.get_strategies():
             if strategy.accepts(ws, freq):
-                return strategy.get_period_ranges(ws, freq, ini_row,
-                                                  time_header_coord, end_row,
-                                                  time_alignement,
-                                                  alignment)
+                return strategy
 
         msg = " ".join(["There is no strategy to get period range for",
-                        "\nFrequency:", freq,
-                        "\nTime header coord:", time_header_coord])
+                        "\nFrequency:", freq])
+        raise Exception(msg)
+
+    @classmethod
+    def _get_data_strategy(cls, ws, params_series):
+        """Return the first get data strategy accepting a series."""
+
+        for strategy in get_data_strategies.get_strategies():
+            instrumentation.count("get_data_strategies_tried")
+
+            if strategy.accepts(ws, params_series):
+                instrumentation.count("get_data_strategies_accepted")
+                return strategy
+
+        msg = "There is no strategy to deal with " + str(params_series)
         raise Exception(msg)
 
     @classmethod
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks
+
+Benchmark suite to track the time and memory consumed by the package.
+
+Unlike profiling.py, that renders call graphs to find where the time goes,
+this module produces numbers that can be compared between versions. Two
+stages are measured separately for each case: loading the excel file and
+scraping it with XlSeries.get_data_frames.
+
+The time taken by `import xlseries` in a new interpreter is measured too,
+together with the heavy dependencies that importing the package loads.
+
+The cases are the integration test cases (with all their parameters and with
+only the critical ones) and synthetic workbooks generated with
+xlseries.utils.synthetic_cases in every layout (vertical, horizontal,
+multifrequency and composed time) for every combination of number of periods
+and number of series.
+
+Example:
+    # run everything and save the results
+    python benchmarks.py --output benchmarks.json
+
+    # compare a new run against saved results, failing if any case got 20%
+    # slower than before
+    python benchmarks.py --output new.json --baseline benchmarks.json
+
+    # run only the small synthetic workbooks
+    python benchmarks.py --no-integration --no-import --periods 1000 \
+        --series 10 100
+
+    # measure only the import time
+    python benchmarks.py --no-integration --no-synthetic
+
+    import benchmarks
+    results = benchmarks.main(periods=[1000], series=[10])
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import xlseries
+from xlseries import XlSeries
+from xlseries.utils.case_loaders import load_parameters_case
+from xlseries.utils.path_finders import get_orig_cases_path
+from xlseries.utils.synthetic_cases import make_case, START_YEAR
+
+
+INTEGRATION_CASES = [1, 2, 3, 4, 5, 6, 7]
+# parameters the integration tests set after removing the non critical ones
+CRITICAL_CASES_PARAMS = {4: {"missing_value": "…"},
+                         6: {"continuity": False, "blank_rows": True}}
+
+LAYOUTS = ["vertical", "horizontal", "multifrequency", "composed"]
+PERIODS = [1000, 10000, 100000]
+SERIES = [10, 100, 1000]
+MAX_CELLS = 1000000
+# tracing memory allocations doubles the time spent running the suite
+MEASURE_MEMORY = True
+
+IMPORT_REPEAT = 5
+# dependencies that should only be imported when they are needed
+HEAVY_MODULES = ["openpyxl", "pandas", "numpy", "arrow", "xlrd", "parsley",
+                 "asyncio"]
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"time": seconds, "loaded": [
+    name for name in {heavy_modules!r} if name in sys.modules]}}))
+"""
+
+# excel and pandas limits
+MAX_XL_COLS = 16384
+MAX_XL_ROWS = 1048576
+MAX_YEAR = 2261
+
+# spec given to the synthetic cases generator for each layout
+LAYOUT_SPECS = {"vertical": {"frequency": "D"},
+                "horizontal": {"frequency": "D", "alignment": "horizontal"},
+                "multifrequency": {"frequency": "AQQQQ"},
+                "composed": {"frequency": "M", "time_composed": True}}
+
+
+# SYNTHETIC CASES
+def _years_spanned(layout, periods):
+    if layout in ["vertical", "horizontal"]:
+        return periods / 365.0
+    elif layout == "multifrequency":
+        return periods / 5.0
+    else:
+        return periods / 12.0
+
+
+def skip_reason(layout, periods, series, max_cells=MAX_CELLS):
+    """Return why a synthetic case can't be run or None if it can."""
+
+    if max_cells and periods * series > max_cells:
+        return "{} cells exceed the maximum of {}".format(periods * series,
+                                                          max_cells)
+
+    if layout == "horizontal":
+        cols, rows = periods + 1, series + 1
+    else:
+        cols, rows = series + 1, periods + 1
+    if cols > MAX_XL_COLS or rows > MAX_XL_ROWS:
+        return "{} rows and {} columns exceed excel limits".format(rows, cols)
+
+    if START_YEAR + _years_spanned(layout, periods) > MAX_YEAR:
+        return "{} periods exceed pandas time stamps limits".format(periods)
+
+    return None
+
+
+# MEASURES
+def measure(function, *args, **kwargs):
+    """Measure the time and the peak of memory allocated by a function call.
+
+    Time and memory are measured in different calls, because tracing memory
+    allocations slows down the code.
+
+    Returns:
+        tuple: (result, measures) The result of the function (from the timed
+            call) and a dict with the "time" in seconds and the
+            "peak_memory" in bytes.
+    """
+    gc.collect()
+    ini = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - ini
+
+    measures = {"time": elapsed}
+
+    if MEASURE_MEMORY:
+        gc.collect()
+        tracemalloc.start()
+        function(*args, **kwargs)
+        measures["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result, measures
+
+
+def _count_series(dfs):
+    if not isinstance(dfs, list):
+        dfs = [dfs]
+    return sum(len(df.columns) for df in dfs)
+
+
+def run_case(name, xl_path, params, **kwargs):
+    """Measure loading and scraping an excel file.
+
+    Returns:
+        dict: The measures of the case, that can be serialized to JSON.
+    """
+    print("Running", name)
+    result = {"name": name}
+    result.update(kwargs)
+
+    try:
+        series, result["load"] = measure(XlSeries, xl_path)
+        dfs, result["get_data_frames"] = measure(series.get_data_frames,
+                                                 params)
+        result["series_scraped"] = _count_series(dfs)
+
+    except Exception as e:
+        result["error"] = repr(e)
+
+    return result
+
+
+def run_integration_cases(cases=INTEGRATION_CASES):
+    """Measure the integration cases with all and with critical parameters.
+
+    Returns:
+        list: The measures of every case.
+    """
+    results = []
+
+    for case_num in cases:
+        params = load_parameters_case(case_num)
+        results.append(run_case("case{}/complete".format(case_num),
+                                get_orig_cases_path(case_num), params,
+                                kind="integration", case=case_num))
+
+        params = load_parameters_case(case_num)
+        params.remove_non_critical()
+        for param_name, value in CRITICAL_CASES_PARAMS.get(case_num,
+                                                           {}).items():
+            params[param_name] = value
+        results.append(run_case("case{}/critical".format(case_num),
+                                get_orig_cases_path(case_num), params,
+                                kind="integration", case=case_num))
+
+    return results
+
+
+def run_synthetic_cases(layouts=LAYOUTS, periods=PERIODS, series=SERIES,
+                        max_cells=MAX_CELLS):
+    """Measure synthetic workbooks of every layout and size.
+
+    Returns:
+        list: The measures of every case. Cases that can't be run have a
+            "skipped" reason instead.
+    """
+    results = []
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        for layout in layouts:
+            for num_periods in periods:
+                for num_series in series:
+                    name = "{}/{}x{}".format(layout, num_periods, num_series)
+                    kwargs = {"kind": "synthetic", "layout": layout,
+                              "periods": num_periods, "series": num_series}
+
+                    reason = skip_reason(layout, num_periods, num_series,
+                                         max_cells)
+                    if reason:
+                        print("Skipping", name + ":", reason)
+                        kwargs.update({"name": name, "skipped": reason})
+                        results.append(kwargs)
+                        continue
+
+                    wb, params, _ = make_case(LAYOUT_SPECS[layout],
+                                              num_periods, num_series,
+                                              seed=1)
+                    xl_path = os.path.join(temp_dir,
+                                           name.replace("/", "_") + ".xlsx")
+                    wb.save(xl_path)
+                    del wb
+
+                    results.append(run_case(name, xl_path, params, **kwargs))
+                    os.remove(xl_path)
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return results
+
+
+def measure_import(module="xlseries", repeat=IMPORT_REPEAT):
+    """Measure the time of importing a module in a new interpreter.
+
+    Returns:
+        dict: The best time of all the repetitions and the heavy modules
+            loaded by the import.
+    """
+    package_parent = os.path.dirname(os.path.dirname(xlseries.__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_parent] + [path for path in
+                            [os.environ.get("PYTHONPATH")] if path])
+    script = IMPORT_SCRIPT.format(module=module, heavy_modules=HEAVY_MODULES)
+
+    measures = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         env=env, cwd=package_parent)
+        measures.append(json.loads(output.decode("utf-8").splitlines()[-1]))
+
+    return {"time": min(measure["time"] for measure in measures),
+            "loaded": measures[0]["loaded"]}
+
+
+def run_import_cases(modules=("xlseries",)):
+    """Measure the import time of the package.
+
+    Returns:
+        list: The measures of every module imported.
+    """
+    results = []
+
+    for module in modules:
+        name = "import/" + module
+        print("Running", name)
+        result = {"name": name, "kind": "import"}
+
+        try:
+            result["import"] = measure_import(module)
+        except Exception as e:
+            result["error"] = repr(e)
+
+        results.append(result)
+
+    return results
+
+
+# REPORTS
+def compare(results, baseline, threshold=1.2, min_time=0.05):
+    """Find the cases that got slower or use more memory than a baseline.
+
+    Args:
+        results (dict): Benchmark results.
+        baseline (dict): Benchmark results to compare with.
+        threshold (float): Maximum ratio allowed between the new and the old
+            measures.
+        min_time (float): Stages faster than this (in both runs) are not
+            compared, because their times are mostly noise.
+
+    Returns:
+        list: Strings describing each regression found.
+    """
+    old_results = {result["name"]: result for result in baseline["results"]}
+
+    regressions = []
+    for result in results["results"]:
+        old_result = old_results.get(result["name"])
+        if not old_result:
+            continue
+
+        if "error" in result and "error" not in old_result:
+            regressions.append("{}: {}".format(result["name"],
+                                               result["error"]))
+            continue
+
+        for stage in ["import", "load", "get_data_frames"]:
+            if stage not in result or stage not in old_result:
+                continue
+
+            for measure_name in ["time", "peak_memory"]:
+                new = result[stage].get(measure_name)
+                old = old_result[stage].get(measure_name)
+                if not new or not old:
+                    continue
+                if measure_name == "time" and max(new, old) < min_time:
+                    continue
+
+                if new / old > threshold:
+                    regressions.append(
+                        "{} {} {}: {:.4g} -> {:.4g} ({:.2f}x)".format(
+                            result["name"], stage, measure_name, old, new,
+                            new / old))
+
+    return regressions
+
+
+def main(integration=True, synthetic=True, layouts=LAYOUTS, periods=PERIODS,
+         series=SERIES, max_cells=MAX_CELLS, output=None, imports=True):
+    """Run the benchmark suite.
+
+    Returns:
+        dict: Metadata of the run and the measures of every case.
+    """
+    results = {
+        "meta": {
+            "xlseries_version": xlseries.__version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now().isoformat(),
+            "measure_memory": MEASURE_MEMORY
+        },
+        "results": []
+    }
+
+    if imports:
+        results["results"].extend(run_import_cases())
+    if integration:
+        results["results"].extend(run_integration_cases())
+    if synthetic:
+        results["results"].extend(
+            run_synthetic_cases(layouts, periods, series, max_cells))
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    return results
+
+
+def _parse_args(args):
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite of the xlseries package.")
+    parser.add_argument("--output", help="JSON file to write results to.")
+    parser.add_argument("--baseline",
+                        help="JSON file with results to compare with.")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Maximum ratio allowed against the baseline.")
+    parser.add_argument("--no-integration", action="store_true")
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--no-import", action="store_true")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Only measure time (runs faster).")
+    parser.add_argument("--layouts", nargs="+", default=LAYOUTS)
+    parser.add_argument("--periods", nargs="+", type=int, default=PERIODS)
+    parser.add_argument("--series", nargs="+", type=int, default=SERIES)
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="Skip synthetic cases bigger than this.")
+
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    args = _parse_args(sys.argv[1:])
+    MEASURE_MEMORY = not args.no_memory
+
+    results = main(not args.no_integration, not args.no_synthetic,
+                   args.layouts, args.periods, args.series, args.max_cells,
+                   args.output, not args.no_import)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
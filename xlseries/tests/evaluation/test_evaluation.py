@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_evaluation
+
+Tests for `evaluation` module.
+"""
+
+from __future__ import unicode_literals
+import unittest
+import nose
+import numpy as np
+import pandas as pd
+
+from xlseries.evaluation.evaluation import evaluate_data_frames
+from xlseries.evaluation.evaluation import score_data_frames
+
+
+def get_df(values=None, index=None, columns=None):
+    values = values if values is not None else np.arange(1.0, 25.0)
+    index = index if index is not None else pd.date_range(
+        "20000101", periods=len(values), freq="MS")
+    columns = columns or ["Serie 1"]
+
+    return pd.DataFrame({columns[0]: values}, index=index, columns=columns)
+
+
+# @unittest.skip("skip")
+class EvaluationTestCase(unittest.TestCase):
+
+    def test_perfect_data_frame(self):
+        evaluation = evaluate_data_frames(get_df())
+
+        self.assertEqual(evaluation, {"not_nan": 1.0, "monotonic_index": 1.0,
+                                      "continuity": 1.0, "headers": 1.0,
+                                      "score": 1.0})
+
+    def test_criteria(self):
+        values = np.arange(1.0, 25.0)
+        values[:12] = np.nan
+        self.assertEqual(evaluate_data_frames(get_df(values))["not_nan"], 0.5)
+
+        index = pd.date_range("20000101", periods=24, freq="MS")[::-1]
+        self.assertEqual(evaluate_data_frames(
+            get_df(index=index))["monotonic_index"], 0.0)
+
+        values = np.arange(1.0, 25.0)
+        values[12] = 1000.0
+        self.assertAlmostEqual(evaluate_data_frames(
+            get_df(values))["continuity"], 1 - 2.0 / 23)
+
+        for column in ["", "1990", "  "]:
+            self.assertEqual(evaluate_data_frames(
+                get_df(columns=[column]))["headers"], 0.0)
+
+    def test_coverage(self):
+        self.assertEqual(evaluate_data_frames(get_df(), 24)["coverage"], 1.0)
+        self.assertEqual(evaluate_data_frames(get_df(), 48)["coverage"], 0.5)
+        self.assertNotIn("coverage", evaluate_data_frames(get_df()))
+
+        self.assertLess(score_data_frames(get_df(), 48), 1.0)
+
+    def test_many_data_frames(self):
+        values = np.arange(1.0, 25.0)
+        values[:12] = np.nan
+        dfs = [get_df(), get_df(values), get_df(np.arange(1.0, 5.0))]
+
+        # data frames are weighted by their number of values
+        self.assertAlmostEqual(evaluate_data_frames(dfs)["not_nan"],
+                               1 - 12.0 / 52)
+        self.assertEqual(score_data_frames([]), 0.0)
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
@@ -29,8 +29,11 @@ from xlseries.strategies.clean.parse_time import ParseComposedMonth1
 from xlseries.strategies.clean.parse_time import ParseComposedMonth2
 from xlseries.strategies.clean.parse_time import ParseSimpleTime
 from xlseries.strategies.clean.parse_time import NoTimeValue
+from xlseries.strategies.clean.parse_time import register_month_names
+import xlseries.strategies.clean.parse_time as parse_time_strategies
 from xlseries.utils.case_loaders import load_parameters_case
 from xlseries.utils.path_finders import abs_path
+from xlseries.utils.instrumentation import Stats, recording
 
 
 def load_case_number():
@@ -336,6 +339,91 @@ class ParseComposedTimeTest(unittest.TestCase):
         self.run_parse_time_case(case_num, ParseComposedQuarter2, True)
 
 
+# @unittest.skip("skip")
+class MonthNamesTest(unittest.TestCase):
+
+    def tearDown(self):
+        parse_time_strategies._month_numbers.clear()
+
+    def test_month_str_to_num(self):
+        month_str_to_num = ParseComposedMonth1._month_str_to_num
+
+        self.assertEqual(month_str_to_num("Ene."), 1)
+        self.assertEqual(month_str_to_num("FEBRERO"), 2)
+        self.assertEqual(month_str_to_num("Set."), 9)
+        self.assertEqual(month_str_to_num("setiembre"), 9)
+        self.assertEqual(month_str_to_num("august"), 8)
+        self.assertIsNone(month_str_to_num("trimestre"))
+
+        # the month lists of some locales don't start with a blank name
+        self.assertEqual(month_str_to_num(u"Leden"), 1)
+        self.assertEqual(month_str_to_num(u"Úno"), 2)
+        self.assertEqual(month_str_to_num(u"Prosinec"), 12)
+
+    def test_register_month_names(self):
+        params = {"time_format": str}
+        time_parser = ParseComposedMonth1()
+
+        self.assertIsNone(ParseComposedMonth1._month_str_to_num("Mzo"))
+
+        register_month_names({"Mzo": 3})
+        self.assertEqual(time_parser.parse_time(params, "1991 Mzo."),
+                         arrow.get(1991, 3, 1))
+
+
+# @unittest.skip("skip")
+class GrammarSignatureTest(unittest.TestCase):
+
+    def test_grammars_built_once(self):
+        grammar = ParseComposedQuarter2.get_parsley_grammar()
+
+        self.assertIs(ParseComposedQuarter2.get_parsley_grammar(), grammar)
+        self.assertIs(ParseComposedQuarter2().get_parsley_grammar(), grammar)
+        self.assertIsNot(ParseComposedQuarter3.get_parsley_grammar(), grammar)
+
+    def test_signature_mismatch_skips_grammar(self):
+        params = {"time_composed": True, "frequency": "A"}
+
+        with patch.object(ParseComposedYear2,
+                          "get_parsley_grammar") as grammar:
+            self.assertFalse(ParseComposedYear2.accepts(params, "1995 (1)"))
+            self.assertFalse(grammar.called)
+
+            ParseComposedYear2.accepts(params, "1995/96 (1)")
+            self.assertTrue(grammar.called)
+
+    def test_signatures_accept_parsed_strings(self):
+        values = {ParseComposedQuarter1: ["'1986    1º trim.", "'  II * "],
+                  ParseComposedQuarter2: ["III.1963", "I.1964"],
+                  ParseComposedQuarter3: ["2° Trim 07", "1° Trim 08 "],
+                  ParseComposedMonth1: ["1991    Ene. ", "Mayo.  (3)  1991"],
+                  ParseComposedMonth2: ["1991,01 ", "04       "],
+                  ParseComposedYear1: ["(3)  1998  "],
+                  ParseComposedYear2: ["(3)  1997/98"]}
+
+        for strategy, time_strings in values.items():
+            for time_string in time_strings:
+                self.assertTrue(strategy._grammar_accepts(time_string))
+
+    def test_unique_time_strings_parsed_once(self):
+        orig = ["1986 I", "II", "III", "IV", "1987 I", "II", "III", "IV"]
+        expected = [arrow.get(year, month, 1) for year in [1986, 1987] for
+                    month in [1, 4, 7, 10]]
+        time_parser = ParseComposedQuarter1()
+        stats = Stats()
+
+        last_time = None
+        time_values = []
+        with recording(stats):
+            for str_date in orig:
+                last_time = time_parser.parse_time({}, str_date, last_time)
+                time_values.append(last_time)
+
+        self.assertEqual(time_values, expected)
+        self.assertEqual(len(time_parser.date_elements), 5)
+        self.assertEqual(stats.counters["parse_time_elements_reused"], 3)
+
+
 if __name__ == '__main__':
     nose.run(defaultTest=__name__)
     # unittest.main()
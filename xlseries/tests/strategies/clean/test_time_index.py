@@ -24,6 +24,7 @@ from xlseries.strategies.clean.time_index import BaseSingleFrequency
 from xlseries.strategies.clean.time_index import BaseMultiFrequency
 from xlseries.strategies.clean.time_index import TimeValueGoingBackwards
 from xlseries.strategies.clean.time_index import TimeValueGoingForth
+import xlseries.strategies.clean.time_index as clean_ti_strategies
 from xlseries.utils.xl_methods import compare_cells
 from xlseries.utils.case_loaders import load_parameters_case
 from xlseries.utils.path_finders import abs_path
@@ -542,6 +543,30 @@ class CleanMultipleColumnsTestCase(unittest.TestCase):
         res = [i[0] for i in ti_iter]
         self.assertEqual(res, ["d 4", "e 5", "f 6"])
 
+    def test_time_index_iterator_window(self):
+        """Each time value is read once, as the next and the current one."""
+
+        wb = Workbook()
+        ws = wb.active
+        for row, (year, month) in enumerate([(2015, 11), (None, 12),
+                                             (2016, 1)], 1):
+            ws.cell(row=row, column=1).value = year
+            ws.cell(row=row, column=2).value = month
+
+        class ReadOnceStrategy(CleanMultipleColumns):
+
+            @classmethod
+            def _get_time_value(cls, *args, **kwargs):
+                raise AssertionError("time values must be read at once")
+
+        ti_iter = ReadOnceStrategy._time_index_iterator(ws, "vertical",
+                                                        ["A1", "B1"], 1, 3)
+        res = [(curr_time, next_time, write_time_cell.coordinate) for
+               curr_time, next_time, write_time_cell in ti_iter]
+        self.assertEqual(res, [("2015 11", "12", "A1"),
+                               ("12", "2016 1", "A2"),
+                               ("2016 1", None, "A3")])
+
 
 class CleanMultiColumnsMultiFreqTestCase(unittest.TestCase):
 
@@ -644,5 +669,33 @@ class BaseMultiFrequencyTestCase(unittest.TestCase):
         self.assertEqual(next_f, "A")
 
 
+# @unittest.skip("skip")
+class DispatchTableTestCase(unittest.TestCase):
+
+    def test_get_strategies_are_built_once(self):
+        self.assertEqual(clean_ti_strategies.get_strategies(),
+                         clean_ti_strategies.get_strategies())
+
+    def test_get_strategy(self):
+        strategies = clean_ti_strategies.get_strategies()
+
+        for params in clean_ti_strategies._iter_dispatch_params():
+            exp_strategy = [strategy for strategy in strategies if
+                            strategy.accepts(None, params)][0]
+            self.assertEqual(clean_ti_strategies.get_strategy(params),
+                             exp_strategy)
+
+        params = {"blank_rows": False, "continuity": True, "data_ends": 256,
+                  "time_multicolumn": True, "time_alignment": -1,
+                  "frequency": "QQQQA"}
+        strategy = clean_ti_strategies.get_strategy(params)
+        self.assertTrue(issubclass(strategy, BaseMultipleColumns))
+        self.assertTrue(issubclass(strategy, BaseMultiFrequency))
+        self.assertTrue(strategy.accepts(None, params))
+
+    def test_uncovered_combinations(self):
+        self.assertEqual(clean_ti_strategies.uncovered_combinations(), [])
+
+
 if __name__ == '__main__':
     nose.run(defaultTest=__name__)
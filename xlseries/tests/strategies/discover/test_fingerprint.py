@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_fingerprint
+
+This module tests the fingerprints of the layouts of worksheets.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import nose
+from openpyxl import Workbook
+
+from xlseries.xlseries import XlSeries
+from xlseries.strategies.discover.fingerprint import layout_fingerprint
+from xlseries.strategies.discover.fingerprint import token_pattern
+from xlseries.strategies.discover.fingerprint import time_pattern
+from xlseries.strategies.discover.fingerprint import LayoutIndex
+from xlseries.strategies.discover.fingerprint import IndexNotCompatible
+from xlseries.utils.synthetic_cases import make_case
+from xlseries.utils.data_frame import compare_data_frames
+from xlseries.utils.instrumentation import Stats
+
+
+def make_release(periods):
+    """A release of a monthly spreadsheet made with the same template.
+
+    The end of the data is not in the parameters, it changes every release."""
+
+    wb, params, exp_dfs = make_case({"frequency": "M", "continuity": False,
+                                     "time_alignment": -1},
+                                    periods=periods, series=2, seed=periods)
+    del params["data_ends"]
+
+    return wb, params, exp_dfs
+
+
+# @unittest.skip("skip")
+class LayoutFingerprintTestCase(unittest.TestCase):
+
+    def test_same_template(self):
+        wb, params, exp_dfs = make_release(60)
+        wb_next, params, exp_dfs = make_release(72)
+
+        self.assertEqual(layout_fingerprint(wb.active),
+                         layout_fingerprint(wb_next.active))
+
+    def test_different_layouts(self):
+        wb, params, exp_dfs = make_release(60)
+        fingerprint = layout_fingerprint(wb.active)
+
+        wb_other, params, exp_dfs = make_case({"frequency": "M"}, periods=60,
+                                              series=2, seed=60)
+        self.assertNotEqual(layout_fingerprint(wb_other.active), fingerprint)
+
+        wb_other, params, exp_dfs = make_release(60)
+        wb_other.active["C1"] = "Other series"
+        self.assertNotEqual(layout_fingerprint(wb_other.active), fingerprint)
+
+        wb_other, params, exp_dfs = make_release(60)
+        wb_other.active.merge_cells("A1:B1")
+        self.assertNotEqual(layout_fingerprint(wb_other.active), fingerprint)
+
+    def test_token_pattern(self):
+        self.assertEqual(token_pattern(" Ene. 1991"), "aaa. 9999")
+        self.assertEqual(token_pattern("Feb. 1992"),
+                         token_pattern("Ene. 1991"))
+        self.assertEqual(token_pattern(1991), "int")
+
+    def test_time_pattern(self):
+        ws = Workbook().active
+        for i_row, value in enumerate(["Ene. 1991", None, "Feb. 1991", 1992]):
+            ws.cell(row=i_row + 2, column=1).value = value
+
+        self.assertEqual(time_pattern(ws, 2, 1, "vertical"),
+                         ["aaa. 9999", "aaa. 9999", "int"])
+        self.assertEqual(time_pattern(ws, 2, 1, "horizontal"), ["aaa. 9999"])
+        self.assertEqual(ws.max_column, 1)
+
+    def test_not_finite_numbers(self):
+        wb, params, exp_dfs = make_release(60)
+        fingerprint = layout_fingerprint(wb.active)
+
+        wb.active["B20"] = "NaN"
+        wb.active["C20"] = "-Infinity"
+        self.assertEqual(layout_fingerprint(wb.active), fingerprint)
+
+
+# @unittest.skip("skip")
+class LayoutIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_batch_of_releases(self):
+        layout_index = LayoutIndex()
+
+        for periods in [60, 72, 84]:
+            wb, params, exp_dfs = make_release(periods)
+            stats = Stats()
+            dfs = XlSeries(wb, stats).get_data_frames_by_layout(params,
+                                                                layout_index)
+            self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+
+        # parameters were discovered only in the first release
+        self.assertEqual(len(layout_index), 1)
+        self.assertEqual(stats.counters["layout_index_hits"], 1)
+        self.assertNotIn("discover_parameters", stats.timers)
+
+    def test_save_and_load(self):
+        wb, params, exp_dfs = make_release(60)
+        layout_index = LayoutIndex()
+        XlSeries(wb).get_data_frames_by_layout(params, layout_index)
+
+        index_path = os.path.join(self.temp_dir, "index.json")
+        layout_index.save(index_path)
+        layout_index = LayoutIndex.load(index_path)
+
+        wb, params, exp_dfs = make_release(72)
+        self.assertIn(layout_fingerprint(wb.active), layout_index)
+        dfs = layout_index.get_plan(wb.active).execute(wb.active)
+        self.assertTrue(compare_data_frames(dfs[0], exp_dfs[0]))
+
+        with self.assertRaises(IndexNotCompatible):
+            LayoutIndex.from_dict({"version": 0, "plans": {}})
+
+
+if __name__ == '__main__':
+    # unittest.main()
+    nose.run(defaultTest=__name__)
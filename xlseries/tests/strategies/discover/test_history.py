@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_history
+
+This module tests the history of the parameters discovered in each layout.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import nose
+
+from xlseries.strategies.discover.history import ParamsHistory
+from xlseries.strategies.discover.history import params_fingerprint
+from xlseries.strategies.discover.parameters import Parameters
+from xlseries.strategies.strategies import ParameterDiscovery
+from xlseries.utils.synthetic_cases import make_case
+from xlseries.utils.data_frame import compare_data_frames
+from xlseries.utils.instrumentation import Stats, recording
+
+
+def make_critical_case(periods, seed=1):
+    """Monthly case without continuity that only has critical parameters."""
+
+    wb, params, exp_dfs = make_case(
+        {"frequency": "M", "continuity": False, "time_alignment": -1},
+        periods=periods, series=2, seed=seed)
+    params = Parameters({param_name: params[param_name] for
+                         param_name in list(Parameters.CRITICAL) +
+                         ["time_alignment"]})
+
+    return wb, params, exp_dfs
+
+
+# @unittest.skip("skip")
+class ParamsHistoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "history", "params.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_record_and_load(self):
+        params = Parameters({"headers_coord": ["B1", "C1"],
+                             "data_starts": 2,
+                             "frequency": "M",
+                             "time_header_coord": "A1",
+                             "continuity": False,
+                             "missings": [True, False]})
+
+        history = ParamsHistory(self.path)
+        self.assertIsNone(history.get("layout"))
+        history.record("layout", params, ["continuity", "missings"], "Sheet")
+
+        history = ParamsHistory(self.path)
+        self.assertEqual(history.get("layout"), {"continuity": False,
+                                                 "missings": [True, False]})
+        self.assertEqual(history.defaults, {"continuity": [0, 2],
+                                            "missings": [1, 2]})
+
+    def test_likeliness_order(self):
+        history = ParamsHistory(self.path)
+        likeliness_order = Parameters.LIKELINESS_ORDER
+        self.assertEqual(history.likeliness_order(likeliness_order),
+                         likeliness_order)
+
+        # the default value of blank_rows never worked, it goes last
+        history.defaults["blank_rows"] = [0, 4]
+        order = history.likeliness_order(likeliness_order)
+        self.assertEqual(order[-1], "blank_rows")
+        self.assertEqual(order[:-1], [param_name for param_name in
+                                      likeliness_order if
+                                      param_name != "blank_rows"])
+
+    def test_default_ratios_order(self):
+        wb, params, exp_dfs = make_critical_case(periods=40)
+        missings = ParameterDiscovery._discover_missing_params(params)
+
+        combinations = ParameterDiscovery._sorted_combinations(missings,
+                                                               params)
+        self.assertTrue(combinations[0]["continuity"])
+
+        # the default value of continuity never worked, it goes first
+        history = ParamsHistory(self.path)
+        history.defaults["continuity"] = [0, 100]
+        self.assertAlmostEqual(history.default_ratios()["continuity"],
+                               1 / 101.0)
+
+        combinations = ParameterDiscovery._sorted_combinations(
+            missings, params,
+            likeliness_order=history.likeliness_order(
+                params.LIKELINESS_ORDER),
+            default_ratios=history.default_ratios())
+        self.assertFalse(combinations[0]["continuity"])
+        for param_name in missings:
+            if param_name != "continuity":
+                self.assertEqual(combinations[0][param_name],
+                                 params.DEFAULT_VALUES[param_name])
+
+    def test_fingerprint(self):
+        wb, params, exp_dfs = make_critical_case(periods=60)
+        wb_next, params_next, exp_dfs = make_critical_case(periods=72)
+
+        # the next release of the same worksheet has the same layout
+        self.assertEqual(params_fingerprint(wb.active, params),
+                         params_fingerprint(wb_next.active, params_next))
+
+        wb_next.active["C1"] = "Other series"
+        self.assertNotEqual(params_fingerprint(wb.active, params),
+                            params_fingerprint(wb_next.active, params_next))
+
+    def test_warm_start(self):
+        history = ParamsHistory(self.path)
+
+        wb, params, exp_dfs = make_critical_case(periods=40)
+        ParameterDiscovery._get_data_frames(wb.active, params, False,
+                                            history=history)
+
+        # the next release is scraped with the values found the first time
+        wb, params, exp_dfs = make_critical_case(periods=52)
+        stats = Stats()
+        with recording(stats):
+            dfs, params_found = ParameterDiscovery._get_data_frames(
+                wb.active, params, False, history=ParamsHistory(self.path))
+
+        self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+        self.assertEqual(stats.counters["history_layouts_found"], 1)
+        self.assertEqual(stats.counters["attempts_executed"], 1)
+        self.assertNotIn("attempts_failed", stats.counters)
+
+
+if __name__ == '__main__':
+    # unittest.main()
+    nose.run(defaultTest=__name__)
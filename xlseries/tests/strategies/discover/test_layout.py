@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_layout
+
+This module tests the discovery of the layout parameters of a worksheet.
+"""
+
+import datetime
+import unittest
+import nose
+from openpyxl import Workbook
+
+from xlseries.strategies.discover.layout import discover_layout
+from xlseries.strategies.discover.layout import discover_frequency
+from xlseries.strategies.discover.layout import complete_layout_params
+from xlseries.strategies.discover.layout import type_grid
+from xlseries.strategies.discover.layout import LayoutNotDiscovered
+from xlseries.strategies.discover.layout import EMPTY, NUMBER, STRING, DATE
+from xlseries.strategies.discover.parameters import Parameters
+from xlseries.strategies.discover.parameters import CriticalParameterMissing
+from xlseries.utils.case_loaders import load_original_case
+from xlseries.utils.case_loaders import load_parameters_case
+
+
+def make_vertical_ws():
+    """Worksheet with a title, a header row and two monthly series."""
+
+    wb = Workbook()
+    ws = wb.active
+
+    ws["A1"] = "Monthly indicators"
+    ws["A3"] = "Date"
+    ws["B3"] = "Series 1"
+    ws["C3"] = "Series 2"
+    for i_row in range(24):
+        ws.cell(row=i_row + 4, column=1).value = datetime.datetime(
+            2010 + i_row // 12, i_row % 12 + 1, 1)
+        ws.cell(row=i_row + 4, column=2).value = float(i_row)
+        ws.cell(row=i_row + 4, column=3).value = "{},5".format(i_row)
+    ws["A30"] = "Source: somewhere"
+
+    return ws
+
+
+def make_horizontal_ws():
+    """Worksheet with years along a row and a series in each row below."""
+
+    wb = Workbook()
+    ws = wb.active
+
+    ws["A1"] = "Year"
+    for i_col in range(10):
+        ws.cell(row=1, column=i_col + 2).value = 2000 + i_col
+        ws.cell(row=2, column=i_col + 2).value = 1.5 * i_col
+        ws.cell(row=3, column=i_col + 2).value = 2003.0 + i_col % 2
+    ws["A2"] = "Series 1"
+    ws["A3"] = "Series 2"
+
+    return ws
+
+
+# @unittest.skip("skip")
+class LayoutTestCase(unittest.TestCase):
+
+    def test_type_grid(self):
+        ws = make_vertical_ws()
+        grid, years = type_grid(ws)
+
+        self.assertEqual(grid.shape, (ws.max_row, ws.max_column))
+        self.assertEqual(grid[0, 0], STRING)
+        self.assertEqual(grid[1, 0], EMPTY)
+        self.assertEqual(grid[3, 0], DATE)
+        self.assertEqual(grid[3, 1], NUMBER)
+        self.assertEqual(grid[3, 2], NUMBER)
+
+        grid, years = type_grid(make_horizontal_ws())
+        self.assertEqual(years[0, 1], 2000)
+        self.assertEqual(years[1, 2], 0)
+
+    def test_type_grid_not_finite_numbers(self):
+        ws = make_vertical_ws()
+        ws["B5"] = "NaN"
+        ws["B6"] = "-Infinity"
+        ws["C5"] = float("nan")
+        ws["C6"] = float("inf")
+        grid, years = type_grid(ws)
+
+        self.assertEqual(grid[4, 1], NUMBER)
+        self.assertEqual(years[4:6, 1:3].tolist(), [[0, 0], [0, 0]])
+
+        self.assertEqual(complete_layout_params({}, ws)["headers_coord"],
+                         [u"B3", u"C3"])
+
+    def test_discover_vertical(self):
+        layout = discover_layout(make_vertical_ws())
+
+        self.assertEqual(layout, {"alignment": u"vertical",
+                                  "time_header_coord": u"A3",
+                                  "headers_coord": [u"B3", u"C3"],
+                                  "data_starts": 4})
+
+    def test_discover_horizontal(self):
+        layout = discover_layout(make_horizontal_ws())
+
+        self.assertEqual(layout, {"alignment": u"horizontal",
+                                  "time_header_coord": u"A1",
+                                  "headers_coord": [u"A2", u"A3"],
+                                  "data_starts": 2})
+
+    def test_discover_cases(self):
+        for case_num in [1, 3, 7]:
+            params = load_parameters_case(case_num)
+            layout = discover_layout(load_original_case(case_num).active)
+            layout["frequency"] = params["frequency"][0]
+
+            discovered_params = Parameters(layout)
+            for param_name in ["alignment", "time_header_coord",
+                               "headers_coord", "data_starts"]:
+                self.assertEqual(discovered_params[param_name],
+                                 params[param_name])
+
+    def test_not_discovered(self):
+        ws = Workbook().active
+        ws["A1"] = "Only"
+        ws["A2"] = "some"
+        ws["A3"] = "words"
+
+        with self.assertRaises(LayoutNotDiscovered):
+            discover_layout(ws)
+
+        with self.assertRaises(CriticalParameterMissing):
+            complete_layout_params({"frequency": "M"}, ws)
+
+    def test_discover_frequency(self):
+        self.assertEqual(discover_frequency(make_vertical_ws(), u"vertical",
+                                            "A3", 4), "M")
+        self.assertEqual(discover_frequency(make_horizontal_ws(),
+                                            u"horizontal", "A1", 2), "A")
+
+        for case_num in [1, 2, 7]:
+            params = load_parameters_case(case_num)
+            frequency = discover_frequency(
+                load_original_case(case_num).active, params["alignment"][0],
+                params["time_header_coord"][0], params["data_starts"][0])
+            self.assertEqual(frequency, params["frequency"][0])
+
+    def test_complete_layout_params(self):
+        ws = make_vertical_ws()
+
+        params = complete_layout_params({"frequency": "M",
+                                         "headers_coord": ["C3"]}, ws)
+        self.assertEqual(params, {"frequency": "M",
+                                  "headers_coord": ["C3"],
+                                  "time_header_coord": u"A3",
+                                  "data_starts": 4})
+
+        params = {"frequency": "M", "headers_coord": ["C3"],
+                  "time_header_coord": "A3", "data_starts": 4}
+        self.assertIs(complete_layout_params(params, ws), params)
+        self.assertIsNone(complete_layout_params(None, ws))
+
+        self.assertEqual(complete_layout_params({}, ws),
+                         {"frequency": "M",
+                          "alignment": u"vertical",
+                          "headers_coord": [u"B3", u"C3"],
+                          "time_header_coord": u"A3",
+                          "data_starts": 4})
+
+    def test_frequency_not_discovered(self):
+        ws = make_vertical_ws()
+        for i_row in range(4, 28):
+            ws.cell(row=i_row, column=1).value = "period {}".format(i_row)
+
+        params = {"headers_coord": ["B3", "C3"], "time_header_coord": "A3",
+                  "data_starts": 4}
+        with self.assertRaises(CriticalParameterMissing):
+            complete_layout_params(params, ws)
+
+
+if __name__ == '__main__':
+    # unittest.main()
+    nose.run(defaultTest=__name__)
@@ -13,6 +13,7 @@ import nose
 from openpyxl import Workbook
 import arrow
 import pandas as pd
+import numpy as np
 
 from xlseries.utils.data_frame import compare_period_ranges
 from xlseries.strategies.get.period_range import GetPeriodRangesSingleFrequency
@@ -63,6 +64,40 @@ class GetPeriodRangesSingleFrequencyTestCase(unittest.TestCase):
 
         self.assertTrue(compare_period_ranges(pr_q, prs[0]))
 
+    def test_get_period_ranges_business_days(self):
+        test_class = GetPeriodRangesSingleFrequency
+        wb = Workbook()
+        ws = wb.active
+        days = pd.bdate_range("20000103", "20000114")
+        for row, day in enumerate(days, 1):
+            ws.cell(row=row, column=1).value = day.to_pydatetime()
+
+        # weekends are skipped, the time index has only business days
+        prs = test_class.get_period_ranges(ws, "D", 1, "A1", len(days), 0,
+                                           "vertical")
+        self.assertEqual(prs[0].freqstr, "B")
+        self.assertTrue(compare_period_ranges(days, prs[0]))
+
+        # a week without a weekend is still daily
+        prs = test_class.get_period_ranges(ws, "D", 1, "A1", 5, 0,
+                                           "vertical")
+        self.assertEqual(prs[0].freqstr, "D")
+
+    def test_period_ranges_reused(self):
+        test_class = GetPeriodRangesSingleFrequency
+        ws = Workbook().active
+        ws["A1"] = arrow.get(2000, 1, 1).datetime
+        ws["A2"] = arrow.get(2000, 4, 1).datetime
+
+        pr_a = test_class.get_period_ranges(ws, "Q", 1, "A1", 2, 0,
+                                            "vertical")[0]
+        pr_b = test_class.get_period_ranges(ws, "Q", 1, "A1", 2, 0,
+                                            "vertical")[0]
+
+        self.assertTrue(np.shares_memory(pr_a.values, pr_b.values))
+        pr_a.name = "time"
+        self.assertIsNone(pr_b.name)
+
 
 class GetPeriodRangesMultifrequencyTestCase(unittest.TestCase):
 
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_plan
+
+Tests for `plan` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import nose
+
+from xlseries.xlseries import XlSeries
+from xlseries.strategies.plan import ExtractionPlan, PlanNotCompatible
+from xlseries.utils.case_loaders import load_original_case
+from xlseries.utils.case_loaders import load_parameters_case
+from xlseries.utils.case_loaders import load_critical_parameters_case
+from xlseries.utils.case_loaders import load_expected_case
+from xlseries.utils.data_frame import compare_data_frames
+from xlseries.utils.xl_methods import get_ws_values
+
+
+# @unittest.skip("skip")
+class ExtractionPlanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_case(self, case_num, params):
+        plan = XlSeries(load_original_case(case_num)).compile_plan(params)
+
+        plan_path = os.path.join(self.temp_dir, "plan.json")
+        plan.save(plan_path)
+
+        dfs = XlSeries(load_original_case(case_num)).execute_plan(plan_path)
+        if not isinstance(dfs, list):
+            dfs = [dfs]
+        exp_dfs = load_expected_case(case_num)
+
+        self.assertEqual(len(dfs), len(exp_dfs))
+        for df, exp_df in zip(sorted(dfs, key=len), sorted(exp_dfs, key=len)):
+            self.assertTrue(compare_data_frames(df, exp_df))
+
+        return plan
+
+    def test_case2(self):
+        """Two time indexes, one parsed with a time format."""
+        plan = self.run_case(2, load_parameters_case(2))
+
+        self.assertEqual(len(plan.time_indexes), 2)
+        self.assertEqual(plan.time_indexes[0]["time_parser"],
+                         "ParseSimpleTime")
+        self.assertTrue(plan.time_indexes[0]["time_format"])
+        self.assertEqual([series["params"]["data_ends"] for series in
+                          plan.series], [2993, 2986])
+
+    def test_case6_critical_params(self):
+        """Multicolumn and multifrequency, with discovered parameters."""
+        params = load_critical_parameters_case(6)
+        params["continuity"] = False
+        params["blank_rows"] = True
+        plan = self.run_case(6, params)
+
+        self.assertEqual(len(plan.time_indexes), 1)
+        for series in plan.series:
+            # the data end is estimated again in every worksheet
+            self.assertIsNone(series["params"]["data_ends"])
+            self.assertTrue(series["params"]["time_multicolumn"])
+
+    def test_execute_does_not_change_workbook(self):
+        wb = load_original_case(1)
+        series = XlSeries(wb)
+        plan = series.compile_plan(load_parameters_case(1))
+        values = get_ws_values(wb.active)
+
+        series.execute_plan(plan)
+
+        self.assertEqual(get_ws_values(wb.active), values)
+
+    def test_not_compatible_plans(self):
+        plan = XlSeries(load_original_case(1)).compile_plan(
+            load_parameters_case(1))
+
+        plan_dict = plan.to_dict()
+        plan_dict["series"][0]["get_data_strategy"] = "NotAStrategy"
+        with self.assertRaises(PlanNotCompatible):
+            ExtractionPlan.from_dict(plan_dict)
+
+        plan_dict = plan.to_dict()
+        plan_dict["version"] = ExtractionPlan.VERSION + 1
+        with self.assertRaises(PlanNotCompatible):
+            ExtractionPlan.from_dict(plan_dict)
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
@@ -11,6 +11,8 @@ from __future__ import unicode_literals
 import unittest
 import nose
 import pandas as pd
+import numpy as np
+import copy
 from functools import wraps
 
 from xlseries.strategies.discover.parameters import Parameters
@@ -20,6 +22,11 @@ from xlseries.utils.case_loaders import load_expected_case
 from xlseries.utils.data_frame import compare_period_ranges
 from xlseries.utils.data_frame import compare_data_frames
 from xlseries.strategies.strategies import ParameterDiscovery
+from xlseries.strategies.strategies import AttemptsBudgetExhausted
+from xlseries.strategies.discover.budget import AttemptsBudget
+from xlseries.utils.synthetic_cases import make_case
+from xlseries.utils.xl_methods import make_ws_copy
+from xlseries.utils.instrumentation import Stats, recording
 
 
 # @unittest.skip("skip")
@@ -169,6 +176,194 @@ class ParameterDiscoveryTestCase(unittest.TestCase):
         for comb_with_def in with_def:
             self.assertIn(comb_with_def, no_def)
 
+    def test_probe_attempts(self):
+        wb, params, exp_dfs = make_case(
+            {"frequency": "M", "continuity": False, "time_alignment": -1},
+            periods=150, series=2, seed=1)
+        params = Parameters({param_name: params[param_name] for
+                             param_name in list(Parameters.CRITICAL) +
+                             ["time_alignment"]})
+        ws = wb.active
+
+        attempts = ParameterDiscovery._discover_parameters(ws, params)
+        probed = [attempt for attempt in attempts if
+                  ParameterDiscovery._get_probe_window(ws, attempt)]
+        self.assertTrue(probed)
+
+        # attempts rejected by the probe also fail over the whole worksheet
+        num_rejected = 0
+        for attempt in probed:
+            if not ParameterDiscovery._probe_attempt(ws, attempt):
+                num_rejected += 1
+                attempt = copy.deepcopy(attempt)
+                ws_copy = make_ws_copy(ws)
+                with self.assertRaises(Exception):
+                    ParameterDiscovery._clean_data(ws_copy, attempt)
+                    ParameterDiscovery._get_data(ws_copy, attempt)
+        self.assertGreater(num_rejected, 0)
+
+        stats = Stats()
+        with recording(stats):
+            dfs, params_found = ParameterDiscovery._get_data_frames(
+                ws, params, safe_mode=False)
+
+        self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+        self.assertEqual(params_found["time_alignment"], [-1, -1])
+        self.assertGreater(stats.counters["attempts_probe_failed"], 0)
+
+        # safe mode runs every attempt in full to compare all the results
+        stats = Stats()
+        with recording(stats):
+            ParameterDiscovery._get_data_frames(ws, params, safe_mode=True)
+
+        self.assertNotIn("attempts_probe_failed", stats.counters)
+        self.assertEqual(stats.counters["attempts_executed"], len(attempts))
+
+    def test_short_worksheets_are_not_probed(self):
+        wb, params, exp_dfs = make_case({"frequency": "M"}, periods=60,
+                                        series=2, seed=1)
+
+        self.assertIsNone(ParameterDiscovery._get_probe_window(
+            wb.active, Parameters(params)))
+
+    def test_attempts_order(self):
+        params = Parameters({"headers_coord": ["B1", "C1"],
+                             "data_starts": 2,
+                             "frequency": "M",
+                             "time_header_coord": "A1",
+                             "alignment": "vertical",
+                             "missings": False,
+                             "time_multicolumn": False})
+
+        attempts = ParameterDiscovery._generate_attempts(
+            ["continuity", "time_composed", "blank_rows"], params)
+        non_defaults = [
+            [param_name for param_name in
+             ["continuity", "time_composed", "blank_rows"] if
+             attempt[param_name][0] != Parameters.DEFAULT_VALUES[param_name]]
+            for attempt in attempts]
+
+        self.assertEqual(non_defaults, [
+            [], ["blank_rows"], ["continuity"], ["time_composed"],
+            ["continuity", "blank_rows"], ["time_composed", "blank_rows"],
+            ["continuity", "time_composed"],
+            ["continuity", "time_composed", "blank_rows"]])
+
+    def test_attempts_budget(self):
+        wb, params, exp_dfs = make_case(
+            {"frequency": "M", "continuity": False, "time_alignment": -1},
+            periods=40, series=2, seed=1)
+        params = Parameters({param_name: params[param_name] for
+                             param_name in list(Parameters.CRITICAL) +
+                             ["time_alignment"]})
+
+        # the first attempt, with default values, fails
+        with self.assertRaises(AttemptsBudgetExhausted):
+            ParameterDiscovery._get_data_frames(
+                wb.active, params, safe_mode=True,
+                budget=AttemptsBudget(max_attempts=1))
+
+        # only one non default value (continuity) is needed, so the
+        # successful attempt is tried before the ones with many of them
+        budget = AttemptsBudget(max_attempts=5)
+        dfs, params_found = ParameterDiscovery._get_data_frames(
+            wb.active, params, safe_mode=False, budget=budget)
+        self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+        self.assertEqual(params_found["continuity"], [False, False])
+        self.assertEqual((budget.attempts, budget.skipped), (5, 0))
+
+        with self.assertRaises(ValueError):
+            AttemptsBudget(time_budget=0)
+
+    def test_results_scoring(self):
+        wb, params, exp_dfs = make_case(
+            {"frequency": "M", "continuity": False},
+            periods=60, series=2, seed=2)
+        params = Parameters({param_name: params[param_name] for
+                             param_name in Parameters.CRITICAL})
+
+        # the first successful attempt stops at the first string in the data
+        dfs, params_found = ParameterDiscovery._get_data_frames(
+            wb.active, params, safe_mode=False)
+        self.assertEqual(len(dfs), 12)
+
+        stats = Stats()
+        with recording(stats):
+            dfs, params_found = ParameterDiscovery._get_data_frames(
+                wb.active, params, safe_mode=False, confidence_threshold=0.95)
+        self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+        self.assertGreater(stats.counters["attempts_pruned"], 0)
+
+        # in safe mode, the best scored result comes first
+        dfs, params_found = ParameterDiscovery._get_data_frames(
+            wb.active, params, safe_mode=True)
+        self.assertEqual(len(dfs), 2)
+        self.assertTrue(compare_data_frames(dfs[0], exp_dfs[0]))
+
+    def test_per_series_discovery(self):
+        wb, params, exp_dfs = make_case({"frequency": "M", "missings": True},
+                                        periods=60, series=3,
+                                        missing_rate=0.1, seed=1)
+        params = Parameters({param_name: params[param_name] for
+                             param_name in Parameters.CRITICAL})
+
+        stats = Stats()
+        with recording(stats):
+            dfs, params_found = ParameterDiscovery._get_data_frames(
+                wb.active, params, safe_mode=False, per_series=True)
+
+        self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+        self.assertEqual(params_found["missings"], [True, True, True])
+
+        # the series share their time index, cleaned once for each way of
+        # cleaning it instead of once for each series
+        self.assertLess(stats.timers["clean_time_index"]["calls"],
+                        stats.counters["series_attempts_executed"])
+
+    def test_get_series_attempt(self):
+        params = Parameters({"headers_coord": ["B1", "C1", "D1"],
+                             "data_starts": 2,
+                             "frequency": "M",
+                             "time_header_coord": "A1"})
+
+        params_series = ParameterDiscovery._get_series_attempt(
+            params, 1, {"continuity": False})
+
+        self.assertEqual(len(params_series), 1)
+        self.assertEqual(params_series["headers_coord"], ["C1"])
+        self.assertEqual(params_series["continuity"], [False])
+        self.assertIsNone(params["continuity"])
+
+    def test_data_frames_from_buffers(self):
+        pr_m = pd.period_range("2000-01", periods=4, freq="M")
+        dfs_dict = {}
+
+        # the buffer grows for series that weren't counted before
+        for name in ["a", "b", "a"]:
+            ParameterDiscovery._add_series_data(dfs_dict, [pr_m],
+                                                [(name, [1.0, None, 3, 4])])
+        # values that don't match the period range are not taken
+        with self.assertRaises(ValueError):
+            ParameterDiscovery._add_series_data(dfs_dict, [pr_m],
+                                                [("c", [1, 2, 3])])
+
+        df_m = ParameterDiscovery._build_data_frames(dfs_dict)[0]
+
+        self.assertEqual(list(df_m.columns), ["a", "b", "a.2"])
+        self.assertTrue(df_m["b"].isnull().iloc[1])
+        self.assertEqual(df_m["a.2"].dtype, np.float64)
+
+        # counted series are written in a buffer used by the data frame
+        df_inputs = ParameterDiscovery._new_df_inputs(pr_m, 2)
+        dfs_dict = {ParameterDiscovery._hash_period_range(pr_m): df_inputs}
+        ParameterDiscovery._add_series_data(dfs_dict, [pr_m, pr_m],
+                                            [("a", [1, 2, 3, 4]),
+                                             ("b", [5, 6, 7, 8])])
+        df = ParameterDiscovery._build_data_frames(dfs_dict)[0]
+
+        self.assertTrue(df_inputs["data"].flags.f_contiguous)
+        self.assertTrue(np.shares_memory(df.values, df_inputs["data"]))
+
 
 if __name__ == '__main__':
     # unittest.main()
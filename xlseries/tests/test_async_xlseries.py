@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_async_xlseries
+
+Tests for `async_xlseries` module.
+"""
+
+import asyncio
+import io
+import threading
+import time
+import unittest
+import nose
+from mock import patch
+
+from xlseries.utils.path_finders import get_orig_cases_path
+from xlseries.utils.case_loaders import load_expected_case
+from xlseries.utils.case_loaders import load_parameters_case
+from xlseries.utils.data_frame import compare_data_frames
+from xlseries.async_xlseries import AsyncXlSeries, aget_data_frames
+from xlseries.xlseries import XlSeries
+
+
+def run(coroutine):
+    """Run a coroutine in a new event loop and return its result."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+# @unittest.skip("skip")
+class AsyncXlSeriesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        with open(get_orig_cases_path(1), "rb") as f:
+            self.xl_contents = f.read()
+        self.params = load_parameters_case(1)
+        self.exp_df = load_expected_case(1)[0]
+
+    def test_get_data_frames_from_bytes(self):
+
+        async def scrape():
+            async with AsyncXlSeries(max_workers=2) as async_series:
+                return await async_series.get_data_frames(self.xl_contents,
+                                                          self.params)
+
+        self.assertTrue(compare_data_frames(run(scrape()), self.exp_df))
+
+    def test_get_data_frames_from_file_like(self):
+        df = run(aget_data_frames(io.BytesIO(self.xl_contents), self.params))
+        self.assertTrue(compare_data_frames(df, self.exp_df))
+
+    def test_max_concurrency(self):
+        running = [0]
+        max_running = [0]
+        lock = threading.Lock()
+
+        def get_data_frames(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        async def scrape():
+            async_series = AsyncXlSeries(max_workers=4, max_concurrency=2)
+            calls = [async_series.get_data_frames(self.xl_contents,
+                                                  self.params)
+                     for i in range(6)]
+            await asyncio.gather(*calls)
+            async_series.close()
+
+        with patch.object(XlSeries, "get_data_frames", get_data_frames):
+            run(scrape())
+
+        self.assertEqual(max_running[0], 2)
+
+    def test_cancel_while_loading(self):
+        loaded = threading.Event()
+
+        def slow_load_wb(cls, xl_path):
+            time.sleep(0.2)
+            loaded.set()
+            return load_wb(xl_path)
+
+        async def scrape(async_series):
+            task = asyncio.ensure_future(
+                async_series.get_data_frames(self.xl_contents, self.params))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        load_wb = XlSeries._load_wb
+        async_series = AsyncXlSeries(max_workers=1)
+        with patch.object(XlSeries, "_load_wb", classmethod(slow_load_wb)), \
+                patch.object(XlSeries, "get_data_frames") as get_data_frames:
+            run(scrape(async_series))
+            self.assertTrue(loaded.wait(1))
+            # wait for the loading job to finish in the executor
+            async_series.executor.shutdown(wait=True)
+
+        get_data_frames.assert_not_called()
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
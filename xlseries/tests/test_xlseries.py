@@ -7,16 +7,29 @@ test_xlseries
 Tests for `xlseries` module.
 """
 
+import io
+import json
+import os
+import subprocess
+import sys
 import unittest
+import warnings
 import nose
 from functools import wraps
+from openpyxl import Workbook
+import pandas as pd
+import numpy as np
 
 from xlseries.utils.path_finders import get_orig_cases_path
 from xlseries.utils.case_loaders import load_original_case
 from xlseries.utils.case_loaders import load_expected_case
 from xlseries.utils.case_loaders import load_parameters_case
-from xlseries.xlseries import XlSeries
+from xlseries.utils.case_loaders import load_critical_parameters_case
+from xlseries.xlseries import XlSeries, WorksheetNotScraped
 from xlseries.utils.data_frame import compare_data_frames
+from xlseries.utils.xl_methods import get_ws_values
+from xlseries.utils.instrumentation import Stats
+from xlseries.strategies.strategies import AttemptsBudgetExhausted
 
 
 def load_case_number():
@@ -111,7 +124,7 @@ class TestXlSeriesWithAllParameters(unittest.TestCase):
 class TestXlSeriesWithoutSomeParameters(unittest.TestCase):
 
     def run_case_without_some_parameters(self, case_num, specific_params=None,
-                                         special_case=None):
+                                         special_case=None, per_series=False):
         """Run a test case deleting some parameters.
 
         Args:
@@ -129,7 +142,8 @@ class TestXlSeriesWithoutSomeParameters(unittest.TestCase):
         # change safe_mode to True, for complete test in safe_mode (very slow)
         safe_mode = False
         series = XlSeries(test_wb)
-        test_dfs = series.get_data_frames(params, safe_mode=safe_mode)
+        test_dfs = series.get_data_frames(params, safe_mode=safe_mode,
+                                          per_series=per_series)
 
         # get them always into a list
         if not isinstance(test_dfs, list):
@@ -186,6 +200,11 @@ class TestXlSeriesWithoutSomeParameters(unittest.TestCase):
     def test_case7(self, case_num):
         self.run_case_without_some_parameters(case_num)
 
+    # @unittest.skip("skip")
+    @load_case_number()
+    def test_per_series_case6(self, case_num):
+        self.run_case_without_some_parameters(case_num, per_series=True)
+
 
 # @unittest.skip("skip")
 class TestXlSeriesVariations(TestXlSeriesWithAllParameters):
@@ -215,5 +234,277 @@ class TestXlSeriesVariations(TestXlSeriesWithAllParameters):
                                       special_case="_composed_headers")
 
 
+# @unittest.skip("skip")
+class TestXlSeriesMultipleWorksheets(unittest.TestCase):
+
+    def setUp(self):
+        """Build a workbook with the sheets of test cases 1 and 3."""
+        self.wb = Workbook()
+        self.wb.remove(self.wb.active)
+
+        for case_num in [1, 3]:
+            ws_case = load_original_case(case_num).active
+            ws = self.wb.create_sheet(title="case" + str(case_num))
+            for row in get_ws_values(ws_case):
+                ws.append(row)
+
+    def run_multi(self, max_workers):
+        params = {"case1": load_parameters_case(1),
+                  "case3": load_parameters_case(3),
+                  "missing_sheet": load_parameters_case(1)}
+
+        results = XlSeries(self.wb).get_data_frames_multi(
+            params, max_workers=max_workers)
+
+        self.assertEqual(set(results.keys()), set(params.keys()))
+        self.assertIsInstance(results["missing_sheet"], WorksheetNotScraped)
+
+        for case_num in [1, 3]:
+            test_df = results["case" + str(case_num)]
+            exp_df = load_expected_case(case_num)[0]
+            self.assertTrue(compare_data_frames(test_df, exp_df))
+
+    def test_get_data_frames_multi(self):
+        self.run_multi(max_workers=2)
+
+    def test_get_data_frames_multi_single_process(self):
+        self.run_multi(max_workers=1)
+
+    def test_get_data_frames_multi_with_errors(self):
+        params = load_parameters_case(1)
+        params["frequency"] = "A"
+
+        results = XlSeries(self.wb).get_data_frames_multi(
+            {"case1": params}, max_workers=1)
+
+        self.assertIsInstance(results["case1"], WorksheetNotScraped)
+
+    def test_get_data_frames_multi_keys(self):
+        params = {" case1 ": load_parameters_case(1),
+                  " missing ": load_parameters_case(1)}
+
+        xl = XlSeries(self.wb)
+        results = xl.get_data_frames_multi(params, max_workers=1,
+                                           per_series=True)
+
+        # results have the keys passed, even if the names were sanitized
+        self.assertEqual(set(results.keys()), set(params.keys()))
+        self.assertIsInstance(results[" missing "], WorksheetNotScraped)
+        self.assertTrue(compare_data_frames(results[" case1 "],
+                                            load_expected_case(1)[0]))
+        self.assertIn("case1", xl.params)
+
+    def test_get_data_frames_multi_stats(self):
+        stats = Stats()
+        params = {"case1": load_parameters_case(1),
+                  "case3": load_parameters_case(3)}
+
+        XlSeries(self.wb, stats=stats).get_data_frames_multi(params,
+                                                             max_workers=2)
+
+        # measures made in the worker processes are merged
+        self.assertEqual(stats.counters["attempts_executed"], 2)
+        self.assertGreater(stats.counters["data_cells_read"], 0)
+        self.assertEqual(stats.timers["copy"]["calls"], 2)
+
+
+# @unittest.skip("skip")
+class TestXlSeriesStats(unittest.TestCase):
+
+    def test_stats(self):
+        stats = Stats()
+        series = XlSeries(get_orig_cases_path(2), stats=stats)
+        series.get_data_frames(load_critical_parameters_case(2))
+
+        for stage_name in ["load", "copy", "discover_parameters",
+                           "clean_time_index", "get_data", "period_ranges",
+                           "data_frames"]:
+            self.assertIn(stage_name, stats.timers)
+
+        counters = stats.counters
+        self.assertEqual(counters["attempts_executed"] +
+                         counters["attempts_pruned"],
+                         counters["attempts_generated"])
+        self.assertGreater(counters["attempts_generated"], 1)
+        self.assertGreater(counters["time_cells_written"], 0)
+        self.assertGreater(counters["parse_time_parser_reused"], 0)
+        self.assertGreater(counters["clean_ti_strategies_accepted"], 0)
+
+    def test_no_stats(self):
+        series = XlSeries(get_orig_cases_path(1))
+        series.get_data_frames(load_parameters_case(1))
+
+        self.assertIsNone(series.stats)
+
+
+# @unittest.skip("skip")
+# @unittest.skip("skip")
+class TestXlSeriesWithoutLayoutParameters(unittest.TestCase):
+
+    def run_case_without_layout_parameters(self, case_num, params=None):
+        """Run a test case without the layout parameters (and the frequency,
+        if not passed), so they have to be discovered."""
+
+        exp_dfs = load_expected_case(case_num)
+
+        test_dfs = XlSeries(get_orig_cases_path(case_num)).get_data_frames(
+            params or {})
+
+        if not isinstance(test_dfs, list):
+            test_dfs = [test_dfs]
+        if not isinstance(exp_dfs, list):
+            exp_dfs = [exp_dfs]
+
+        for test_df, exp_df in zip(test_dfs, exp_dfs):
+            self.assertTrue(compare_data_frames(test_df, exp_df))
+
+    # @unittest.skip("skip")
+    @load_case_number()
+    def test_case1(self, case_num):
+        self.run_case_without_layout_parameters(case_num)
+
+    # @unittest.skip("skip")
+    @load_case_number()
+    def test_case3(self, case_num):
+        self.run_case_without_layout_parameters(case_num, {"frequency": "Q"})
+
+    # @unittest.skip("skip")
+    @load_case_number()
+    def test_case7(self, case_num):
+        self.run_case_without_layout_parameters(case_num)
+
+
+class TestXlSeriesBudget(unittest.TestCase):
+
+    def test_max_attempts(self):
+        stats = Stats()
+        series = XlSeries(get_orig_cases_path(2), stats=stats)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            dfs = series.get_data_frames(load_critical_parameters_case(2),
+                                         safe_mode=True, max_attempts=2)
+
+        counters = stats.counters
+        self.assertEqual(counters["attempts_skipped"],
+                         counters["attempts_generated"] - 2)
+        self.assertIn("were skipped", str(caught[-1].message))
+
+        exp_dfs = load_expected_case(2)
+        for df, exp_df in zip(sorted(dfs, key=len), sorted(exp_dfs, key=len)):
+            self.assertTrue(compare_data_frames(df, exp_df))
+
+    def test_time_budget_exhausted(self):
+        series = XlSeries(get_orig_cases_path(2))
+
+        with self.assertRaises(AttemptsBudgetExhausted):
+            series.get_data_frames(load_critical_parameters_case(2),
+                                   safe_mode=True, time_budget=1e-9)
+
+
+# @unittest.skip("skip")
+class TestXlSeriesIterSeries(unittest.TestCase):
+
+    def run_case_iter_series(self, case_num, params, stats=None):
+        """Compare each series yielded with its column in the expected data
+        frames."""
+
+        exp_dfs = load_expected_case(case_num)
+        if not isinstance(exp_dfs, list):
+            exp_dfs = [exp_dfs]
+
+        num_series = 0
+        for name, period_range, values in XlSeries(
+                get_orig_cases_path(case_num), stats).iter_series(params):
+            exp_df = [exp_df for exp_df in exp_dfs if
+                      len(exp_df) == len(period_range) and
+                      name in exp_df.columns][0]
+            df = pd.DataFrame(values, index=period_range, columns=[name])
+            self.assertTrue(compare_data_frames(df, exp_df[[name]]))
+            num_series += 1
+
+        self.assertEqual(num_series, sum(len(exp_df.columns) for
+                                         exp_df in exp_dfs))
+
+    def test_iter_series_case2(self):
+        stats = Stats()
+        self.run_case_iter_series(2, load_parameters_case(2), stats)
+
+        # data frames are never built
+        self.assertIn("get_data", stats.timers)
+        self.assertNotIn("data_frames", stats.timers)
+
+    def test_iter_series_without_some_parameters_case2(self):
+        self.run_case_iter_series(2, load_critical_parameters_case(2))
+
+
+# @unittest.skip("skip")
+class TestXlSeriesOutputValues(unittest.TestCase):
+
+    def test_dtype_and_float_noise(self):
+        series = XlSeries(get_orig_cases_path(1))
+        df = series.get_data_frames(load_parameters_case(1),
+                                    dtype=np.float32, clean_float_noise=True)
+
+        self.assertTrue((df.dtypes == np.float32).all())
+        self.assertTrue(compare_data_frames(df, load_expected_case(1)[0]))
+
+        for name, period_range, values in series.iter_series(
+                load_parameters_case(1), dtype=np.float32):
+            self.assertEqual(values.dtype, np.float32)
+
+
+# @unittest.skip("skip")
+class TestXlSeriesLoading(unittest.TestCase):
+
+    XLS_PATH = os.path.join(os.path.dirname(__file__), "utils",
+                            "sh_ipcnu.xls")
+
+    def run_load_contents(self, xl_path):
+        with open(xl_path, "rb") as f:
+            xl_contents = f.read()
+        exp_wb = XlSeries(xl_path).wb
+
+        for xl_source in [xl_contents, io.BytesIO(xl_contents)]:
+            wb = XlSeries(xl_source).wb
+            self.assertEqual(wb.sheetnames, exp_wb.sheetnames)
+            self.assertEqual(get_ws_values(wb.active),
+                             get_ws_values(exp_wb.active))
+
+    def test_load_xlsx_contents(self):
+        self.run_load_contents(get_orig_cases_path(1))
+
+    def test_load_xls_contents(self):
+        self.run_load_contents(self.XLS_PATH)
+
+
+# @unittest.skip("skip")
+class TestXlSeriesImport(unittest.TestCase):
+
+    def test_heavy_dependencies_not_imported(self):
+        package_parent = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        script = "; ".join([
+            "import json, sys, warnings",
+            "import xlseries",
+            "print(json.dumps([sorted(sys.modules), len(warnings.filters)]))"
+        ])
+
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         cwd=package_parent)
+        modules, num_filters = json.loads(output.decode("utf-8"))
+
+        for module in ["openpyxl", "pandas", "xlrd", "parsley",
+                       "xlseries.strategies.strategies"]:
+            self.assertNotIn(module, modules)
+
+        # no warnings filter is added by the package
+        output = subprocess.check_output(
+            [sys.executable, "-c",
+             "import warnings; print(len(warnings.filters))"],
+            cwd=package_parent)
+        self.assertEqual(num_filters, int(output))
+
+
 if __name__ == '__main__':
     nose.run(defaultTest=__name__)
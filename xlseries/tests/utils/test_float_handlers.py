@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_float_handlers
+
+Tests for `float_handlers` utils module.
+"""
+
+import random
+import unittest
+import nose
+import numpy as np
+import pandas as pd
+
+from xlseries.utils.float_handlers import significant_figures
+from xlseries.utils.float_handlers import significant_figures_array
+from xlseries.utils.float_handlers import round_float_noise
+from xlseries.utils.data_frame import convert_data_frame
+
+
+class FloatHandlersTest(unittest.TestCase):
+
+    def test_significant_figures_array(self):
+        rand = random.Random(1)
+
+        for _ in range(200):
+            decimals = rand.randint(0, 6)
+            values = [round(rand.uniform(0, 1e4), decimals) for _ in
+                      range(10)] + [np.nan]
+            figures = significant_figures(values)
+            self.assertEqual(significant_figures_array(np.array(values)),
+                             figures)
+            self.assertEqual(significant_figures_array(-np.array(values)),
+                             figures)
+
+            # values computed in excel often carry float noise
+            noisy_values = [value + 0.1 - 0.1 for value in values]
+            self.assertEqual(significant_figures_array(np.array(noisy_values)),
+                             figures)
+
+        self.assertEqual(significant_figures_array(np.array([np.nan])), 0)
+        self.assertEqual(significant_figures_array(np.array([1200.0, 0])), 0)
+
+    def test_round_float_noise(self):
+        values = np.array([[0.1 + 0.2, 1.0 - 0.9, 5.0],
+                           [1.5, 2.25, np.nan]], order="F")
+        rounded = round_float_noise(values)
+
+        self.assertIs(rounded, values)
+        self.assertEqual(values[0, 0], 0.3)
+        self.assertEqual(values[0, 1], 0.1)
+        self.assertEqual(values[1, 1], 2.25)
+        self.assertTrue(np.isnan(values[1, 2]))
+
+        values = np.array([0.1 + 0.2, 0.25])
+        self.assertEqual(list(round_float_noise(values)), [0.3, 0.25])
+
+    def test_round_float_noise_tiny_values(self):
+        values = np.array([[1.23e-17, 0.1 + 0.2], [3.5e-20, 2.0]], order="F")
+        round_float_noise(values)
+
+        self.assertEqual(list(values[:, 0]), [1.23e-17, 3.5e-20])
+        self.assertEqual(list(values[:, 1]), [0.3, 2.0])
+
+        self.assertEqual(significant_figures_array(np.array([1.23e-17])), 19)
+
+        # the decimals of tiny values don't overflow huge ones
+        values = np.array([1e300, 1.5e-17])
+        self.assertEqual(list(round_float_noise(values)), [1e300, 1.5e-17])
+
+    def test_convert_data_frame(self):
+        index = pd.period_range("2000-01", periods=3, freq="M")
+        df = pd.DataFrame({"a": [0.1 + 0.2, 1.5, np.nan],
+                           "b": [1.0, 2.0, 3.0]}, index=index)
+
+        df_converted = convert_data_frame(df, np.float32, True)
+
+        self.assertEqual(list(df_converted.dtypes), [np.float32, np.float32])
+        self.assertEqual(df_converted["a"].iloc[0], np.float32(0.3))
+        self.assertTrue(np.isnan(df_converted["a"].iloc[2]))
+        self.assertTrue(df_converted.index.equals(index))
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_instrumentation
+
+Tests for `instrumentation` utils module.
+"""
+
+import io
+import json
+import unittest
+import nose
+
+from xlseries.utils.instrumentation import Stats, recording, get_active
+from xlseries.utils.instrumentation import stage, count
+
+
+# @unittest.skip("skip")
+class InstrumentationTestCase(unittest.TestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(get_active())
+
+        # nothing is recorded without an active Stats object
+        with stage("stage"):
+            count("counter")
+
+    def test_recording(self):
+        stats = Stats()
+
+        with recording(stats):
+            with stage("stage"):
+                count("counter")
+                count("counter", 2)
+            with stage("stage"):
+                pass
+
+            # None keeps the active Stats object
+            with recording(None):
+                count("counter")
+
+        self.assertIsNone(get_active())
+        self.assertEqual(stats.counters, {"counter": 4})
+        self.assertEqual(stats.timers["stage"]["calls"], 2)
+        self.assertGreaterEqual(stats.timers["stage"]["time"], 0.0)
+
+    def test_callback(self):
+        events = []
+        stats = Stats(callback=lambda *event: events.append(event))
+
+        with recording(stats):
+            count("counter", 3)
+            with stage("stage"):
+                pass
+
+        self.assertEqual(events[0], ("count", "counter", 3))
+        self.assertEqual(events[1][:2], ("time", "stage"))
+
+    def test_merge(self):
+        stats = Stats()
+        stats.count("counter")
+        stats.add_time("stage", 1.0)
+
+        other = Stats()
+        other.count("counter", 2)
+        other.count("other_counter")
+        other.add_time("stage", 0.5)
+
+        stats.merge(other.snapshot())
+        stats.merge(other)
+
+        self.assertEqual(stats.counters, {"counter": 5, "other_counter": 2})
+        self.assertEqual(stats.timers["stage"], {"calls": 3, "time": 2.0})
+
+    def test_dump(self):
+        stats = Stats()
+        stats.count("counter")
+
+        f = io.StringIO()
+        stats.dump(f, file_name="file.xlsx")
+        stats.dump(f, file_name="other_file.xlsx")
+
+        lines = [json.loads(line) for line in f.getvalue().splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["file_name"], "file.xlsx")
+        self.assertEqual(lines[0]["counters"], {"counter": 1})
+        self.assertIn("timestamp", lines[0])
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
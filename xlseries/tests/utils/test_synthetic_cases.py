@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_synthetic_cases
+----------------------------------
+
+Tests for `synthetic_cases` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import nose
+
+from xlseries.xlseries import XlSeries
+from xlseries.strategies.discover.parameters import Parameters
+from xlseries.utils.data_frame import compare_data_frames, get_data_frames
+from xlseries.utils.synthetic_cases import make_case, write_case, iter_specs
+from xlseries.utils.synthetic_cases import check_spec, complete_spec
+from xlseries.utils.synthetic_cases import UnsupportedSpec
+
+
+# @unittest.skip("skip")
+class SyntheticCasesTestCase(unittest.TestCase):
+
+    SPECS = [
+        {"frequency": "M"},
+        {"frequency": "D", "alignment": "horizontal"},
+        {"frequency": "W", "blank_rows": True},
+        {"frequency": "Q", "continuity": False, "time_composed": True},
+        {"frequency": "A", "missings": True, "time_composed": True},
+        {"frequency": "M", "missings": True, "missing_value": "Implicit"},
+        {"frequency": "M", "time_composed": True, "time_multicolumn": True,
+         "alignment": "horizontal", "continuity": False, "blank_rows": True},
+        {"frequency": "D", "continuity": False, "time_alignment": -1},
+        {"frequency": "Q", "continuity": False, "time_alignment": 1},
+        {"frequency": "AQQQQ"},
+        {"frequency": "QQQQA", "time_composed": True,
+         "time_multicolumn": True},
+        {"frequency": "A" + "M" * 12, "alignment": "horizontal"}
+    ]
+
+    def test_scrape_synthetic_cases(self):
+
+        for spec in self.SPECS:
+            periods = 60 if len(spec["frequency"]) == 1 else 65
+            wb, params, exp_dfs = make_case(spec, periods=periods, series=3,
+                                            typo_rate=0.1, missing_rate=0.1,
+                                            seed=1)
+
+            dfs = XlSeries(wb).get_data_frames(params)
+            if not isinstance(dfs, list):
+                dfs = [dfs]
+
+            self.assertEqual(len(dfs), len(exp_dfs), spec)
+            for df, exp_df in zip(sorted(dfs, key=len),
+                                  sorted(exp_dfs, key=len)):
+                self.assertTrue(compare_data_frames(df, exp_df), spec)
+
+    def test_make_case_is_reproducible(self):
+        spec = {"frequency": "Q", "missings": True}
+
+        wb1, params1, dfs1 = make_case(spec, missing_rate=0.2, seed=3)
+        wb2, params2, dfs2 = make_case(spec, missing_rate=0.2, seed=3)
+
+        self.assertEqual(params1, params2)
+        self.assertTrue(compare_data_frames(dfs1[0], dfs2[0]))
+        self.assertTrue(dfs1[0].isnull().values.any())
+
+    def test_write_case(self):
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            paths = write_case("case", temp_dir, {"frequency": "M"},
+                               periods=24, series=2)
+            self.assertEqual([os.path.basename(os.path.dirname(path)) for
+                              path in paths],
+                             ["original", "parameters", "expected"])
+
+            exp_dfs = get_data_frames(paths[2])
+            dfs = XlSeries(paths[0]).get_data_frames(Parameters(paths[1]))
+            self.assertTrue(compare_data_frames(dfs, exp_dfs[0]))
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_check_spec(self):
+
+        for spec in [{"frequency": "D", "time_composed": True},
+                     {"frequency": "M", "time_multicolumn": True},
+                     {"frequency": "M", "time_alignment": 1},
+                     {"frequency": "AQQQQ", "blank_rows": True},
+                     {"frequency": "QQQ"}]:
+            with self.assertRaises(UnsupportedSpec):
+                check_spec(complete_spec(spec))
+
+    def test_iter_specs(self):
+        specs = list(iter_specs(["M"]))
+
+        self.assertGreater(len(specs), 20)
+        for spec in specs:
+            check_spec(spec)
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
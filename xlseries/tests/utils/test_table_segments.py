@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_table_segments
+
+Tests for `table_segments` utils module.
+"""
+
+import unittest
+import nose
+from openpyxl import Workbook
+
+from xlseries.utils.table_segments import get_segments, forget_segments
+from xlseries.utils.xl_methods import make_ws_copy
+from xlseries.utils.instrumentation import Stats, recording
+import xlseries.strategies.clean.time_index as clean_ti_strategies
+
+
+def make_stacked_tables_ws():
+    """Worksheet with two tables in column A and one table in row 1."""
+
+    ws = Workbook().active
+    for row in range(2, 6):
+        ws.cell(row=row, column=1).value = "first"
+    for row in range(8, 13):
+        ws.cell(row=row, column=1).value = "second"
+    for col in range(3, 7):
+        ws.cell(row=1, column=col).value = "row"
+
+    return ws
+
+
+class TableSegmentsTest(unittest.TestCase):
+
+    def test_block_end(self):
+        ws = make_stacked_tables_ws()
+        segments = get_segments(ws)
+
+        self.assertEqual(segments.block_end(ws, "vertical", 2, 1), 6)
+        self.assertEqual(segments.block_end(ws, "vertical", 8, 1), 13)
+        self.assertEqual(segments.block_end(ws, "vertical", 6, 1), 6)
+        self.assertEqual(segments.block_end(ws, "horizontal", 1, 3), 7)
+        self.assertIsInstance(segments.block_end(ws, "horizontal", 1, 3), int)
+
+    def test_multi_table_boundaries(self):
+        ws = make_stacked_tables_ws()
+        multi_table = clean_ti_strategies.BaseMultiTable
+        strategy = [strategy for strategy in
+                    clean_ti_strategies.get_strategies() if
+                    issubclass(strategy, multi_table)][0]
+
+        self.assertEqual(strategy._get_row_boundary(ws, "A8", 9), 13)
+        self.assertEqual(strategy._get_column_boundary(ws, "C1", 4), 7)
+
+    def test_copies_share_segments(self):
+        ws = make_stacked_tables_ws()
+        stats = Stats()
+
+        with recording(stats):
+            for _ in range(3):
+                ws_copy = make_ws_copy(ws)
+                get_segments(ws_copy).block_end(ws_copy, "vertical", 2, 1)
+                get_segments(ws_copy).block_end(ws_copy, "vertical", 8, 1)
+
+        self.assertEqual(stats.counters["segments_lines_scanned"], 1)
+        self.assertIs(get_segments(ws_copy), get_segments(ws))
+
+        # a modified copy stops using the segments of the original
+        forget_segments(ws_copy)
+        ws_copy["A10"] = None
+        self.assertEqual(
+            get_segments(ws_copy).block_end(ws_copy, "vertical", 8, 1), 10)
+        self.assertEqual(get_segments(ws).block_end(ws, "vertical", 8, 1), 13)
+
+        # copies of a part of the worksheet have their own segments
+        ws_prefix = make_ws_copy(ws, max_row=10)
+        self.assertIsNot(get_segments(ws_prefix), get_segments(ws))
+
+
+if __name__ == '__main__':
+    nose.run(defaultTest=__name__)
@@ -9,11 +9,14 @@ Tests for `time_manipulation` module.
 """
 
 import arrow
+import datetime
 import unittest
 import nose
 from xlseries.utils.time_manipulation import increment_time
 from xlseries.utils.time_manipulation import InvalidTimeFrequency
 from xlseries.utils.time_manipulation import infer_freq
+from xlseries.utils.time_manipulation import infer_frequency
+from xlseries.utils.time_manipulation import FrequencyNotInferred
 
 
 class TimeManipulationTest(unittest.TestCase):
@@ -52,6 +55,61 @@ class TimeManipulationTest(unittest.TestCase):
         freq = infer_freq(2618767)
         self.assertEqual(freq, freq_exp)
 
+        self.assertEqual(infer_freq(15552000), "6MS")
+
+    def test_infer_frequency(self):
+        months = [datetime.date(2015, month, 1) for month in range(1, 13)]
+        self.assertEqual(infer_frequency(months), "M")
+
+        # missing periods and typos don't change the frequency
+        quarters = [arrow.get(2000 + i // 4, i % 4 * 3 + 1, 1) for
+                    i in range(40) if i != 7]
+        quarters[20] = quarters[18]
+        self.assertEqual(infer_frequency(quarters), "Q")
+
+        semesters = [datetime.date(2000 + i // 2, i % 2 * 6 + 1, 1) for
+                     i in range(6)]
+        self.assertEqual(infer_frequency(semesters), "S")
+
+        years = [datetime.date(year, 1, 1) for year in range(1990, 2000)]
+        self.assertEqual(infer_frequency(years), "A")
+
+        days = [datetime.date(2015, 1, 1) + datetime.timedelta(days=i) for
+                i in range(60)]
+        self.assertEqual(infer_frequency(days), "D")
+        self.assertEqual(infer_frequency(days[::7]), "W")
+
+    def test_infer_frequency_descending(self):
+        months = [datetime.date(2015, month, 1) for month in range(12, 0, -1)]
+        self.assertEqual(infer_frequency(months), "M")
+
+        years = [datetime.date(year, 1, 1) for year in range(2000, 1990, -1)]
+        self.assertEqual(infer_frequency(years), "A")
+
+        days = [datetime.date(2015, 3, 1) - datetime.timedelta(days=i) for
+                i in range(60)]
+        self.assertEqual(infer_frequency(days), "D")
+
+    def test_infer_multifrequency(self):
+        year_quarters = []
+        quarters_year = []
+        for year in range(2000, 2005):
+            quarters = [datetime.date(year, month, 1) for
+                        month in [1, 4, 7, 10]]
+            year_quarters += [datetime.date(year, 1, 1)] + quarters
+            quarters_year += quarters + [datetime.date(year, 1, 1)]
+
+        self.assertEqual(infer_frequency(year_quarters), "AQQQQ")
+        self.assertEqual(infer_frequency(quarters_year), "QQQQA")
+
+    def test_frequency_not_inferred(self):
+        with self.assertRaises(FrequencyNotInferred):
+            infer_frequency([datetime.date(2015, 1, 1)] * 2)
+
+        with self.assertRaises(FrequencyNotInferred):
+            infer_frequency([datetime.date(2015, month, 1) for
+                             month in [1, 3, 6, 8, 11, 12]])
+
 
 if __name__ == '__main__':
     nose.run(defaultTest=__name__)
@@ -54,6 +54,22 @@ class XlMethodsTest(unittest.TestCase):
         ws_copy = make_ws_copy(ws)
         self.assertTrue(compare_cells_ws(ws, ws_copy))
 
+    def test_make_ws_copy_prefix(self):
+        ws = load_original_case(2).active
+        max_row, max_col = ws.max_row, ws.max_column
+
+        ws_copy = make_ws_copy(ws, max_row=10)
+        self.assertEqual(ws_copy.max_row, 10)
+        self.assertEqual(ws_copy.max_column, max_col)
+        self.assertEqual(ws_copy["A10"].value, ws["A10"].value)
+
+        ws_copy = make_ws_copy(ws, max_row=max_row + 10, max_col=1)
+        self.assertEqual(ws_copy.max_row, max_row)
+        self.assertEqual(ws_copy.max_column, 1)
+
+        # ws is not enlarged copying beyond its boundaries
+        self.assertEqual((ws.max_row, ws.max_column), (max_row, max_col))
+
     def test_open_xls_as_xlsx(self):
         wb_xls = open_xls_as_xlsx(abs_path("sh_ipcnu.xls"))
         wb_exp = load_workbook(
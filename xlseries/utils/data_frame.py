@@ -16,6 +16,7 @@ import string
 from .time_manipulation import infer_freq
 from .comparing import approx_equal
 from .xl_methods import normalize_value
+from .float_handlers import round_float_noise
 
 
 class NoSerializedDataFrameFound(Exception):
@@ -227,6 +228,39 @@ def dfs_to_json_and_csv(base_dir=os.getcwd()):
     os.chdir(old_dir)
 
 
+def convert_values(values, dtype=None, clean_float_noise=False):
+    """Convert an array of values scraped from a worksheet.
+
+    Args:
+        values (np.ndarray): Values of one series, or of many series (one in
+            each column).
+        dtype: Type of the returned values. If None, the values keep their
+            type.
+        clean_float_noise (bool): If True, float values are rounded to the
+            significant figures of their column (in place).
+
+    Returns:
+        np.ndarray: The converted values, the same array if nothing changes.
+    """
+    if clean_float_noise and values.dtype.kind == "f":
+        values = round_float_noise(values)
+
+    if dtype is not None:
+        values = values.astype(dtype, copy=False)
+
+    return values
+
+
+def convert_data_frame(df, dtype=None, clean_float_noise=False):
+    """Convert the values of a data frame, see convert_values.
+
+    The values of df may be rounded in place."""
+
+    values = convert_values(df.values, dtype, clean_float_noise)
+    return pd.DataFrame(values, index=df.index, columns=df.columns,
+                        copy=False)
+
+
 def compare_data_frames(df1, df2):
     """Compare two data frames.
 
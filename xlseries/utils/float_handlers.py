@@ -53,3 +53,59 @@ def infer_decimals(value):
     integer_digits = len(str(int(math.modf(value)[1])))
     truncated = truncate(value, 17 - integer_digits)
     return decimal.Decimal(str(truncated)).normalize().as_tuple().exponent
+
+
+# decimals (after the first significant digit of values smaller than 1) of
+# values that need more are taken as float noise
+MAX_DECIMALS = 15
+
+# a value is exact with some decimals if rounding it changes less than this
+# relative tolerance (float64 numbers have about 16 significant digits)
+FLOAT_NOISE_RTOL = 1e-14
+
+
+def significant_figures_array(values):
+    """Calculates significant figures of an array of numeric values
+
+    Vectorized version of significant_figures: values are rounded with more
+    decimals each time, until all of them are exact (with FLOAT_NOISE_RTOL)
+    or MAX_DECIMALS are reached. Like in infer_decimals, the limit depends on
+    the magnitude of the values, so tiny values keep their significant
+    figures (1.23e-17 has 19 decimals). NaN values are ignored.
+    """
+
+    # zeros are exact with any decimals
+    pending = values[np.isfinite(values) & (values != 0)]
+    if not len(pending):
+        return 0
+
+    magnitude = int(np.floor(np.log10(np.abs(pending).min())))
+    max_decimals = MAX_DECIMALS - min(magnitude, 0)
+
+    for decimals in range(max_decimals):
+        exact = (np.abs(np.round(pending, decimals) - pending) <=
+                 FLOAT_NOISE_RTOL * np.abs(pending))
+        pending = pending[~exact]
+
+        if not len(pending):
+            return decimals
+
+    return max_decimals
+
+
+def round_float_noise(values):
+    """ Round each column of a float array to its significant figures, in place
+
+    Float noise like 0.30000000000000004 in a column with one decimal values
+    gets rounded to 0.3. One dimension arrays are taken as one column.
+    """
+
+    columns = values if values.ndim == 2 else values[:, np.newaxis]
+    for i_column in range(columns.shape[1]):
+        column = columns[:, i_column]
+        rounded = np.round(column, significant_figures_array(column))
+
+        # huge values overflow with the decimals of tiny ones, they are kept
+        np.copyto(column, rounded, where=np.isfinite(rounded))
+
+    return values
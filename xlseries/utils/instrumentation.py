@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+instrumentation
+
+Lightweight timers and counters to find out where the time goes when a file
+is scraped, without a profiler.
+
+A Stats object is activated in the current thread with `recording`. While it
+is active, the `stage` and `count` helpers used across the package add their
+measures to it. When no Stats object is active they do nothing, so the
+instrumentation has no real cost in the normal use case.
+
+Example:
+    stats = Stats()
+    dfs = XlSeries(xl_path, stats=stats).get_data_frames(params)
+    print(stats.timers["clean_time_index"]["time"])
+    stats.dump("stats.jsonl", file_name=xl_path)
+"""
+
+from __future__ import unicode_literals
+import io
+import json
+import threading
+import time
+
+_local = threading.local()
+
+
+class Stats(object):
+
+    """Stage timers and counters of one or many scraping calls.
+
+    Attributes:
+        timers (dict): {stage: {"calls": int, "time": seconds}}
+        counters (dict): {name: int}
+        callback (callable): Optional function called with (kind, name,
+            value) on every measure, where kind is "time" or "count".
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.timers = {}
+        self.counters = {}
+
+    # PUBLIC
+    def add_time(self, stage_name, seconds):
+        timer = self.timers.setdefault(stage_name, {"calls": 0, "time": 0.0})
+        timer["calls"] += 1
+        timer["time"] += seconds
+
+        if self.callback:
+            self.callback("time", stage_name, seconds)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+        if self.callback:
+            self.callback("count", name, value)
+
+    def merge(self, other):
+        """Add the measures of other Stats object (or a snapshot of it)."""
+
+        snapshot = other.snapshot() if isinstance(other, Stats) else other
+
+        for stage_name, timer in snapshot["timers"].items():
+            own_timer = self.timers.setdefault(stage_name,
+                                               {"calls": 0, "time": 0.0})
+            own_timer["calls"] += timer["calls"]
+            own_timer["time"] += timer["time"]
+
+        for name, value in snapshot["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Return a copy of the measures made of plain python objects."""
+        return {"timers": {stage_name: dict(timer) for stage_name, timer in
+                           self.timers.items()},
+                "counters": dict(self.counters)}
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+
+    def to_json_line(self, **fields):
+        """Return the measures as a JSON line.
+
+        Args:
+            fields: Extra fields of the line (eg. the name of the file).
+        """
+        record = {"timestamp": time.time()}
+        record.update(fields)
+        record.update(self.snapshot())
+
+        return json.dumps(record, sort_keys=True) + "\n"
+
+    def dump(self, path_or_file, **fields):
+        """Append the measures as a JSON line to a file.
+
+        Args:
+            path_or_file (str or file-like): Path to a JSON lines file or a
+                file opened in text mode.
+            fields: Extra fields of the line (eg. the name of the file).
+        """
+        line = self.to_json_line(**fields)
+
+        if hasattr(path_or_file, "write"):
+            path_or_file.write(line)
+        else:
+            with io.open(path_or_file, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class _Stage(object):
+
+    """Context manager timing a stage in the active Stats object."""
+
+    def __init__(self, stats, stage_name):
+        self.stats = stats
+        self.stage_name = stage_name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.add_time(self.stage_name,
+                            time.perf_counter() - self.start)
+
+
+class _NoStage(object):
+
+    """Context manager that does nothing, used when no Stats is active."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Recording(object):
+
+    """Context manager making a Stats object the active one in the thread."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.previous = get_active()
+        if self.stats is not None:
+            _local.stats = self.stats
+        return get_active()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.stats = self.previous
+
+
+def recording(stats):
+    """Activate a Stats object in the current thread.
+
+    Args:
+        stats (Stats): Object receiving the measures. If None, the Stats
+            object already active (if any) keeps receiving them.
+
+    Example:
+        with recording(stats):
+            scraper.get_data_frames(safe_mode)
+    """
+    return _Recording(stats)
+
+
+def get_active():
+    """Return the Stats object active in the current thread, if any."""
+    return getattr(_local, "stats", None)
+
+
+def stage(stage_name):
+    """Time a block of code in the active Stats object.
+
+    Example:
+        with stage("clean_time_index"):
+            cleaner.clean_time_index(ws, params)
+    """
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        return _NO_STAGE
+
+    return _Stage(stats, stage_name)
+
+
+def count(name, value=1):
+    """Add a value to a counter of the active Stats object."""
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        stats.count(name, value)
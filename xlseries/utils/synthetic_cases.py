@@ -0,0 +1,588 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+synthetic_cases
+
+Generate excel files with time series of any size, together with the
+parameters needed to scrape them and the data frames expected as a result.
+
+A case is described with a "spec": a dictionary with the same names and values
+of the parameters in Parameters (alignment, continuity, blank_rows, missings,
+missing_value, time_composed, time_multicolumn, time_alignment and
+frequency). The parameters that are not in the spec take their default value.
+
+Example:
+    # build a case in memory
+    wb, params, dfs = make_case({"frequency": "Q", "time_composed": True},
+                                periods=400, series=10)
+
+    # write it like the integration test cases, in three directories
+    # (original, parameters and expected)
+    write_case("quarterly", "synthetic_cases",
+               {"frequency": "Q", "time_composed": True}, periods=400)
+"""
+
+from __future__ import unicode_literals
+import datetime
+import json
+import os
+import random
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from xlseries.strategies.discover.parameters import Parameters
+
+
+# EXCEPTIONS
+class UnsupportedSpec(ValueError):
+
+    """Raised when a spec describes a case that can't be generated."""
+
+    def __init__(self, spec, reason):
+        msg = u"Can't generate a case for {spec}: {reason}".format(
+            spec=spec, reason=reason)
+        super(UnsupportedSpec, self).__init__(msg)
+
+
+START_YEAR = 1950
+
+# months covered by one period of each frequency
+MONTHS_BY_FREQ = {"A": 12, "S": 6, "Q": 3, "M": 1}
+# frequencies of pandas date ranges
+DATE_RANGE_FREQS = {"A": "AS", "S": "6MS", "Q": "QS", "M": "MS", "W": "W",
+                    "D": "D"}
+
+# frequencies with a known composed time string format
+COMPOSED_FREQS = ["A", "S", "Q", "M", "AQQQQ", "QQQQA"]
+MULTICOLUMN_FREQS = ["Q", "M", "AQQQQ", "QQQQA"]
+MULTIFREQ_FREQS = ["AQQQQ", "QQQQA", "A" + "M" * 12, "M" * 12 + "A"]
+
+ROMANS = ["I", "II", "III", "IV"]
+MONTHS = ["Ene.", "Feb.", "Mar.", "Abr.", "May.", "Jun.", "Jul.", "Ago.",
+          "Sep.", "Oct.", "Nov.", "Dic."]
+
+# tokens used for missing values, if the spec doesn't have a missing_value
+MISSING_TOKENS = ["-", "...", "s/d"]
+
+# separator rows of non continuous series (subtotals) and blank rows are
+# inserted every certain number of periods
+SEPARATOR_EVERY = 12
+BLANK_EVERY = 5
+
+# a typo changes the year of a time value
+TYPO_YEARS = 10
+
+
+# PUBLIC
+def make_case(spec=None, periods=100, series=3, typo_rate=0.0,
+              missing_rate=0.0, seed=None):
+    """Build a workbook with time series, its parameters and expected result.
+
+    Args:
+        spec (dict): Parameters-like description of the case layout.
+        periods (int): Number of time values (of any frequency) of the series.
+        series (int): Number of series.
+        typo_rate (float): Ratio of time values with a typo in their year,
+            that the scraper is expected to correct.
+        missing_rate (float): Ratio of data values replaced by missing value
+            tokens. If the missing_value of the spec is "Implicit" it is the
+            ratio of periods removed from the time index instead. Only used if
+            missings is True.
+        seed: Seed of the random generator, to get always the same case.
+
+    Returns:
+        tuple: (wb, params, dfs) A Workbook with the series, a dictionary
+            with all the parameters needed to scrape it and a list of
+            pandas.DataFrame (one for each frequency) with the expected result.
+    """
+    spec = complete_spec(spec)
+    check_spec(spec)
+    rand = random.Random(seed)
+
+    entries = _time_entries(spec["frequency"], periods)
+    values = [[round(rand.uniform(0, 1000), 4) for _ in range(series)] for
+              _ in entries]
+    names = ["Serie {}".format(num_series + 1) for
+             num_series in range(series)]
+
+    missing_tokens = _missing_tokens(spec)
+    dropped = set()
+    typos = set()
+    if spec["missings"] and missing_rate:
+        if missing_tokens:
+            values = [[rand.choice(missing_tokens) if
+                       rand.random() < missing_rate else value for
+                       value in entry_values] for entry_values in values]
+        else:
+            dropped = _dropped_periods(rand, len(entries), missing_rate)
+    # the first and last cycles and the periods after a removed one are left
+    # without typos, because there is no expected time value to check them
+    if typo_rate:
+        cycle = len(spec["frequency"])
+        typos = set(i for i in range(cycle, len(entries) - cycle) if
+                    rand.random() < typo_rate and i not in dropped and
+                    i - 1 not in dropped)
+
+    lines = []
+    for i, ((freq, time_value), entry_values) in enumerate(zip(entries,
+                                                               values)):
+        if i in dropped:
+            continue
+
+        if i > 0 and spec["blank_rows"] and i % BLANK_EVERY == 0:
+            lines.append(("blank", None, None))
+
+        time_cells = _time_cells(spec, entries, i, typo=i in typos)
+        lines.append(("entry", time_cells, entry_values))
+
+        # subtotals of the last periods are written after them
+        last_of_group = (i + 1) % _separator_every(spec) == 0
+        if (not spec["continuity"] and not spec["time_alignment"] and
+                last_of_group and i + 1 < len(entries)):
+            group = values[i + 1 - _separator_every(spec):i + 1]
+            lines.append(("separator", None,
+                          [round(sum(_float_or_zero(row[num_series]) for
+                                     row in group), 4) for
+                           num_series in range(series)]))
+
+    wb, params = _write_lines(spec, lines, names)
+    dfs = _expected_data_frames(spec, entries, values, names, dropped,
+                                missing_tokens)
+
+    return wb, params, dfs
+
+
+def write_case(name, base_dir, spec=None, file_format="xlsx", **kwargs):
+    """Generate a case and write it to disk like an integration test case.
+
+    Three files are written: "original/name.xlsx" (or .xls) with the series,
+    "parameters/name.json" with the parameters and "expected/name.xlsx"
+    with the expected data frames, one for each worksheet.
+
+    Args:
+        name (str): Name of the case, used in the file names.
+        base_dir (str): Directory where the original, parameters and expected
+            directories are (they are created if they don't exist).
+        spec (dict): Parameters-like description of the case layout.
+        file_format (str): "xlsx" or "xls". Writing .xls files needs the
+            xlwt package.
+        kwargs: Other arguments taken by make_case.
+
+    Returns:
+        tuple: (original_path, parameters_path, expected_path)
+    """
+    wb, params, dfs = make_case(spec, **kwargs)
+
+    paths = []
+    for dir_name, extension in [("original", file_format),
+                                ("parameters", "json"),
+                                ("expected", "xlsx")]:
+        case_dir = os.path.join(base_dir, dir_name)
+        if not os.path.isdir(case_dir):
+            os.makedirs(case_dir)
+        paths.append(os.path.join(case_dir, name + "." + extension))
+
+    if file_format == "xlsx":
+        wb.save(paths[0])
+    elif file_format == "xls":
+        save_as_xls(wb, paths[0])
+    else:
+        raise ValueError(repr(file_format) + " is not 'xlsx' or 'xls'.")
+
+    with open(paths[1], "w") as f:
+        json.dump(params, f, indent=4)
+
+    save_data_frames(dfs, paths[2])
+
+    return tuple(paths)
+
+
+def iter_specs(frequencies=None):
+    """Generate specs of every layout that can be combined.
+
+    Some of these layouts are not scraped by the package yet: offset time
+    in horizontal series, offset composed time, missing values written as
+    tokens next to an offset time and semesters.
+
+    Args:
+        frequencies (list): Frequencies to combine with the layouts. By
+            default the single frequencies and multifrequencies supported.
+
+    Yields:
+        dict: A complete spec.
+    """
+    frequencies = frequencies or (
+        list(Parameters.VALID_VALUES["frequency"]) + MULTIFREQ_FREQS)
+
+    for frequency in frequencies:
+        for alignment in Parameters.VALID_VALUES["alignment"]:
+            for time_alignment in Parameters.VALID_VALUES["time_alignment"]:
+                for continuity in [True, False]:
+                    for blank_rows in [False, True]:
+                        for missings in [False, True]:
+                            for time_composed in [False, True]:
+                                for time_multicolumn in [False, True]:
+                                    spec = complete_spec({
+                                        "frequency": frequency,
+                                        "alignment": alignment,
+                                        "time_alignment": time_alignment,
+                                        "continuity": continuity,
+                                        "blank_rows": blank_rows,
+                                        "missings": missings,
+                                        "time_composed": time_composed,
+                                        "time_multicolumn": time_multicolumn
+                                    })
+                                    try:
+                                        check_spec(spec)
+                                    except UnsupportedSpec:
+                                        continue
+                                    yield spec
+
+
+def complete_spec(spec=None):
+    """Fill a spec with the default values of the parameters it lacks."""
+
+    complete = {"frequency": "M"}
+    for param_name in ["alignment", "continuity", "blank_rows", "missings",
+                       "time_composed", "time_multicolumn", "time_alignment"]:
+        complete[param_name] = Parameters.DEFAULT_VALUES[param_name]
+    complete["missing_value"] = None
+
+    complete.update(spec or {})
+    complete["frequency"] = Parameters.FREQ_TRANSLATION.get(
+        complete["frequency"], complete["frequency"])
+
+    return complete
+
+
+def check_spec(spec):
+    """Raise UnsupportedSpec if a complete spec can't be generated."""
+
+    freq = spec["frequency"]
+
+    for param_name in ["alignment", "time_alignment"]:
+        if spec[param_name] not in Parameters.VALID_VALUES[param_name]:
+            raise UnsupportedSpec(spec, "{} is not a valid {}".format(
+                repr(spec[param_name]), param_name))
+
+    if len(freq) == 1:
+        if freq not in Parameters.VALID_VALUES["frequency"]:
+            raise UnsupportedSpec(spec, repr(freq) + " is not a frequency")
+    elif freq not in MULTIFREQ_FREQS:
+        raise UnsupportedSpec(spec, "multifrequency must be one of " +
+                              repr(MULTIFREQ_FREQS))
+
+    if spec["time_composed"] and freq not in COMPOSED_FREQS:
+        raise UnsupportedSpec(spec, "there is no composed time format for " +
+                              repr(freq))
+
+    if spec["time_multicolumn"]:
+        if not spec["time_composed"]:
+            raise UnsupportedSpec(spec, "multicolumn time must be composed")
+        if freq not in MULTICOLUMN_FREQS:
+            raise UnsupportedSpec(spec, "there is no multicolumn time " +
+                                  "format for " + repr(freq))
+
+    if spec["time_alignment"]:
+        if spec["continuity"]:
+            raise UnsupportedSpec(spec, "time and data sharing the same " +
+                                  "column are not continuous")
+        if spec["time_multicolumn"]:
+            raise UnsupportedSpec(spec, "time in the data column can't be " +
+                                  "multicolumn")
+
+    if len(freq) > 1 and (spec["blank_rows"] or not spec["continuity"]):
+        raise UnsupportedSpec(spec, "multifrequency series must be " +
+                              "continuous and without blank rows")
+
+    if spec["missing_value"] == "Implicit":
+        if len(freq) > 1:
+            raise UnsupportedSpec(spec, "implicit missings need a single " +
+                                  "frequency")
+        if spec["blank_rows"] or not spec["continuity"]:
+            raise UnsupportedSpec(spec, "implicit missings need continuous " +
+                                  "series without blank rows")
+
+
+def save_data_frames(dfs, path):
+    """Write data frames to an excel file, one for each worksheet.
+
+    The format is the one of the expected integration test cases, that can be
+    loaded with xlseries.utils.data_frame.get_data_frames.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+
+    for num_df, df in enumerate(dfs):
+        ws = wb.create_sheet(title="Hoja{}".format(num_df + 1))
+        ws.append(["datetime"] + list(df.columns))
+        for index, row in zip(df.index, df.values):
+            ws.append([index.to_pydatetime()] +
+                      [None if pd.isnull(value) else value for value in row])
+
+    wb.save(path)
+
+
+def save_as_xls(wb, path):
+    """Write a workbook in the old binary excel format (.xls)."""
+
+    try:
+        import xlwt
+    except ImportError:
+        raise ImportError("Writing .xls files needs the xlwt package: " +
+                          "pip install xlwt")
+
+    date_style = xlwt.easyxf(num_format_str="yyyy-mm-dd")
+
+    wb_xls = xlwt.Workbook()
+    for ws in wb:
+        ws_xls = wb_xls.add_sheet(ws.title)
+        for row in ws.rows:
+            for cell in row:
+                if cell.value is None:
+                    continue
+
+                row_xls, col_xls = cell.row - 1, cell.col_idx - 1
+                if isinstance(cell.value, datetime.datetime):
+                    ws_xls.write(row_xls, col_xls, cell.value, date_style)
+                else:
+                    ws_xls.write(row_xls, col_xls, cell.value)
+
+    wb_xls.save(path)
+
+
+# PRIVATE
+def _time_entries(frequency, periods):
+    """Return a (frequency, datetime) tuple for each time value."""
+
+    entries = []
+
+    if len(frequency) == 1 and frequency in ["D", "W"]:
+        delta = datetime.timedelta(days=1 if frequency == "D" else 7)
+        # the 1st of January of 1950 is a sunday, start of pandas weeks
+        time_value = datetime.datetime(START_YEAR, 1, 1)
+        for _ in range(periods):
+            entries.append((frequency, time_value))
+            time_value += delta
+
+    elif len(frequency) == 1:
+        for i in range(periods):
+            months = i * MONTHS_BY_FREQ[frequency]
+            entries.append((frequency, datetime.datetime(
+                START_YEAR + months // 12, months % 12 + 1, 1)))
+
+    # multifrequency, each cycle of the frequency string is a year
+    else:
+        for i in range(periods):
+            year, pos = divmod(i, len(frequency))
+            freq = frequency[pos]
+            num_in_year = frequency[:pos].count(freq)
+            month = num_in_year * MONTHS_BY_FREQ[freq] + 1
+            entries.append((freq, datetime.datetime(START_YEAR + year,
+                                                    month, 1)))
+
+    return entries
+
+
+def _time_cells(spec, entries, i, typo=False):
+    """Return the cells representing a time value.
+
+    Returns:
+        list: One value for each time column (more than one if the time is
+            multicolumn).
+    """
+    freq, time_value = entries[i]
+    year = time_value.year - TYPO_YEARS if typo else time_value.year
+
+    if not spec["time_composed"]:
+        return [time_value.replace(year=year)]
+
+    frequency = spec["frequency"]
+    first_of_year = i == 0 or entries[i - 1][1].year != time_value.year
+    num_in_year = (time_value.month - 1) // MONTHS_BY_FREQ.get(freq, 12)
+
+    # the year and a label of the period inside the year
+    if frequency in ["AQQQQ", "QQQQA"]:
+        label = "Año" if freq == "A" else ROMANS[num_in_year]
+    elif freq == "M":
+        label = MONTHS[num_in_year]
+    elif freq in ["Q", "S"]:
+        label = ROMANS[num_in_year]
+    else:
+        label = None
+
+    if spec["time_multicolumn"]:
+        return [year if first_of_year else None, label]
+
+    if frequency == "A":
+        return ["{}".format(year)]
+    elif frequency == "S":
+        return ["{}.S.{:02d}".format(label, year % 100)]
+    elif frequency == "Q":
+        return ["{}.{}".format(label, year)]
+    elif frequency == "AQQQQ":
+        if freq == "A":
+            return ["{}    {}".format(year, label)]
+        return ["Trimestre    {}".format(label) if num_in_year == 0 else
+                "             {}".format(label)]
+    else:
+        if first_of_year:
+            return ["{} {}".format(year, label)]
+        return ["        {}".format(label)]
+
+
+def _missing_tokens(spec):
+    """Return the tokens used for missing values, None if implicit."""
+
+    if spec["missing_value"] == "Implicit":
+        return None
+    elif not spec["missing_value"]:
+        return MISSING_TOKENS
+    elif isinstance(spec["missing_value"], list):
+        return spec["missing_value"]
+    else:
+        return [spec["missing_value"]]
+
+
+def _dropped_periods(rand, num_entries, missing_rate):
+    """Choose isolated periods to remove, never the first or last ones."""
+
+    dropped = set()
+    for i in range(2, num_entries - 2):
+        if i - 1 not in dropped and rand.random() < missing_rate:
+            dropped.add(i)
+    return dropped
+
+
+def _separator_every(spec):
+    return max(SEPARATOR_EVERY, len(spec["frequency"]))
+
+
+def _float_or_zero(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _write_lines(spec, lines, names):
+    """Write lines of time and data values in a new workbook.
+
+    Every line is a row in vertical cases and a column in horizontal ones.
+
+    Returns:
+        tuple: (wb, params) The Workbook and its complete parameters.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "synthetic"
+
+    vertical = spec["alignment"] == "vertical"
+
+    def coord(line, position):
+        """Return the coordinate of a position (column in vertical cases)
+        in a line (row in vertical cases), both starting at 1."""
+        if vertical:
+            return "{}{}".format(get_column_letter(position), line)
+        return "{}{}".format(get_column_letter(line), position)
+
+    def write(line, position, value):
+        if value is not None:
+            ws[coord(line, position)] = value
+
+    # time and data share the same line positions, that are not consecutive
+    # (otherwise the time would be taken as multicolumn)
+    if spec["time_alignment"]:
+        positions = list(range(1, 2 * len(names), 2))
+        for position, name in zip(positions, names):
+            write(1, position, name)
+        headers_coord = [coord(1, position) for position in positions]
+        time_header_coord = list(headers_coord)
+
+        line, data_starts = 2, None
+        for kind, time_cells, entry_values in lines:
+            if kind == "entry":
+                time_line = line if spec["time_alignment"] < 0 else line + 1
+                data_line = line + 1 if spec["time_alignment"] < 0 else line
+                for position, value in zip(positions, entry_values):
+                    write(time_line, position, time_cells[0])
+                    write(data_line, position, value)
+                data_starts = data_starts or data_line
+                data_ends = data_line
+                line += 2
+            else:
+                line += 1
+
+    else:
+        num_time = len(lines[0][1]) if lines else 1
+        for position in range(1, num_time + 1):
+            write(1, position, "time" if num_time == 1 else
+                  ["year", "period"][position - 1])
+        for position, name in enumerate(names, num_time + 1):
+            write(1, position, name)
+        time_header_coord = [coord(1, position) for
+                             position in range(1, num_time + 1)]
+        headers_coord = [coord(1, position) for position in
+                         range(num_time + 1, num_time + len(names) + 1)]
+
+        for line, (kind, time_cells, entry_values) in enumerate(lines, 2):
+            for position, value in enumerate(time_cells or [], 1):
+                write(line, position, value)
+            for position, value in enumerate(entry_values or [],
+                                             num_time + 1):
+                write(line, position, value)
+        data_starts = 2
+        data_ends = len(lines) + 1
+
+        if num_time == 1:
+            time_header_coord = time_header_coord[0]
+        if len(headers_coord) > 1:
+            headers_coord = "{}-{}".format(headers_coord[0],
+                                           headers_coord[-1])
+
+    missing_value = spec["missing_value"]
+    if spec["missings"] and not missing_value:
+        missing_value = MISSING_TOKENS
+
+    params = {"alignment": spec["alignment"],
+              "headers_coord": headers_coord,
+              "data_starts": data_starts,
+              "data_ends": data_ends,
+              "frequency": spec["frequency"],
+              "time_header_coord": time_header_coord,
+              "time_multicolumn": spec["time_multicolumn"],
+              "time_composed": spec["time_composed"],
+              "time_alignment": spec["time_alignment"],
+              "continuity": spec["continuity"],
+              "blank_rows": spec["blank_rows"],
+              "missings": spec["missings"],
+              "missing_value": missing_value,
+              "series_names": None}
+
+    return wb, params
+
+
+def _expected_data_frames(spec, entries, values, names, dropped,
+                          missing_tokens):
+    """Return a data frame with the expected series of each frequency."""
+
+    dfs = []
+    for freq in sorted(set(spec["frequency"]),
+                       key=spec["frequency"].index):
+        freq_entries = [(time_value, entry_values, i in dropped) for
+                        i, ((entry_freq, time_value), entry_values) in
+                        enumerate(zip(entries, values)) if entry_freq == freq]
+
+        index = pd.date_range(freq_entries[0][0], freq_entries[-1][0],
+                              freq=DATE_RANGE_FREQS[freq])
+        data = [[float("nan") if (was_dropped or value in
+                                  (missing_tokens or [])) else value for
+                 value in entry_values] for
+                time_value, entry_values, was_dropped in freq_entries]
+
+        dfs.append(pd.DataFrame(data, index=index, columns=names))
+
+    return dfs
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+table_segments
+
+Index of the blocks of non empty cells of the columns (or rows) of a
+worksheet, used to find where each of the tables stacked in a worksheet
+ends.
+
+Each column or row is scanned once, the first time a boundary is asked in
+it. Copies of a worksheet made with make_ws_copy share the index of the
+original worksheet, so the many attempts of ParameterDiscovery (each one
+over a new copy) and the many series of a worksheet don't scan it again.
+
+A worksheet that has a cell emptied (or filled) after its index was shared
+must call forget_segments, getting a new index of its own.
+"""
+
+import weakref
+
+import numpy as np
+
+from xlseries.utils import instrumentation
+
+_segments = weakref.WeakKeyDictionary()
+
+
+class TableSegments(object):
+
+    """Positions of the empty cells of the columns and rows of a worksheet.
+
+    Cells are taken as empty if their value is false (None, "", 0...),
+    the same way the tables of a worksheet were delimited before having an
+    index.
+
+    Attributes:
+        lines (dict): {("vertical", col) or ("horizontal", row): array with
+            the empty rows (or columns) of the column (or row)}
+    """
+
+    def __init__(self):
+        self.lines = {}
+
+    def block_end(self, ws, alignment, row, col):
+        """Return the first empty row (or column) from a cell on.
+
+        Args:
+            ws (Worksheet): Worksheet indexed.
+            alignment (str): "vertical" looks for the first empty row of the
+                column, "horizontal" for the first empty column of the row.
+            row (int): Row of the cell where the block starts.
+            col (int): Column of the cell where the block starts.
+
+        Returns:
+            int: Number of the first empty row (or column) not before the
+                cell. If there is none, the one after the end of the
+                worksheet.
+        """
+        if alignment == "vertical":
+            key, start, last = ("vertical", col), row, ws.max_row
+        else:
+            key, start, last = ("horizontal", row), col, ws.max_column
+
+        if key not in self.lines:
+            self.lines[key] = self._scan(ws, alignment, key[1], last)
+        empty = self.lines[key]
+
+        i_empty = np.searchsorted(empty, start)
+        if i_empty < len(empty):
+            return int(empty[i_empty])
+        else:
+            return max(start, last + 1)
+
+    @staticmethod
+    def _scan(ws, alignment, line, last):
+        instrumentation.count("segments_lines_scanned")
+
+        if alignment == "vertical":
+            cells = ws.iter_cols(min_col=line, max_col=line, min_row=1,
+                                 max_row=last)
+        else:
+            cells = ws.iter_rows(min_row=line, max_row=line, min_col=1,
+                                 max_col=last)
+
+        filled = np.array([bool(cell.value) for cells_line in cells for
+                           cell in cells_line], dtype=bool)
+
+        # positions are 1-based, like the rows and columns of a worksheet
+        return np.flatnonzero(~filled) + 1
+
+
+def get_segments(ws):
+    """Return the index of a worksheet, creating it if it doesn't exist."""
+
+    if ws not in _segments:
+        _segments[ws] = TableSegments()
+
+    return _segments[ws]
+
+
+def share_segments(ws, ws_copy):
+    """Make an exact copy of a worksheet use the index of the original."""
+    _segments[ws_copy] = get_segments(ws)
+
+
+def forget_segments(ws):
+    """Stop using the index of a worksheet that is being modified."""
+    _segments.pop(ws, None)
@@ -9,8 +9,28 @@ Small useful time related methods.
 
 import arrow
 import datetime
+import numpy as np
 from .comparing import approx_equal
 
+# frequency of a time index moving this number of months between its values
+FREQ_BY_MONTHS = {1: "M", 3: "Q", 6: "S", 12: "A"}
+
+# frequency of a time index moving this number of days between its values
+FREQ_BY_DAYS = {1: "D", 7: "W"}
+
+# ratio of differences between time values that can break the frequency
+# (typos in the time index)
+MAX_IRREGULAR_RATIO = 0.1
+
+
+class FrequencyNotInferred(ValueError):
+
+    """Raised when the frequency of some time values can't be inferred."""
+
+    def __init__(self, reason):
+        msg = u"The frequency couldn't be inferred: {}".format(reason)
+        super(FrequencyNotInferred, self).__init__(msg)
+
 
 class InvalidTimeFrequency(Exception):
 
@@ -77,10 +97,116 @@ def infer_freq(av_seconds, tolerance=0.1):
     elif approx_equal(7776000, av_seconds, tolerance):
         freq = 'QS'
     elif approx_equal(15552000, av_seconds, tolerance):
-        raise Exception("Can't handle semesters!")
+        freq = '6MS'
     elif approx_equal(31536000, av_seconds, tolerance):
         freq = 'AS'
     else:
         raise Exception("Average seconds don't match any frequency.")
 
     return freq
+
+
+def infer_frequency(times):
+    """Infer the frequency of the values of a time index.
+
+    The most common difference between consecutive values is computed in
+    months (or in days, if most values are in the same month). Missing
+    periods are allowed, as long as differences are multiple of the most
+    common one. A few irregular differences (typos) are allowed too.
+
+    Time indexes with the newest values first are inferred as if they were
+    sorted, only with a single frequency.
+
+    Multifrequency time indexes (like "AQQQQ", where the annual value is
+    followed by the four quarters of the year) are recognized by the
+    repeating signature of their differences: the annual value has the date
+    of the first period of its year (or of the last one, if it comes after
+    them), so the time index doesn't move forward around it.
+
+    Args:
+        times (list): Dates (datetime or arrow) in the order of the time
+            index.
+
+    Returns:
+        str: A frequency like "M", "Q" or "AQQQQ".
+
+    Raises:
+        FrequencyNotInferred: If values don't follow a known frequency.
+    """
+    if len(times) < 3:
+        raise FrequencyNotInferred("there are less than 3 time values")
+
+    months = np.array([time.year * 12 + time.month for time in times])
+    months_diff = np.diff(months)
+
+    if np.count_nonzero(months_diff) < len(months_diff) / 2:
+        days = np.array([datetime.date(time.year, time.month,
+                                       time.day).toordinal() for
+                         time in times])
+        days_diff = np.diff(days)
+        if _descending(days_diff):
+            days_diff = -days_diff
+        return _single_frequency(days_diff, FREQ_BY_DAYS, "days")
+
+    # statistical releases often put the newest values first
+    if _descending(months_diff):
+        return _single_frequency(-months_diff, FREQ_BY_MONTHS, "months")
+
+    if (months_diff <= 0).any():
+        try:
+            return _multi_frequency(months_diff)
+        except FrequencyNotInferred:
+            pass
+
+    return _single_frequency(months_diff, FREQ_BY_MONTHS, "months")
+
+
+def _descending(diffs):
+    """Check if time values move backwards more often than forwards."""
+    return np.count_nonzero(diffs < 0) > np.count_nonzero(diffs > 0)
+
+
+def _single_frequency(diffs, freqs, unit):
+    forth = diffs[diffs > 0]
+    if len(forth) <= (1 - MAX_IRREGULAR_RATIO) * len(diffs):
+        raise FrequencyNotInferred("time values are not increasing")
+
+    modal_diff = np.bincount(forth).argmax()
+    if modal_diff not in freqs:
+        raise FrequencyNotInferred(
+            "{} {} between values is not a frequency".format(modal_diff,
+                                                             unit))
+
+    irregular = np.count_nonzero(diffs <= 0) + np.count_nonzero(
+        forth % modal_diff)
+    if irregular > MAX_IRREGULAR_RATIO * len(diffs):
+        raise FrequencyNotInferred(
+            "differences are not multiple of {} {}".format(modal_diff, unit))
+
+    return freqs[modal_diff]
+
+
+def _multi_frequency(months_diff):
+    """Infer a frequency with annual values mixed with shorter periods."""
+
+    forth = months_diff[months_diff > 0]
+    if not len(forth):
+        raise FrequencyNotInferred("time values are not increasing")
+
+    modal_diff = np.bincount(forth).argmax()
+    if modal_diff not in FREQ_BY_MONTHS or modal_diff == 12:
+        raise FrequencyNotInferred("no shorter periods than years")
+
+    # annual values are followed by the same date or preceded by a backwards
+    # move of the time index
+    after = np.append(months_diff, modal_diff)
+    before = np.insert(months_diff, 0, modal_diff)
+    annual = (after == 0) | (before < 0)
+
+    period = 12 // modal_diff + 1
+    labels = np.where(annual, "A", FREQ_BY_MONTHS[modal_diff])
+    if (len(labels) < period or annual[:period].sum() != 1 or
+            (labels[period:] != labels[:-period]).any()):
+        raise FrequencyNotInferred("time values have no repeating pattern")
+
+    return "".join(labels[:period])
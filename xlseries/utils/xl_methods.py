@@ -10,11 +10,11 @@ Useful methods for excel operations and related manipulations.
 from __future__ import print_function
 from openpyxl import Workbook
 from openpyxl.utils import column_index_from_string
-import xlrd
 import datetime
 import pytz
 import pandas
 from .comparing import approx_equal
+from .table_segments import share_segments
 
 
 def common_row_or_column(coords_list):
@@ -143,18 +143,25 @@ def consecutive_cells(cell_list):
     return True
 
 
-def open_xls_as_xlsx(filename, data_only=True):
+def open_xls_as_xlsx(filename, data_only=True, file_contents=None):
     """Open a xls file and return a openpyxl.Workbook.
 
     Args:
         filename: Path to an .xls file.
+        file_contents (bytes): Contents of an .xls file, to open it from
+            memory instead of from a path.
 
     Returns:
         Workbook: An openpyxl.Workbook.
     """
-    assert filename[-4:] == ".xls", str(filename) + " is not an .xls file."
+    # xlrd is only needed to read the old excel format
+    import xlrd
 
-    wb_old = xlrd.open_workbook(filename)
+    if file_contents is None:
+        msg = str(filename) + " is not an .xls file."
+        assert filename[-4:] == ".xls", msg
+
+    wb_old = xlrd.open_workbook(filename, file_contents=file_contents)
     # TODO: data_only attribute must be changed because is deprecated
     # wb = Workbook(data_only=data_only)
     wb = Workbook()
@@ -205,7 +212,7 @@ def make_wb_copy(wb):
     return wb_copy
 
 
-def make_ws_copy(ws):
+def make_ws_copy(ws, max_row=None, max_col=None):
     """Return a copy of an openpyxl worksheet.
 
     Only taking into account sheet titles and cell values. Formatting is not
@@ -213,6 +220,8 @@ def make_ws_copy(ws):
 
     Args:
         ws (worksheet): A workbook to make a copy from.
+        max_row (int): Last row to copy. By default all rows are copied.
+        max_col (int): Last column to copy. By default all columns are copied.
 
     Returns:
         worksheet: A copy made from ws.
@@ -220,15 +229,61 @@ def make_ws_copy(ws):
     wb_copy = Workbook()
     wb_copy.remove(wb_copy["Sheet"])
 
+    # iterating beyond the worksheet boundaries would create new cells in ws
+    if max_row:
+        max_row = min(max_row, ws.max_row)
+    if max_col:
+        max_col = min(max_col, ws.max_column)
+
     ws_copy = wb_copy.create_sheet(title=ws.title)
-    for row in ws.rows:
+    for row in ws.iter_rows(max_row=max_row, max_col=max_col):
         for cell in row:
             cell_copy = ws_copy[cell.column + str(cell.row)]
             cell_copy.value = cell.value
 
+    # an exact copy has the same tables as the original worksheet
+    if not max_row and not max_col:
+        share_segments(ws, ws_copy)
+
     return ws_copy
 
 
+def get_ws_values(ws):
+    """Return the cell values of a worksheet as a list of rows.
+
+    The values are plain python objects, so they can be sent to another
+    process (unlike openpyxl objects) and used to rebuild the worksheet with
+    make_ws_from_values.
+
+    Args:
+        ws (worksheet): A worksheet to take values from.
+
+    Returns:
+        list: A list of tuples with the values of each row.
+    """
+    return [tuple(cell.value for cell in row) for row in ws.rows]
+
+
+def make_ws_from_values(title, values):
+    """Return a new openpyxl worksheet filled with a list of rows.
+
+    Args:
+        title (str): Title of the new worksheet.
+        values (list): Rows of cell values, as returned by get_ws_values.
+
+    Returns:
+        worksheet: A worksheet inside a new workbook with only that sheet.
+    """
+    wb = Workbook()
+    wb.remove(wb["Sheet"])
+
+    ws = wb.create_sheet(title=title)
+    for row in values:
+        ws.append(row)
+
+    return ws
+
+
 def xl_coordinates_range(start, end=None):
     """Creates a generator of excel coordinates.
 
@@ -7,24 +7,34 @@ xlseries
 Main module to parse time data series inside excel files into Pandas
 DataFrames. This is the only module that the user should use in the normal use
 case.
+
+Heavy dependencies (openpyxl, pandas, the scraping strategies...) are imported
+the first time they are needed instead of at import time, so importing the
+package is fast for short lived processes.
 """
 
 from __future__ import print_function
 
-from openpyxl import load_workbook, Workbook
-import imp
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import io
 import os
 import platform
-from unidecode import unidecode
+import traceback
+import warnings
 
-from .strategies import strategies
-from .utils.xl_methods import make_wb_copy
-from .strategies.discover.parameters import Parameters
-from .utils.xl_methods import open_xls_as_xlsx
-from .utils.path_finders import get_package_dir
+from .utils import instrumentation
 
-import warnings
-warnings.filterwarnings("ignore")
+
+# EXCEPTIONS
+class WorksheetNotScraped(Exception):
+
+    """Raised when a worksheet of a multi sheet call couldn't be scraped."""
+
+    def __init__(self, ws_name, error):
+        msg = u"Worksheet '{ws_name}' couldn't be scraped.\n{error}".format(
+            ws_name=ws_name, error=error)
+        super(WorksheetNotScraped, self).__init__(msg)
 
 
 class XlSeries(object):
@@ -34,25 +44,61 @@ class XlSeries(object):
     Attributes:
         wb: Workbook object. The user can either pass the path where the excel
             file is located or the Workbook object with the xl already loaded.
+        stats: Optional Stats object recording the time of each stage and
+            counters of the work done. See utils.instrumentation.
     """
 
-    def __init__(self, xl_path_or_wb):
+    # first bytes of the old binary excel format (an OLE2 compound file)
+    XLS_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+    def __init__(self, xl_path_or_wb, stats=None):
         """Args:
-            xl_path_or_wb (str or Workbook): Path to an excel file or a
-                Workbook object.
+            xl_path_or_wb (str, bytes, file-like or Workbook): Path to an
+                excel file, the contents of an excel file (as bytes or as a
+                file-like object with a read method) or a Workbook object.
+            stats (Stats): Object where loading and scraping measures are
+                recorded. Nothing is measured if None.
         """
+        from openpyxl import Workbook
+
         self.xl_path_or_wb = xl_path_or_wb
+        self.stats = stats
         if isinstance(xl_path_or_wb, Workbook):
             self.wb = xl_path_or_wb
         else:
-            self.wb = self._load_wb(xl_path_or_wb)
+            with instrumentation.recording(stats), \
+                    instrumentation.stage("load"):
+                self.wb = self._load_wb(xl_path_or_wb)
         self.params = {}
         # print("XlSeries init!!!")
 
-    @staticmethod
-    def _load_wb(xl_path):
+    @classmethod
+    def _load_wb(cls, xl_path):
         """Load an xls or xlsx excel file.
 
+        Args:
+            xl_path (str, bytes or file-like): Path to an xls or xlsx file, or
+                the contents of one.
+
+        Returns:
+            Workbook: Loaded xl file in an openpyxl.Workbook object.
+        """
+        if hasattr(xl_path, "read"):
+            xl_path = xl_path.read()
+
+        # openpyxl and xlrd warn about excel features they don't read
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+
+            if isinstance(xl_path, bytes):
+                return cls._load_wb_contents(xl_path)
+            else:
+                return cls._load_wb_path(xl_path)
+
+    @classmethod
+    def _load_wb_path(cls, xl_path):
+        """Load an xls or xlsx excel file from its path.
+
         Args:
             xl_path (str): Path to an xls or xlsx file.
 
@@ -60,15 +106,43 @@ class XlSeries(object):
             Workbook: Loaded xl file in an openpyxl.Workbook object.
         """
         if xl_path[-5:] == ".xlsx":
+            from openpyxl import load_workbook
             return load_workbook(xl_path, data_only=True)
+
         elif xl_path[-4:] == ".xls":
+            from .utils.xl_methods import open_xls_as_xlsx
             return open_xls_as_xlsx(xl_path, data_only=True)
+
         else:
             raise ValueError(xl_path + " is not an .xls or .xlsx file.")
 
+    @classmethod
+    def _load_wb_contents(cls, xl_contents):
+        """Load the contents of an xls or xlsx excel file.
+
+        The format is recognized by the first bytes of the contents, since
+        there is no file name to look at.
+
+        Args:
+            xl_contents (bytes): Contents of an xls or xlsx file.
+
+        Returns:
+            Workbook: Loaded xl file in an openpyxl.Workbook object.
+        """
+        if xl_contents[:len(cls.XLS_SIGNATURE)] == cls.XLS_SIGNATURE:
+            from .utils.xl_methods import open_xls_as_xlsx
+            return open_xls_as_xlsx(None, data_only=True,
+                                    file_contents=xl_contents)
+        else:
+            from openpyxl import load_workbook
+            return load_workbook(io.BytesIO(xl_contents), data_only=True)
+
     # PUBLIC
     def get_data_frames(self, params_path_or_obj, ws_name=None,
-                        safe_mode=False, preserve_wb_obj=True):
+                        safe_mode=False, preserve_wb_obj=True,
+                        time_budget=None, max_attempts=None,
+                        confidence_threshold=None, per_series=False,
+                        history=None, dtype=None, clean_float_noise=False):
         """Scrape time series from an excel file into a pandas.DataFrame.
 
         Args:
@@ -76,6 +150,11 @@ class XlSeries(object):
                 str: Path to a JSON file with parameters.
                 dict: Python dictionary with parameters like
                 Parameters: A Parameters object already built.
+                If time_header_coord, headers_coord or data_starts are not
+                passed, they are discovered from the layout of simple
+                worksheets (one table with a recognizable time index). If
+                frequency is not passed, it is inferred from the time index
+                when its values are dates or years.
 
             ws_name (str): Name of the worksheet that will be scraped.
 
@@ -89,6 +168,41 @@ class XlSeries(object):
                 preserve the original object without changes. Only use False if
                 changes to the workbook object are not a problem.
 
+            time_budget (float): Seconds that can be spent trying combinations
+                of missing parameters. When it runs out, the results found so
+                far are returned with a warning telling how many attempts were
+                skipped. An attempt already started is not interrupted.
+
+            max_attempts (int): Number of combinations of missing parameters
+                that can be tried. Works like time_budget.
+
+            confidence_threshold (float): Score between 0 and 1 (see
+                xlseries.evaluation) that a result must reach to stop trying
+                combinations of missing parameters. If safe_mode is False, the
+                best scored result is returned instead of the first one, if
+                none reaches the threshold. In safe mode, results are always
+                returned from the best to the worst scored.
+
+            per_series (bool): If True, the missing parameters about the
+                values of the series (continuity, blank_rows and missings)
+                are discovered for each series independently, instead of
+                trying every combination of values for all the series at
+                once. Series that don't share the same values of those
+                parameters can then be scraped without passing them.
+
+            history (ParamsHistory): Values of missing parameters that worked
+                before, by layout of worksheet (see
+                strategies.discover.history). The values that worked in a
+                worksheet with the same layout are tried first and the ones
+                found are recorded.
+
+            dtype: Type of the values of the data frames (eg. numpy.float32).
+                By default they are numpy.float64.
+
+            clean_float_noise (bool): If True, values are rounded to the
+                significant figures of their series, removing float noise
+                like 0.30000000000000004 (see utils.float_handlers).
+
         Returns:
             list: A list of pandas.DataFrame objects with time series scraped
                 from the excel file. Every DataFrame in the list corresponds to
@@ -102,12 +216,367 @@ class XlSeries(object):
             dfs = XlSeries(wb).get_data_frames(params)
 
         """
+        with instrumentation.recording(self.stats):
+            return self._get_data_frames(params_path_or_obj, ws_name,
+                                         safe_mode, preserve_wb_obj,
+                                         time_budget, max_attempts,
+                                         confidence_threshold, per_series,
+                                         history, dtype, clean_float_noise)
+
+    def _get_data_frames(self, params_path_or_obj, ws_name, safe_mode,
+                         preserve_wb_obj, time_budget, max_attempts,
+                         confidence_threshold, per_series=False,
+                         history=None, dtype=None, clean_float_noise=False):
+
+        from .utils.xl_methods import make_wb_copy
+
         # wb will be changed, so it has to be a copy to preserve the original
         if preserve_wb_obj:
-            wb_copy = make_wb_copy(self.wb)
+            with instrumentation.stage("copy"):
+                wb_copy = make_wb_copy(self.wb)
         else:
             wb_copy = self.wb
-        ws_names = wb_copy.sheetnames
+        ws_name = self._get_ws_name(ws_name, wb_copy.sheetnames)
+
+        dfs, params = self._scrape(wb_copy, params_path_or_obj, ws_name,
+                                   safe_mode, time_budget, max_attempts,
+                                   confidence_threshold, per_series,
+                                   history, dtype, clean_float_noise)
+        self.params[ws_name] = params
+
+        return dfs
+
+    def iter_series(self, params_path_or_obj, ws_name=None,
+                    preserve_wb_obj=True, dtype=None,
+                    clean_float_noise=False):
+        """Scrape time series from an excel file one series at a time.
+
+        Each series is yielded as soon as its values are taken from the
+        worksheet, without building data frames, so only the values of one
+        series are kept at a time. Useful for worksheets with thousands of
+        series that are stored somewhere else.
+
+        If some parameters are missing, they are discovered with
+        get_data_frames first (which builds the data frames once).
+
+        Args:
+            params_path_or_obj (str, dict or Parameters): Scraping parameters.
+                See get_data_frames.
+            ws_name (str): Name of the worksheet that will be scraped.
+            preserve_wb_obj (bool): See get_data_frames.
+            dtype: See get_data_frames.
+            clean_float_noise (bool): See get_data_frames.
+
+        Yields:
+            tuple: (name, period_range, values) The name of the series (the
+                column it would have in the data frames returned by
+                get_data_frames), its pandas.PeriodIndex and a numpy array
+                with its values.
+
+        Example:
+            for name, period_range, values in XlSeries(xl_path).iter_series(
+                    params):
+                store.put(name, pd.Series(values, index=period_range))
+        """
+        from .strategies import strategies
+        from .strategies.discover.parameters import Parameters
+        from .strategies.discover.layout import complete_layout_params
+        from .utils.xl_methods import make_wb_copy
+
+        ws_name = self._get_ws_name(ws_name, self.wb.sheetnames)
+
+        if isinstance(params_path_or_obj, Parameters):
+            params = copy.deepcopy(params_path_or_obj)
+        else:
+            params = Parameters(complete_layout_params(params_path_or_obj,
+                                                       self.wb[ws_name]))
+
+        if not params.is_complete():
+            self.get_data_frames(copy.deepcopy(params), ws_name)
+            params = copy.deepcopy(self.params[ws_name])
+
+        with instrumentation.recording(self.stats):
+            # wb will be changed, so it has to be a copy to preserve it
+            if preserve_wb_obj:
+                with instrumentation.stage("copy"):
+                    wb = make_wb_copy(self.wb)
+            else:
+                wb = self.wb
+
+            for scraper in strategies.get_strategies():
+                if scraper.accepts(wb):
+                    series_iter = scraper(wb, params, ws_name).iter_series(
+                        dtype, clean_float_noise)
+                    break
+
+        # measures are recorded only while taking the next series
+        while True:
+            with instrumentation.recording(self.stats):
+                series = next(series_iter, None)
+
+            if series is None:
+                break
+            yield series
+
+    def compile_plan(self, params_path_or_obj, ws_name=None):
+        """Scrape a worksheet and compile what worked into an ExtractionPlan.
+
+        Executing the plan over other files with the same layout skips the
+        discovery of missing parameters and the selection of strategies. Data
+        ends not passed by the user are estimated again in every file, so the
+        plan works with files that have more periods.
+
+        Args:
+            params_path_or_obj (str, dict or Parameters): Scraping parameters.
+                See get_data_frames.
+            ws_name (str): Name of the worksheet that will be scraped.
+
+        Returns:
+            ExtractionPlan: A plan that can be saved and executed with
+                execute_plan.
+
+        Example:
+            plan = XlSeries(xl_path).compile_plan(params)
+            plan.save("plan.json")
+            dfs = XlSeries(next_month_xl_path).execute_plan("plan.json")
+        """
+        from .strategies import plan
+        from .strategies.discover.parameters import Parameters
+        from .strategies.discover.layout import complete_layout_params
+
+        ws_name = self._get_ws_name(ws_name, self.wb.sheetnames)
+
+        if isinstance(params_path_or_obj, Parameters):
+            params = params_path_or_obj
+        else:
+            params = Parameters(complete_layout_params(params_path_or_obj,
+                                                       self.wb[ws_name]))
+        estimate_ends = [not data_ends for data_ends in
+                         params.data_ends or [None] * len(params)]
+
+        self.get_data_frames(copy.deepcopy(params), ws_name)
+
+        return plan.ExtractionPlan.compile(self.wb[ws_name],
+                                           self.params[ws_name],
+                                           estimate_ends)
+
+    def execute_plan(self, plan_path_or_obj, ws_name=None,
+                     preserve_wb_obj=True, dtype=None,
+                     clean_float_noise=False):
+        """Scrape time series from an excel file following an ExtractionPlan.
+
+        Args:
+            plan_path_or_obj (str or ExtractionPlan): A plan returned by
+                compile_plan or the path to a JSON file where it was saved.
+            ws_name (str): Name of the worksheet that will be scraped. By
+                default, the worksheet with the name of the one the plan was
+                compiled from or the first one.
+            preserve_wb_obj (bool): See get_data_frames.
+            dtype: See get_data_frames.
+            clean_float_noise (bool): See get_data_frames.
+
+        Returns:
+            list: What get_data_frames returns.
+        """
+        from .strategies import plan
+        from .utils.xl_methods import make_ws_copy
+        from .utils.data_frame import convert_data_frame
+
+        if isinstance(plan_path_or_obj, plan.ExtractionPlan):
+            extraction_plan = plan_path_or_obj
+        else:
+            extraction_plan = plan.ExtractionPlan.load(plan_path_or_obj)
+
+        ws_names = self.wb.sheetnames
+        if not ws_name and extraction_plan.ws_name in ws_names:
+            ws_name = extraction_plan.ws_name
+        ws_name = self._get_ws_name(ws_name, ws_names)
+
+        with instrumentation.recording(self.stats):
+            if preserve_wb_obj:
+                with instrumentation.stage("copy"):
+                    ws = make_ws_copy(self.wb[ws_name])
+            else:
+                ws = self.wb[ws_name]
+
+            dfs = extraction_plan.execute(ws)
+
+            if dtype is not None or clean_float_noise:
+                with instrumentation.stage("convert_values"):
+                    dfs = [convert_data_frame(df, dtype, clean_float_noise)
+                           for df in dfs]
+
+        if len(dfs) == 1:
+            return dfs[0]
+        else:
+            return dfs
+
+    def get_data_frames_by_layout(self, params_path_or_obj, layout_index,
+                                  ws_name=None, dtype=None,
+                                  clean_float_noise=False):
+        """Scrape time series reusing the plans of the layouts already seen.
+
+        If a worksheet with the same layout (see
+        strategies.discover.fingerprint) was already scraped, the plan
+        compiled for it is executed, skipping the discovery of parameters.
+        Otherwise, a plan is compiled from this worksheet and added to the
+        index. Batch runs over files made with the same template only
+        discover the parameters of the first one.
+
+        Args:
+            params_path_or_obj (str, dict or Parameters): Scraping parameters,
+                used only if the layout isn't in the index. See
+                get_data_frames.
+            layout_index (LayoutIndex): Plans compiled for each layout.
+            ws_name (str): Name of the worksheet that will be scraped.
+            dtype: See get_data_frames.
+            clean_float_noise (bool): See get_data_frames.
+
+        Returns:
+            list: What get_data_frames returns.
+
+        Example:
+            layout_index = LayoutIndex()
+            for xl_path in xl_paths:
+                dfs = XlSeries(xl_path).get_data_frames_by_layout(
+                    params, layout_index)
+        """
+        ws_name = self._get_ws_name(ws_name, self.wb.sheetnames)
+
+        with instrumentation.recording(self.stats):
+            extraction_plan = layout_index.get_plan(self.wb[ws_name])
+
+        if not extraction_plan:
+            extraction_plan = self.compile_plan(params_path_or_obj, ws_name)
+            layout_index.add(self.wb[ws_name], extraction_plan)
+
+        return self.execute_plan(extraction_plan, ws_name, dtype=dtype,
+                                 clean_float_noise=clean_float_noise)
+
+    def get_data_frames_multi(self, params_by_ws, safe_mode=False,
+                              max_workers=None, time_budget=None,
+                              max_attempts=None, confidence_threshold=None,
+                              per_series=False, dtype=None,
+                              clean_float_noise=False):
+        """Scrape time series from many worksheets, concurrently.
+
+        The workbook is loaded only once. Each worksheet is scraped in a
+        worker process that only receives the values of its own sheet, so the
+        whole call takes about the time of the slowest worksheet.
+
+        Args:
+            params_by_ws (dict): Scraping parameters of each worksheet, like
+                {ws_name: params_path_or_obj}. See get_data_frames for the
+                types of parameters accepted.
+            safe_mode (bool): Passed to the scraping of every worksheet. See
+                get_data_frames.
+            max_workers (int): Maximum number of worker processes. If None,
+                the number of processors of the machine is used. With 1 all
+                the worksheets are scraped in the current process.
+            time_budget (float): Applied to every worksheet. See
+                get_data_frames.
+            max_attempts (int): Applied to every worksheet. See
+                get_data_frames.
+            confidence_threshold (float): Applied to every worksheet. See
+                get_data_frames.
+            per_series (bool): Applied to every worksheet. See
+                get_data_frames.
+            dtype: Applied to every worksheet. See get_data_frames.
+            clean_float_noise (bool): Applied to every worksheet. See
+                get_data_frames.
+
+        Returns:
+            dict: {ws_name: result} where ws_name is the key passed in
+                params_by_ws and result is what get_data_frames would return
+                for the worksheet or a WorksheetNotScraped exception if the
+                worksheet couldn't be scraped.
+
+        The history of parameters of get_data_frames is not supported, the
+        worker processes would write the same history file at once.
+
+        Example:
+            results = XlSeries(xl_path).get_data_frames_multi({
+                "Quarterly": quarterly_params,
+                "Monthly": monthly_params
+            })
+        """
+        from .utils.xl_methods import get_ws_values
+
+        ws_names = self.wb.sheetnames
+
+        # only the values of each worksheet are sent to the workers
+        tasks = {}
+        results = {}
+        for ws_name_orig, params in params_by_ws.items():
+            ws_name = self._sanitize_ws_name(ws_name_orig, ws_names)
+
+            if ws_name in ws_names:
+                ws_values = get_ws_values(self.wb[ws_name])
+                tasks[ws_name_orig] = (ws_name, ws_values, params, safe_mode,
+                                       self.stats is not None, time_budget,
+                                       max_attempts, confidence_threshold,
+                                       per_series, dtype, clean_float_noise)
+            else:
+                error = "There is no worksheet named " + repr(ws_name_orig)
+                results[ws_name_orig] = WorksheetNotScraped(ws_name_orig,
+                                                            error)
+
+        if max_workers == 1:
+            outputs = {ws_name_orig: _scrape_ws_values(*task_args) for
+                       ws_name_orig, task_args in tasks.items()}
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {ws_name_orig: executor.submit(_scrape_ws_values,
+                                                         *task_args)
+                           for ws_name_orig, task_args in tasks.items()}
+                outputs = {ws_name_orig: future.result() for
+                           ws_name_orig, future in futures.items()}
+
+        # results are returned with the names passed, parameters are kept
+        # with the names of the worksheets, like get_data_frames does
+        for ws_name_orig, (dfs, params, error, stats) in outputs.items():
+            if stats:
+                self.stats.merge(stats)
+
+            if error:
+                results[ws_name_orig] = WorksheetNotScraped(ws_name_orig,
+                                                            error)
+            else:
+                results[ws_name_orig] = dfs
+                self.params[tasks[ws_name_orig][0]] = params
+
+        return results
+
+    @staticmethod
+    def _scrape(wb, params_path_or_obj, ws_name, safe_mode, time_budget=None,
+                max_attempts=None, confidence_threshold=None,
+                per_series=False, history=None, dtype=None,
+                clean_float_noise=False):
+        """Scrape a worksheet of a workbook with the first scraper accepting
+        it.
+
+        Returns:
+            tuple: (dfs, params) The data frames (or a single data frame) and
+                the parameters used to scrape them.
+        """
+        from .strategies import strategies
+
+        for scraper in strategies.get_strategies():
+            if scraper.accepts(wb):
+                scraper_obj = scraper(wb, params_path_or_obj, ws_name)
+                dfs, params = scraper_obj.get_data_frames(
+                    safe_mode, time_budget, max_attempts,
+                    confidence_threshold, per_series, history, dtype,
+                    clean_float_noise)
+
+                if isinstance(dfs, list) and len(dfs) == 1:
+                    return dfs[0], params
+                else:
+                    return dfs, params
+
+    @classmethod
+    def _get_ws_name(cls, ws_name, ws_names):
+        """Return the name of the worksheet to scrape, the first by default."""
 
         if not ws_name:
             ws_name = ws_names[0]
@@ -120,19 +589,10 @@ class XlSeries(object):
                                  ws_name.encode("utf-8")))
                 print("Remember you can choose a different one passing a " +
                       "ws_name keyword argument.")
-        else:
-            ws_name = self._sanitize_ws_name(ws_name, ws_names)
+            return ws_name
 
-        for scraper in strategies.get_strategies():
-            if scraper.accepts(wb_copy):
-                scraper_obj = scraper(wb_copy, params_path_or_obj, ws_name)
-                dfs, params = scraper_obj.get_data_frames(safe_mode)
-                self.params[ws_name] = params
-
-                if isinstance(dfs, list) and len(dfs) == 1:
-                    return dfs[0]
-                else:
-                    return dfs
+        else:
+            return cls._sanitize_ws_name(ws_name, ws_names)
 
     @staticmethod
     def _sanitize_ws_name(ws_name_orig, ws_names):
@@ -146,6 +606,8 @@ class XlSeries(object):
 
         # check other ws names that may match
         else:
+            from unidecode import unidecode
+
             for ws_name in ws_names:
                 if str(ws_name_orig).strip() == str(ws_name).strip():
                     return ws_name
@@ -163,6 +625,7 @@ class XlSeries(object):
         Returns:
             dict: A dictionary to fill with values.
         """
+        from .strategies.discover.parameters import Parameters
         return Parameters.get_critical_params_template()
 
     @staticmethod
@@ -172,15 +635,16 @@ class XlSeries(object):
         Returns:
             dict: A dictionary to fill with values.
         """
+        from .strategies.discover.parameters import Parameters
         return Parameters.get_complete_params_template()
 
     def open(self):
         """Open excel file with system's default program."""
 
         # save workbook if no path to excel file was given
-        if isinstance(self.xl_path_or_wb, Workbook):
+        if not isinstance(self.xl_path_or_wb, str):
             filename = "temp_xl_file.xlsx"
-            self.xl_path_or_wb.save(filename)
+            self.wb.save(filename)
             path = filename
         else:
             path = self.xl_path_or_wb
@@ -189,3 +653,40 @@ class XlSeries(object):
             os.system(path)
         else:
             os.system("open " + path)
+
+
+def _scrape_ws_values(ws_name, ws_values, params_path_or_obj, safe_mode,
+                      record_stats=False, time_budget=None, max_attempts=None,
+                      confidence_threshold=None, per_series=False, dtype=None,
+                      clean_float_noise=False):
+    """Scrape a worksheet rebuilt from its values, inside a worker process.
+
+    Exceptions are returned as formatted strings because not all the custom
+    exceptions of the package can be sent back from a worker process. The
+    same goes for the measures, returned as a snapshot of a Stats object.
+
+    Returns:
+        tuple: (dfs, params, error, stats) where error is None if the
+            worksheet was successfully scraped and stats is None if
+            record_stats is False.
+    """
+    from .utils.xl_methods import make_ws_from_values
+
+    stats = instrumentation.Stats() if record_stats else None
+
+    with instrumentation.recording(stats):
+        with instrumentation.stage("copy"):
+            ws = make_ws_from_values(ws_name, ws_values)
+
+        try:
+            dfs, params = XlSeries._scrape(ws.parent, params_path_or_obj,
+                                           ws_name, safe_mode, time_budget,
+                                           max_attempts, confidence_threshold,
+                                           per_series, dtype=dtype,
+                                           clean_float_noise=clean_float_noise)
+            error = None
+
+        except Exception:
+            dfs, params, error = None, None, traceback.format_exc()
+
+    return dfs, params, error, stats and stats.snapshot()